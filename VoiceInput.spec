@@ -19,9 +19,12 @@ a = Analysis(
         "voice_input.transcriber",
         "voice_input.recorder",
         "voice_input.output",
+        "voice_input.paste_helper",
         "voice_input.hotkey",
         "voice_input.config",
         "rumps",
+        "AppKit",
+        "Quartz",
         "pynput",
         "pynput.keyboard",
         "pynput.keyboard._darwin",
@@ -34,6 +37,7 @@ a = Analysis(
         "numpy",
         "openai",
         "pyperclip",
+        "soundfile",
         "dotenv",
         "httpx",
         "httpcore",
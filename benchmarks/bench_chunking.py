@@ -0,0 +1,73 @@
+"""Compare single-upload and chunked long-form transcription latency.
+
+Uses the stub server with a fixed per-request latency plus latency that grows
+with clip length, which is how Whisper inference time behaves.
+
+Usage::
+
+    uv run python benchmarks/bench_chunking.py --latency 0.5 --latency-per-second 0.05
+"""
+
+import argparse
+import logging
+import time
+
+from bench_encoders import synthetic_speech
+from stub_server import StubWhisperServer
+
+from voice_input.chunking import ChunkedTranscriber
+from voice_input.encoder import EncoderStage
+from voice_input.logger import get_logger
+from voice_input.transcriber import TranscriptionClient
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="Fixed latency (s)")
+    parser.add_argument(
+        "--latency-per-second",
+        type=float,
+        default=0.05,
+        help="Extra latency per second of audio",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Parallel requests")
+    parser.add_argument("--chunk-seconds", type=float, default=60.0)
+    parser.add_argument(
+        "--durations", type=float, nargs="+", default=[120.0, 300.0, 600.0]
+    )
+    args = parser.parse_args()
+
+    get_logger().setLevel(logging.WARNING)
+    with StubWhisperServer(
+        latency=args.latency, latency_per_second=args.latency_per_second
+    ) as server:
+        client = TranscriptionClient(api_key="stub", base_url=server.base_url)
+        # WAV keeps upload size proportional to audio length for the stub
+        stage = EncoderStage("wav")
+        chunked = ChunkedTranscriber(
+            client, stage, chunk_seconds=args.chunk_seconds, max_workers=args.workers
+        )
+        print(f"{'clip':>6} {'single s':>9} {'chunked s':>10} {'requests':>9}")
+        for duration in args.durations:
+            audio = synthetic_speech(duration)
+
+            start_time = time.perf_counter()
+            encoded = stage.encode(audio)
+            client.transcribe(encoded.buffer)
+            encoded.release()
+            single = time.perf_counter() - start_time
+
+            requests_before = server.request_count
+            start_time = time.perf_counter()
+            chunked.transcribe(audio)
+            parallel = time.perf_counter() - start_time
+            print(
+                f"{duration:>5.0f}s {single:>9.2f} {parallel:>10.2f} "
+                f"{server.request_count - requests_before:>9}"
+            )
+        chunked.shutdown()
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
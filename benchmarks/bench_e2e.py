@@ -0,0 +1,207 @@
+"""End-to-end dictation latency: hotkey release to text delivered.
+
+Runs the app's pipeline headlessly: StreamingRecorder fed from synthetic
+audio instead of a microphone, DictationProcessor with the app's encoder,
+request scheduler and chunking, the stub Whisper server in place of the
+API, and a no-op output sink. Reports p50/p95/p99 of every stage for each
+clip length, and can write the results as JSON and compare them with a
+previous run.
+
+Usage::
+
+    uv run python benchmarks/bench_e2e.py --latency 0.5 --bandwidth 250000 --json results.json
+    uv run python benchmarks/bench_e2e.py --compare results.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import time
+import types
+
+import numpy as np
+from bench_encoders import synthetic_speech
+from stub_server import StubWhisperServer
+
+import voice_input.recorder as recorder_module
+from voice_input.chunking import ChunkedTranscriber
+from voice_input.dictation import DictationProcessor
+from voice_input.encoder import DEFAULT_ENCODER, EncoderStage
+from voice_input.logger import get_logger
+from voice_input.output import CollectingSink
+from voice_input.recorder import SAMPLE_RATE, StreamingRecorder
+from voice_input.scheduler import RequestScheduler
+from voice_input.tracing import Trace
+from voice_input.transcriber import TranscriptionClient
+
+STAGES = ["stop", "vad", "encode", "transcribe", "output", "total"]
+PERCENTILES = [50, 95, 99]
+SILENCE_SECONDS = 0.4  # Silence before and after the speech in each clip
+BLOCKSIZE = 512
+
+
+class FixtureInputStream:
+    """Stand-in for sounddevice.InputStream that plays a fixture clip.
+
+    start() delivers the whole clip to the callback in PortAudio-sized
+    blocks at once, so a "recording" takes no wall time.
+    """
+
+    clip = np.zeros(0, dtype=np.int16)
+
+    def __init__(self, callback, blocksize: int = 0, **kwargs: object) -> None:
+        self._callback = callback
+        self._blocksize = blocksize or BLOCKSIZE
+
+    def start(self) -> None:
+        samples = self.clip.reshape(-1, 1)
+        for start in range(0, len(samples), self._blocksize):
+            block = samples[start : start + self._blocksize]
+            self._callback(block, len(block), None, None)
+
+    def abort(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def make_clip(seconds: float, seed: int) -> np.ndarray:
+    silence = np.zeros(int(SILENCE_SECONDS * SAMPLE_RATE), dtype=np.int16)
+    return np.concatenate((silence, synthetic_speech(seconds, seed), silence))
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    values = np.percentile(samples, PERCENTILES)
+    return {f"p{q}": float(v) for q, v in zip(PERCENTILES, values)}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_clip(
+    recorder: StreamingRecorder,
+    processor: DictationProcessor,
+    seconds: float,
+    repeat: int,
+) -> dict[str, dict[str, float]]:
+    timings: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    for i in range(repeat):
+        # A different seed per run so the result cache (if any) never hits
+        FixtureInputStream.clip = make_clip(seconds, seed=i)
+        recorder.start()
+
+        trace = Trace()
+        with trace.span("stop"):
+            audio = recorder.stop()
+        result = processor.process(audio, trace=trace)
+        trace.record("total", time.perf_counter() - trace.started)
+        if result.error is not None:
+            raise RuntimeError(f"Dictation failed: {result.error}")
+        for stage, value in trace.spans.items():
+            timings[stage].append(value)
+    return {stage: summarize(values) for stage, values in timings.items() if values}
+
+
+def print_table(results: dict, baseline: dict | None) -> None:
+    header = f"{'clip':>6} {'stage':>10}" + "".join(f" {f'p{q} ms':>10}" for q in PERCENTILES)
+    if baseline:
+        header += f" {'p50 vs base':>12}"
+    print(header)
+    for clip, stages in results["clips"].items():
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            row = f"{clip:>5}s {stage:>10}" + "".join(
+                f" {stages[stage][f'p{q}'] * 1000:>10.1f}" for q in PERCENTILES
+            )
+            base = (baseline or {}).get("clips", {}).get(clip, {}).get(stage)
+            if base and base["p50"] > 0:
+                change = stages[stage]["p50"] / base["p50"] - 1
+                row += f" {change:>+11.1%}"
+            print(row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="Server latency (s)")
+    parser.add_argument(
+        "--latency-per-second",
+        type=float,
+        default=0.02,
+        help="Extra server latency per second of audio",
+    )
+    parser.add_argument(
+        "--bandwidth", type=float, default=250_000, help="Upload bandwidth (bytes/s)"
+    )
+    parser.add_argument("--encoder", default=DEFAULT_ENCODER)
+    parser.add_argument("--repeat", type=int, default=20, help="Dictations per clip length")
+    parser.add_argument(
+        "--durations", type=float, nargs="+", default=[2.0, 5.0, 15.0, 60.0]
+    )
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare p50s with a previous JSON result")
+    args = parser.parse_args()
+
+    get_logger().setLevel(logging.WARNING)
+    # Record from fixtures instead of the microphone
+    recorder_module.sd = types.SimpleNamespace(InputStream=FixtureInputStream)
+
+    with StubWhisperServer(
+        latency=args.latency,
+        latency_per_second=args.latency_per_second,
+        bandwidth=args.bandwidth,
+    ) as server:
+        engine = RequestScheduler(
+            TranscriptionClient(api_key="stub", base_url=server.base_url, max_retries=0)
+        )
+        encoder_stage = EncoderStage(args.encoder)
+        chunked = ChunkedTranscriber(engine, encoder_stage)
+        processor = DictationProcessor(
+            engine, encoder_stage, chunked, output=CollectingSink().deliver
+        )
+        recorder = StreamingRecorder(blocksize=BLOCKSIZE)
+
+        results = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "settings": {
+                "latency": args.latency,
+                "latency_per_second": args.latency_per_second,
+                "bandwidth": args.bandwidth,
+                "encoder": encoder_stage.encoder_name,
+                "repeat": args.repeat,
+            },
+            "clips": {},
+        }
+        for seconds in args.durations:
+            results["clips"][f"{seconds:g}"] = run_clip(
+                recorder, processor, seconds, args.repeat
+            )
+
+        chunked.shutdown()
+        engine.close()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
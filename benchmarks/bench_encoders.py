@@ -0,0 +1,75 @@
+"""Compare end-to-end upload latency of each encoder against the stub server.
+
+Runs encode + transcribe for synthetic speech-like clips with every encoder
+in voice_input.encoder.ENCODERS and prints median latency and upload size.
+
+Usage::
+
+    uv run python benchmarks/bench_encoders.py --bandwidth 250000 --latency 0.5
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+from stub_server import StubWhisperServer
+
+from voice_input.encoder import ENCODERS, EncoderStage
+from voice_input.recorder import SAMPLE_RATE
+from voice_input.transcriber import TranscriptionClient
+
+
+def synthetic_speech(seconds: float, seed: int = 0) -> np.ndarray:
+    """Generate speech-like audio: noisy harmonics gated into syllables."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 120 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    syllables = (np.sin(2 * np.pi * 4 * t) > -0.2).astype(np.float64)
+    noise = rng.normal(0, 0.05, len(t))
+    audio = (voiced * syllables + noise) * 4000
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="Server latency (s)")
+    parser.add_argument(
+        "--bandwidth", type=float, default=250_000, help="Upload bandwidth (bytes/s)"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case")
+    parser.add_argument(
+        "--durations", type=float, nargs="+", default=[5.0, 15.0, 60.0]
+    )
+    args = parser.parse_args()
+
+    with StubWhisperServer(latency=args.latency, bandwidth=args.bandwidth) as server:
+        client = TranscriptionClient(api_key="stub", base_url=server.base_url)
+        print(f"{'clip':>6} {'encoder':>8} {'bytes':>10} {'encode ms':>10} {'e2e s':>8}")
+        for duration in args.durations:
+            audio = synthetic_speech(duration)
+            for name in ENCODERS:
+                stage = EncoderStage(name)
+                if stage.encoder_name != name:
+                    print(f"{duration:>5.0f}s {name:>8} {'unavailable':>10}")
+                    continue
+                latencies = []
+                for _ in range(args.repeat):
+                    start_time = time.perf_counter()
+                    encoded = stage.encode(audio)
+                    client.transcribe(encoded.buffer)
+                    latencies.append(time.perf_counter() - start_time)
+                    encoded.release()
+                stats = stage.stats()
+                print(
+                    f"{duration:>5.0f}s {name:>8} {encoded.encoded_bytes:>10} "
+                    f"{stats['encode_time'] / stats['count'] * 1000:>10.1f} "
+                    f"{statistics.median(latencies):>8.3f}"
+                )
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Compare a polled event queue with the wakeup-driven EventDispatcher.
+
+A consumer thread stands in for the UI thread. The polled consumer checks a
+queue every --interval seconds, like the former rumps.timer; the dispatcher
+consumer sleeps until an event is posted. Reports how often each consumer
+woke up while idle and the latency from post() to the handler running.
+
+Usage::
+
+    uv run python benchmarks/bench_events.py --idle 5 --events 200
+"""
+
+import argparse
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+
+from voice_input.events import EventDispatcher, StatusChanged
+
+
+class PolledConsumer:
+    """The old design: drain a queue.Queue on a fixed timer."""
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._queue: queue.Queue[tuple[str, float]] = queue.Queue()
+        self._stop = threading.Event()
+        self.wakeups = 0
+        self.latencies: list[float] = []
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def post(self, status: str) -> None:
+        self._queue.put((status, time.perf_counter()))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.wakeups += 1
+            try:
+                while True:
+                    _, posted = self._queue.get_nowait()
+                    self.latencies.append(time.perf_counter() - posted)
+            except queue.Empty:
+                pass
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class DispatcherConsumer:
+    """The new design: block until the dispatcher has events."""
+
+    def __init__(self) -> None:
+        self._dispatcher = EventDispatcher()
+        self._dispatcher.register(StatusChanged, self._on_status)
+        self._posted: dict[str, float] = {}
+        self._stop = False
+        self.wakeups = 0
+        self.latencies: list[float] = []
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def post(self, status: str) -> None:
+        self._posted[status] = time.perf_counter()
+        self._dispatcher.post(StatusChanged(status))
+
+    def _on_status(self, event: StatusChanged) -> None:
+        self.latencies.append(time.perf_counter() - self._posted.pop(event.status))
+
+    def _run(self) -> None:
+        while not self._stop:
+            self._dispatcher.wait()
+            self.wakeups += 1
+            self._dispatcher.dispatch_pending()
+
+    def close(self) -> None:
+        self._stop = True
+        self.post("close")  # Wakes the consumer so it sees _stop
+        self._thread.join()
+
+
+def measure(consumer: PolledConsumer | DispatcherConsumer, args: argparse.Namespace) -> None:
+    time.sleep(args.idle)
+    idle_wakeups = consumer.wakeups / args.idle
+
+    rng = random.Random(0)
+    for i in range(args.events):
+        consumer.post(f"event {i}")
+        # Events arrive at human pace (hotkey presses, finished dictations)
+        time.sleep(rng.uniform(0.001, 0.02))
+    time.sleep(0.1)
+    consumer.close()
+
+    latencies = consumer.latencies[: args.events]
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    name = type(consumer).__name__.removesuffix("Consumer").lower()
+    print(
+        f"{name:>10} {idle_wakeups:>10.1f} {p50:>9.3f} {p95:>9.3f} {p99:>9.3f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--idle", type=float, default=5.0, help="Idle seconds measured")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument(
+        "--interval", type=float, default=0.05, help="Poll interval of the old design"
+    )
+    args = parser.parse_args()
+
+    print(f"{'consumer':>10} {'wakeups/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    measure(PolledConsumer(args.interval), args)
+    measure(DispatcherConsumer(), args)
+
+
+if __name__ == "__main__":
+    main()
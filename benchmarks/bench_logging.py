@@ -0,0 +1,99 @@
+"""Cost of logging from the audio callback while the log disk stalls.
+
+Logs from a thread standing in for the PortAudio callback while the log
+"disk" (a handler that sleeps --stall seconds every --stall-every records)
+is slow, once with the handler attached synchronously (as before) and once
+through the app's logger (bounded queue and background writer). Reports
+per-call latency and how many records the queued logger dropped, and exits
+with status 1 if a queued call ever takes longer than CALL_BUDGET.
+
+Usage::
+
+    uv run python benchmarks/bench_logging.py --stall 0.1 --calls 2000
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+
+import numpy as np
+
+import voice_input.logger as logger_module
+from voice_input.logger import get_logger
+
+CALL_BUDGET = 0.005  # Longest acceptable log call on the callback thread (s)
+
+
+class StallingHandler(logging.Handler):
+    """Formats records like a file handler and stalls now and then."""
+
+    def __init__(self, stall: float, stall_every: int) -> None:
+        super().__init__()
+        self.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+        self._stall = stall
+        self._stall_every = stall_every
+        self.written = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.format(record)
+        self.written += 1
+        if self.written % self._stall_every == 0:
+            time.sleep(self._stall)
+
+
+def callback_thread(logger: logging.Logger, calls: int, interval: float) -> list[float]:
+    """Log a status warning per block, as the audio callback does on overflow."""
+    times = []
+
+    def run() -> None:
+        for i in range(calls):
+            start_time = time.perf_counter()
+            logger.warning("Audio callback status: %s", "input overflow")
+            times.append(time.perf_counter() - start_time)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stall", type=float, default=0.1, help="Disk stall (s)")
+    parser.add_argument("--stall-every", type=int, default=100, help="Records per stall")
+    parser.add_argument("--calls", type=int, default=2000, help="Log calls")
+    parser.add_argument(
+        "--interval", type=float, default=0.001, help="Seconds between log calls"
+    )
+    args = parser.parse_args()
+
+    # Before: the handler runs on the calling thread
+    sync_logger = logging.getLogger("bench_logging_sync")
+    sync_logger.propagate = False
+    sync_logger.addHandler(StallingHandler(args.stall, args.stall_every))
+    sync_times = callback_thread(sync_logger, args.calls, args.interval)
+
+    # After: the app's logger, with the slow disk behind its writer thread
+    queued_logger = get_logger()
+    stalling = StallingHandler(args.stall, args.stall_every)
+    logger_module._listener.handlers = (stalling,)
+    queued_times = callback_thread(queued_logger, args.calls, args.interval)
+    queue_handler = queued_logger.handlers[0]
+    dropped = queue_handler.dropped
+    logger_module._listener.stop()
+
+    print(f"{'handler':>8} {'p50 us':>9} {'p99 us':>9} {'max ms':>8}")
+    for name, times in (("sync", sync_times), ("queued", queued_times)):
+        p50, p99 = np.percentile(times, [50, 99]) * 1e6
+        print(f"{name:>8} {p50:>9.1f} {p99:>9.1f} {max(times) * 1000:>8.2f}")
+    print(f"queued: {stalling.written} written, {dropped} dropped while full")
+    if max(queued_times) > CALL_BUDGET:
+        print(f"A queued log call took over {CALL_BUDGET * 1000:g} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
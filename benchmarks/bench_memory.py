@@ -0,0 +1,126 @@
+"""Peak memory of long recordings: in RAM vs spilled to a scratch file.
+
+Records synthetic audio of each length by driving StreamingRecorder's
+callback directly (no audio device), in a fresh interpreter per run, and
+reports how much the peak RSS grew while recording and then during VAD.
+With spilling (the default), recording growth should stay flat at about
+--max-memory seconds of audio however long the recording; the script exits
+with status 1 if the longest recording grows more than RSS_BUDGET_MB beyond
+the shortest. VAD growth is reported but not checked: VAD reads the
+recording back through the mapping, and those pages are file cache the OS
+can reclaim. --no-spill shows the previous behaviour for comparison.
+
+Usage::
+
+    uv run python benchmarks/bench_memory.py --durations 60 600 3600 --max-memory 60
+"""
+
+import argparse
+import json
+import logging
+import resource
+import subprocess
+import sys
+
+from bench_encoders import synthetic_speech
+
+from voice_input.logger import get_logger
+from voice_input.recorder import SAMPLE_RATE, StreamingRecorder
+from voice_input.vad import detect_speech
+
+RSS_BUDGET_MB = 16.0  # Allowed growth of the longest recording over the shortest
+BLOCKSIZE = 512
+PHRASE_SECONDS = 10.0  # Length of the synthetic clip that is looped
+
+
+def peak_rss() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class DirectRecorder(StreamingRecorder):
+    """StreamingRecorder driven directly, without opening a device."""
+
+    def __init__(self, **kwargs: object) -> None:
+        super().__init__(blocksize=BLOCKSIZE, **kwargs)
+        self._is_recording = True
+
+
+def child(seconds: float, max_memory: float | None) -> None:
+    """Record seconds of audio and print the RSS growth as JSON."""
+    get_logger().setLevel(logging.WARNING)
+    clip = synthetic_speech(PHRASE_SECONDS).reshape(-1, 1)
+    recorder = DirectRecorder(
+        max_memory_seconds=max_memory,
+        max_seconds=seconds + 1,
+    )
+    baseline = peak_rss()
+
+    blocks = int(seconds * SAMPLE_RATE / BLOCKSIZE)
+    for i in range(blocks):
+        start = i * BLOCKSIZE % (len(clip) - BLOCKSIZE)
+        block = clip[start : start + BLOCKSIZE]
+        recorder._audio_callback(block, BLOCKSIZE, None, None)
+    audio = recorder.stop()
+    recorded = peak_rss()
+
+    detect_speech(audio)
+    print(
+        json.dumps(
+            {
+                "recording_mb": (recorded - baseline) / 1024 / 1024,
+                "vad_mb": (peak_rss() - recorded) / 1024 / 1024,
+                "spilled": recorder._buffer.spilled,
+            }
+        )
+    )
+
+
+def measure(seconds: float, max_memory: float | None) -> dict:
+    command = [sys.executable, __file__, "--child", str(seconds)]
+    if max_memory is None:
+        command.append("--no-spill")
+    else:
+        command += ["--max-memory", str(max_memory)]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--durations", type=float, nargs="+", default=[60.0, 600.0, 3600.0]
+    )
+    parser.add_argument(
+        "--max-memory", type=float, default=60.0, help="Seconds kept in RAM"
+    )
+    parser.add_argument("--no-spill", action="store_true", help="Keep all in RAM")
+    parser.add_argument("--child", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    max_memory = None if args.no_spill else args.max_memory
+    if args.child is not None:
+        child(args.child, max_memory)
+        return
+
+    print(
+        f"{'duration':>8} {'audio MB':>9} {'spilled':>8} {'record MB':>10} "
+        f"{'VAD MB':>7}"
+    )
+    growth = []
+    for seconds in args.durations:
+        report = measure(seconds, max_memory)
+        growth.append(report["recording_mb"])
+        print(
+            f"{seconds:>7.0f}s {seconds * SAMPLE_RATE * 2 / 1024 / 1024:>9.1f} "
+            f"{'yes' if report['spilled'] else 'no':>8} "
+            f"{report['recording_mb']:>10.1f} {report['vad_mb']:>7.1f}"
+        )
+    if max_memory is not None and max(growth) - growth[0] > RSS_BUDGET_MB:
+        print(f"Recording memory grew over {RSS_BUDGET_MB:g} MB with length")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
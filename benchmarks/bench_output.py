@@ -0,0 +1,63 @@
+"""Per-paste overhead: a process spawned per paste vs the long-lived helper.
+
+The spawned command stands in for ``osascript`` (used if present, else
+``true``); the helper runs with --dry-run unless --real is given, so both
+sides measure process and protocol overhead rather than the paste itself.
+
+Usage::
+
+    uv run python benchmarks/bench_output.py --pastes 50
+"""
+
+import argparse
+import shutil
+import subprocess
+import time
+
+import numpy as np
+
+from voice_input.output import PasteSink, helper_command
+
+
+def spawn_per_paste(pastes: int) -> list[float]:
+    command = ["osascript", "-e", "return"] if shutil.which("osascript") else ["true"]
+    times = []
+    for _ in range(pastes):
+        start_time = time.perf_counter()
+        subprocess.run(command, capture_output=True)
+        times.append(time.perf_counter() - start_time)
+    return times
+
+
+def helper(pastes: int, real: bool) -> tuple[float, list[float]]:
+    command = helper_command()
+    sink = PasteSink(command if real else command + ["--dry-run"])
+    start_time = time.perf_counter()
+    sink.start()
+    startup = time.perf_counter() - start_time
+    times = []
+    for i in range(pastes):
+        sink.deliver(f"テスト {i}")
+        if sink.last_timing.fallback:
+            raise RuntimeError("Paste helper failed")
+        times.append(sink.last_timing.paste)
+    sink.close()
+    return startup, times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pastes", type=int, default=50)
+    parser.add_argument("--real", action="store_true", help="Really paste (macOS)")
+    args = parser.parse_args()
+
+    startup, helper_times = helper(args.pastes, args.real)
+    print(f"{'impl':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, times in (("spawn", spawn_per_paste(args.pastes)), ("helper", helper_times)):
+        p50, p99 = np.percentile(times, [50, 99]) * 1000
+        print(f"{name:>7} {p50:>8.2f} {p99:>8.2f}")
+    print(f"helper startup (once): {startup * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Latency and upload size with and without collapsing long pauses.
+
+Builds fixture dictations from synthetic speech separated by pauses of
+random length (background noise only), runs them through DictationProcessor
+against the stub Whisper server with collapse off and on, and reports the
+audio seconds uploaded, bytes sent, and p50 of the collapse, transcribe and
+total stages. The stub's --latency-per-second models Whisper's
+per-audio-second inference time (estimated from the upload size, so the
+default encoder here is wav).
+
+Usage::
+
+    uv run python benchmarks/bench_pauses.py --latency 0.5 --latency-per-second 0.05
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+from bench_encoders import synthetic_speech
+from stub_server import StubWhisperServer
+
+from voice_input.chunking import ChunkedTranscriber
+from voice_input.dictation import DictationProcessor
+from voice_input.encoder import EncoderStage
+from voice_input.logger import get_logger
+from voice_input.output import CollectingSink
+from voice_input.pauses import (
+    COLLAPSED_PAUSE_SECONDS,
+    MAX_PAUSE_SECONDS,
+    collapse_pauses,
+)
+from voice_input.recorder import SAMPLE_RATE
+from voice_input.scheduler import RequestScheduler
+from voice_input.tracing import Trace
+from voice_input.transcriber import TranscriptionClient
+from voice_input.vad import detect_speech
+
+NOISE_RMS = 20  # Background noise in pauses (int16 scale)
+PHRASE_SECONDS = (1.0, 4.0)  # Range of phrase lengths
+PAUSE_SECONDS = (0.2, 4.0)  # Range of pause lengths
+
+
+def make_clip(seconds: float, seed: int) -> np.ndarray:
+    """Phrases separated by random pauses, about seconds long in total."""
+    rng = np.random.default_rng(seed)
+    pieces = []
+    total = 0.0
+    while total < seconds:
+        phrase = rng.uniform(*PHRASE_SECONDS)
+        pause = rng.uniform(*PAUSE_SECONDS)
+        pieces.append(synthetic_speech(phrase, seed=len(pieces)))
+        pieces.append(rng.normal(0, NOISE_RMS, int(pause * SAMPLE_RATE)))
+        total += phrase + pause
+    return np.concatenate(pieces).astype(np.int16)
+
+
+def uploaded_seconds(
+    clip: np.ndarray, collapse: bool, args: argparse.Namespace
+) -> float:
+    """Length of the audio the processor uploads for clip."""
+    vad = detect_speech(clip)
+    if not collapse:
+        return (vad.end - vad.start) / SAMPLE_RATE
+    collapsed = collapse_pauses(clip, vad, args.max_pause, args.collapsed_pause)
+    return len(collapsed.audio) / SAMPLE_RATE
+
+
+def run(
+    processor: DictationProcessor,
+    server: StubWhisperServer,
+    clips: list[np.ndarray],
+    collapse: bool,
+    args: argparse.Namespace,
+) -> dict[str, float]:
+    timings: dict[str, list[float]] = {}
+    uploaded = []
+    sent_before = server.bytes_received
+    for clip in clips:
+        trace = Trace()
+        result = processor.process(clip, trace=trace)
+        trace.record("total", time.perf_counter() - trace.started)
+        if result.error is not None:
+            raise RuntimeError(f"Dictation failed: {result.error}")
+        for stage, value in trace.spans.items():
+            timings.setdefault(stage, []).append(value)
+        uploaded.append(uploaded_seconds(clip, collapse, args))
+    report = {stage: float(np.median(values)) for stage, values in timings.items()}
+    report["seconds"] = float(np.mean(uploaded))
+    report["bytes"] = (server.bytes_received - sent_before) / len(clips)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="Server latency (s)")
+    parser.add_argument(
+        "--latency-per-second",
+        type=float,
+        default=0.05,
+        help="Extra server latency per second of audio",
+    )
+    parser.add_argument(
+        "--bandwidth", type=float, default=250_000, help="Upload bandwidth (bytes/s)"
+    )
+    parser.add_argument("--encoder", default="wav")
+    parser.add_argument("--repeat", type=int, default=10, help="Dictations per length")
+    parser.add_argument("--durations", type=float, nargs="+", default=[15.0, 60.0])
+    parser.add_argument("--max-pause", type=float, default=MAX_PAUSE_SECONDS)
+    parser.add_argument("--collapsed-pause", type=float, default=COLLAPSED_PAUSE_SECONDS)
+    args = parser.parse_args()
+
+    get_logger().setLevel(logging.WARNING)
+    with StubWhisperServer(
+        latency=args.latency,
+        latency_per_second=args.latency_per_second,
+        bandwidth=args.bandwidth,
+    ) as server:
+        engine = RequestScheduler(
+            TranscriptionClient(api_key="stub", base_url=server.base_url, max_retries=0)
+        )
+        encoder_stage = EncoderStage(args.encoder)
+        chunked = ChunkedTranscriber(engine, encoder_stage)
+
+        print(
+            f"{'clip':>6} {'collapse':>9} {'audio s':>8} {'KB sent':>8} "
+            f"{'collapse ms':>12} {'transcribe ms':>14} {'total ms':>9}"
+        )
+        for seconds in args.durations:
+            clips = [make_clip(seconds, seed) for seed in range(args.repeat)]
+            for collapse in (False, True):
+                processor = DictationProcessor(
+                    engine,
+                    encoder_stage,
+                    chunked,
+                    output=CollectingSink().deliver,
+                    long_form_threshold=float("inf"),
+                    collapse=collapse,
+                    max_pause_seconds=args.max_pause,
+                    collapsed_pause_seconds=args.collapsed_pause,
+                )
+                report = run(processor, server, clips, collapse, args)
+                print(
+                    f"{seconds:>5g}s {'on' if collapse else 'off':>9} "
+                    f"{report['seconds']:>8.1f} {report['bytes'] / 1024:>8.0f} "
+                    f"{report.get('collapse', 0.0) * 1000:>12.2f} "
+                    f"{report['transcribe'] * 1000:>14.0f} "
+                    f"{report['total'] * 1000:>9.0f}"
+                )
+
+        chunked.shutdown()
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Ordering, backpressure and cancellation of back-to-back dictations.
+
+Runs DictationPipeline headlessly against a stub engine whose latency is
+proportional to the clip length, so dictations submitted longest first
+finish in reverse order. Checks that
+
+- the text is output in recording order anyway,
+- a submission beyond max_pending is refused (PipelineFullError), and
+- cancelling a dictation whose request hangs (an engine that can't abort
+  its request) finishes the job within CANCEL_BUDGET and releases
+  the text of the dictation behind it.
+
+Reports the release-to-output latency of each dictation and the cancel
+latency, and exits with status 1 if a check fails.
+
+Usage::
+
+    uv run python benchmarks/bench_pipeline.py --dictations 4 --latency-per-second 0.2
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+
+from bench_encoders import synthetic_speech
+
+from voice_input.chunking import ChunkedTranscriber
+from voice_input.dictation import DictationProcessor
+from voice_input.encoder import EncoderStage
+from voice_input.engine import AudioInput, CancelToken, TranscriptionEngine
+from voice_input.logger import get_logger
+from voice_input.output import CollectingSink
+from voice_input.pipeline import DictationJob, DictationPipeline, PipelineFullError
+from voice_input.recorder import SAMPLE_RATE
+from voice_input.scheduler import RequestScheduler
+from voice_input.tracing import Trace
+
+CANCEL_BUDGET = 0.05  # Longest acceptable time from cancel to job finished (s)
+WAV_HEADER_BYTES = 44
+
+
+class StubEngine(TranscriptionEngine):
+    """Sleeps in proportion to the clip and returns its length as text.
+
+    With hang set, a request sleeps that long regardless of cancellation,
+    as a request already on the wire would.
+    """
+
+    name = "stub"
+    remote = True
+    preferred_encoder = "wav"
+
+    def __init__(self, latency_per_second: float) -> None:
+        self.latency_per_second = latency_per_second
+        self.hang = 0.0
+        self.started = threading.Event()
+
+    def _transcribe(
+        self, audio: AudioInput, language: str, cancel: CancelToken | None = None
+    ) -> str:
+        data = audio if isinstance(audio, bytes) else audio.read()
+        seconds = (len(data) - WAV_HEADER_BYTES) / 2 / SAMPLE_RATE
+        self.started.set()
+        time.sleep(self.hang or seconds * self.latency_per_second)
+        return f"[{seconds:.2f}s]"
+
+
+def make_processor(
+    engine: TranscriptionEngine, sink: CollectingSink
+) -> DictationProcessor:
+    encoder_stage = EncoderStage("wav")
+    chunked = ChunkedTranscriber(engine, encoder_stage)
+    return DictationProcessor(engine, encoder_stage, chunked, output=sink.deliver)
+
+
+def check_order(args: argparse.Namespace) -> bool:
+    """Submit dictations longest first and check the output order."""
+    engine = StubEngine(args.latency_per_second)
+    sink = CollectingSink()
+    output_times: list[float] = []
+    done = threading.Semaphore(0)
+
+    def deliver(text: str) -> None:
+        output_times.append(time.perf_counter())
+        sink.deliver(text)
+
+    pipeline = DictationPipeline(
+        make_processor(RequestScheduler(engine), sink),
+        on_done=lambda job: done.release(),
+        output=deliver,
+        max_workers=args.dictations,
+        max_pending=args.dictations,
+    )
+    # Longest first, so later dictations finish earlier
+    lengths = [2.0 + i for i in range(args.dictations)][::-1]
+    jobs = []
+    for i, seconds in enumerate(lengths):
+        jobs.append(
+            pipeline.submit(synthetic_speech(seconds, seed=i), None, Trace())
+        )
+        time.sleep(args.gap)
+
+    refused = False
+    try:
+        pipeline.submit(synthetic_speech(1.0), None, Trace())
+    except PipelineFullError:
+        refused = True
+    for _ in jobs:
+        done.acquire()
+    pipeline.shutdown()
+
+    expected = [job.result.text for job in jobs]
+    print(f"{'dictation':>9} {'clip s':>7} {'state':>9} {'release to output ms':>21}")
+    for job, seconds, output_time in zip(jobs, lengths, output_times):
+        latency = output_time - job.trace.started
+        print(f"{job.id:>9} {seconds:>7.1f} {job.state:>9} {latency * 1000:>21.0f}")
+    in_order = sink.texts == expected
+    print(f"output in recording order: {'yes' if in_order else 'NO'}")
+    print(f"submission beyond max_pending refused: {'yes' if refused else 'NO'}")
+    return in_order and refused
+
+
+def check_cancel(args: argparse.Namespace) -> bool:
+    """Cancel a dictation whose request hangs and time how fast it finishes."""
+    engine = StubEngine(args.latency_per_second)
+    engine.hang = args.hang
+    sink = CollectingSink()
+    finished: dict[str, float] = {}
+    all_done = threading.Semaphore(0)
+
+    def on_done(job: DictationJob) -> None:
+        finished[job.id] = time.perf_counter()
+        all_done.release()
+
+    pipeline = DictationPipeline(
+        make_processor(RequestScheduler(engine), sink),
+        on_done=on_done,
+        output=sink.deliver,
+    )
+    stuck = pipeline.submit(synthetic_speech(2.0), None, Trace())
+    engine.started.wait()
+    engine.hang = 0.0
+    behind = pipeline.submit(synthetic_speech(1.0, seed=1), None, Trace())
+
+    cancelled_at = time.perf_counter()
+    pipeline.cancel_current()
+    all_done.acquire()
+    all_done.acquire()
+    pipeline.shutdown()
+
+    latency = finished[stuck.id] - cancelled_at
+    released = sink.texts == [behind.result.text]
+    print(
+        f"cancel with a {args.hang:g}s hung request: job {stuck.state} after "
+        f"{latency * 1000:.1f} ms; dictation behind it output: "
+        f"{'yes' if released else 'NO'}"
+    )
+    return stuck.result.cancelled and released and latency <= CANCEL_BUDGET
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dictations", type=int, default=4, help="Back-to-back dictations"
+    )
+    parser.add_argument(
+        "--latency-per-second",
+        type=float,
+        default=0.2,
+        help="Stub latency per second of audio",
+    )
+    parser.add_argument(
+        "--gap", type=float, default=0.05, help="Seconds between dictations"
+    )
+    parser.add_argument("--hang", type=float, default=5.0, help="Hung request (s)")
+    args = parser.parse_args()
+
+    get_logger().setLevel(logging.WARNING)
+    ok = check_order(args)
+    ok = check_cancel(args) and ok
+    if not ok:
+        print("Pipeline check failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Microbenchmark of StreamingRecorder's callback cost and stop() latency.
+
+Feeds synthetic PortAudio-sized blocks into the recorder callback (no audio
+device needed) and compares against the previous queue + np.concatenate
+implementation for 5 s, 60 s and 10 min recordings.
+
+Usage::
+
+    uv run python benchmarks/bench_recorder.py --blocksize 512
+"""
+
+import argparse
+import logging
+import queue
+import time
+
+import numpy as np
+
+from voice_input.logger import get_logger
+from voice_input.recorder import SAMPLE_RATE, StreamingRecorder
+
+
+class QueueRecorder:
+    """The previous implementation: copy + queue per block, concatenate on stop."""
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[np.ndarray] = queue.Queue()
+
+    def _audio_callback(self, indata, frames, time_info, status) -> None:
+        self._queue.put_nowait(indata.copy())
+
+    def stop(self) -> np.ndarray:
+        chunks = []
+        while True:
+            try:
+                chunks.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return np.concatenate(chunks, axis=0)
+
+
+class BufferRecorder(StreamingRecorder):
+    """StreamingRecorder driven directly, without opening a device."""
+
+    def __init__(self, blocksize: int) -> None:
+        super().__init__(blocksize=blocksize)
+        self._is_recording = True
+
+
+def run(recorder, blocks: int, block: np.ndarray) -> tuple[float, float, float]:
+    """Feed blocks into the recorder; return mean/p99 callback and stop() time."""
+    frames = len(block)
+    costs = np.empty(blocks)
+    for i in range(blocks):
+        start_time = time.perf_counter()
+        recorder._audio_callback(block, frames, None, None)
+        costs[i] = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    audio = recorder.stop()
+    stop_time = time.perf_counter() - start_time
+    assert len(audio) == blocks * frames
+    return costs.mean(), np.percentile(costs, 99), stop_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocksize", type=int, default=512, help="Frames per block")
+    parser.add_argument(
+        "--durations", type=float, nargs="+", default=[5.0, 60.0, 600.0]
+    )
+    args = parser.parse_args()
+
+    get_logger().setLevel(logging.WARNING)
+    block = np.random.default_rng(0).integers(
+        -3000, 3000, size=(args.blocksize, 1), dtype=np.int16
+    )
+    print(
+        f"{'duration':>8} {'impl':>7} {'cb mean us':>11} {'cb p99 us':>10} {'stop ms':>8}"
+    )
+    for duration in args.durations:
+        blocks = int(duration * SAMPLE_RATE / args.blocksize)
+        for name, recorder in (
+            ("queue", QueueRecorder()),
+            ("buffer", BufferRecorder(args.blocksize)),
+        ):
+            mean, p99, stop_time = run(recorder, blocks, block)
+            print(
+                f"{duration:>7.0f}s {name:>7} {mean * 1e6:>11.2f} "
+                f"{p99 * 1e6:>10.2f} {stop_time * 1000:>8.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
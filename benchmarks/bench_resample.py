@@ -0,0 +1,94 @@
+"""Accuracy and throughput of native-rate capture conversion.
+
+Feeds synthetic stereo tones at common device rates through
+resample.BlockConverter block by block, as the recorder's converter thread
+does, and compares the 16 kHz result with the ideal tone and with a one-shot
+scipy.signal.resample_poly of the whole clip. Reports SNR, the largest
+difference from resample_poly in int16 steps, per-block cost and throughput.
+
+Usage::
+
+    uv run python benchmarks/bench_resample.py --seconds 30 --blocksize 512
+"""
+
+import argparse
+import time
+from math import gcd
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from voice_input.recorder import SAMPLE_RATE
+from voice_input.resample import BlockConverter
+
+TONES = [(440.0, 6000.0), (3000.0, 3000.0)]  # (Hz, int16 amplitude)
+GAINS = (1.1, 0.9)  # Per channel, so a wrong channel mix shows up in the SNR
+EDGE_SECONDS = 0.05  # Filter start-up and tail, excluded from comparisons
+
+
+def tone(rate: int, seconds: float) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return sum(amplitude * np.sin(2 * np.pi * hz * t) for hz, amplitude in TONES)
+
+
+def stereo_clip(rate: int, seconds: float) -> np.ndarray:
+    """Same tones on both channels at slightly different gains."""
+    mono = tone(rate, seconds)
+    return np.stack([mono * gain for gain in GAINS], axis=1).round().astype(np.int16)
+
+
+def snr_db(signal: np.ndarray, reference: np.ndarray) -> float:
+    noise = signal - reference
+    return float(10 * np.log10(np.sum(reference**2) / max(np.sum(noise**2), 1e-12)))
+
+
+def run(rate: int, channels: int, args: argparse.Namespace) -> None:
+    clip = stereo_clip(rate, args.seconds)[:, :channels]
+    converter = BlockConverter(rate, channels)
+    costs = []
+    pieces = []
+    for start in range(0, len(clip), args.blocksize):
+        block = clip[start : start + args.blocksize]
+        start_time = time.perf_counter()
+        pieces.append(converter.convert(block))
+        costs.append(time.perf_counter() - start_time)
+    out = np.concatenate(pieces).astype(np.float64)
+
+    divisor = gcd(rate, SAMPLE_RATE)
+    one_shot = resample_poly(
+        clip[:, 0].astype(np.float64), SAMPLE_RATE // divisor, rate // divisor
+    )[: len(out)]
+    # The converter keeps the first channel, i.e. the tone at its gain
+    ideal = GAINS[0] * tone(SAMPLE_RATE, args.seconds)[: len(out)]
+    edge = int(EDGE_SECONDS * SAMPLE_RATE)
+    inner = slice(edge, len(out) - edge)
+
+    throughput = args.seconds / sum(costs)
+    print(
+        f"{rate:>6} {channels:>3} {snr_db(out[inner], ideal[inner]):>8.1f} "
+        f"{np.max(np.abs(out[inner] - one_shot[inner])):>9.2f} "
+        f"{np.mean(costs) * 1e6:>9.1f} {np.percentile(costs, 99) * 1e6:>9.1f} "
+        f"{throughput:>8.0f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--blocksize", type=int, default=512, help="Frames per block")
+    parser.add_argument(
+        "--rates", type=int, nargs="+", default=[16000, 22050, 44100, 48000, 96000]
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'rate':>6} {'ch':>3} {'SNR dB':>8} {'max diff':>9} "
+        f"{'mean us':>9} {'p99 us':>9} {'speed':>9}"
+    )
+    for rate in args.rates:
+        for channels in (1, 2):
+            run(rate, channels, args)
+
+
+if __name__ == "__main__":
+    main()
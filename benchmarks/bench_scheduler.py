@@ -0,0 +1,92 @@
+"""Measure tail latency with and without request hedging and retries.
+
+Sends a series of short transcriptions through RequestScheduler to a stub
+server that makes some requests slow (tail latency) and answers some with
+429, and reports latency percentiles, failures and the extra calls spent on
+hedging.
+
+Usage::
+
+    uv run python benchmarks/bench_scheduler.py --requests 200 --tail-rate 0.05 --error-rate 0.05
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+from bench_encoders import synthetic_speech
+from stub_server import StubWhisperServer
+
+from voice_input.encoder import EncoderStage
+from voice_input.logger import get_logger
+from voice_input.scheduler import RequestScheduler, RetryPolicy
+from voice_input.transcriber import TranscriptionClient
+
+
+def run(server: StubWhisperServer, args: argparse.Namespace, hedge_percent: float) -> None:
+    client = TranscriptionClient(api_key="stub", base_url=server.base_url, max_retries=0)
+    scheduler = RequestScheduler(
+        client,
+        requests_per_minute=60_000,  # The stub has no rate limit of its own
+        retry=RetryPolicy(backoff_base=0.05, deadline=args.deadline),
+        hedge_percent=hedge_percent,
+    )
+    stage = EncoderStage("flac")
+    audio = synthetic_speech(args.seconds)
+    requests_before = server.request_count
+    latencies = []
+    failures = 0
+    for _ in range(args.requests):
+        encoded = stage.encode(audio)
+        start_time = time.perf_counter()
+        try:
+            scheduler.transcribe(encoded.buffer)
+            latencies.append(time.perf_counter() - start_time)
+        except Exception:
+            failures += 1
+        finally:
+            encoded.release()
+    scheduler.close()
+    stage.shutdown()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    budget = scheduler.hedge_budget
+    extra = (server.request_count - requests_before) / args.requests - 1
+    print(
+        f"{hedge_percent:>6.0f}% {p50:>7.3f} {p95:>7.3f} {p99:>7.3f} {failures:>8} "
+        f"{budget.hedges:>7} {extra:>8.1%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Clip length")
+    parser.add_argument("--latency", type=float, default=0.2, help="Normal latency (s)")
+    parser.add_argument("--tail-rate", type=float, default=0.05)
+    parser.add_argument("--tail-latency", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Fraction of 429s")
+    parser.add_argument("--deadline", type=float, default=30.0)
+    parser.add_argument(
+        "--hedge-percents", type=float, nargs="+", default=[0.0, 5.0, 10.0]
+    )
+    args = parser.parse_args()
+
+    get_logger().setLevel(logging.ERROR)
+    print(
+        f"{'hedge':>7} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'failures':>8} "
+        f"{'hedges':>7} {'extra':>8}"
+    )
+    for hedge_percent in args.hedge_percents:
+        with StubWhisperServer(
+            latency=args.latency,
+            tail_rate=args.tail_rate,
+            tail_latency=args.tail_latency,
+            error_rate=args.error_rate,
+        ) as server:
+            run(server, args, hedge_percent)
+
+
+if __name__ == "__main__":
+    main()
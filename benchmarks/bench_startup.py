@@ -0,0 +1,115 @@
+"""Startup cost of the CLI and menu bar app: import time and idle RSS.
+
+Imports each entry point module in a fresh interpreter with ``-X importtime``
+and reports its total import time, the slowest packages it pulls in and the
+peak RSS after importing. Fails (exit status 1) if an import exceeds
+--max-import-ms, RSS exceeds --max-rss-mb, or a module that should load
+lazily (see LAZY_MODULES) is imported at startup, so it can gate
+regressions in CI. tests/test_startup.py runs the RSS and lazy-import checks
+under pytest; the import time budget is machine-dependent and is only
+enforced here.
+
+Usage::
+
+    uv run python benchmarks/bench_startup.py --max-import-ms 250 --max-rss-mb 80
+"""
+
+import argparse
+import subprocess
+import sys
+
+ENTRY_POINTS = ["voice_input.main", "voice_input.app"]
+MAX_IMPORT_MS = 250.0  # Default budget for importing an entry point
+MAX_RSS_MB = 80.0  # Default budget for peak RSS after importing it
+# Loaded on first use or by the app's background warm-up, never at import
+LAZY_MODULES = ["openai", "httpx", "sounddevice", "pyperclip", "scipy", "soundfile"]
+
+PROBE = """
+import resource, sys
+import {module}
+try:
+    # Linux keeps ru_maxrss across exec, so a large parent (e.g. pytest)
+    # would be counted; the peak of this process's own memory is VmHWM
+    with open("/proc/self/status") as f:
+        hwm = next(line for line in f if line.startswith("VmHWM:"))
+    rss = int(hwm.split()[1]) * 1024
+except OSError:
+    # ru_maxrss is in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(rss)
+print(",".join(name for name in {lazy!r} if name in sys.modules))
+"""
+
+
+def profile(module: str) -> dict | None:
+    """Import module in a fresh interpreter; None if it can't be imported here."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            PROBE.format(module=module, lazy=LAZY_MODULES),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+
+    packages = []
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[12:].split("|")
+        # Nested imports are indented by two spaces per level
+        nested = name.startswith("  ")
+        name = name.strip()
+        if not nested and name.startswith("voice_input"):
+            total += int(cumulative)
+        elif nested and "." not in name and not name.startswith("_"):
+            # Breakdown by package (first import of each, including children)
+            packages.append((int(cumulative), name))
+    rss, loaded = result.stdout.splitlines()[-2:]
+    return {
+        "total_ms": total / 1000,
+        "rss_mb": int(rss) / 1024 / 1024,
+        "slowest": sorted(packages, reverse=True),
+        "eager": [name for name in loaded.split(",") if name],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-import-ms", type=float, default=MAX_IMPORT_MS)
+    parser.add_argument("--max-rss-mb", type=float, default=MAX_RSS_MB)
+    parser.add_argument("--top", type=int, default=10, help="Packages listed per module")
+    args = parser.parse_args()
+
+    failed = False
+    for module in ENTRY_POINTS:
+        report = profile(module)
+        if report is None:
+            print(f"{module}: not importable here (missing dependency), skipped")
+            continue
+        print(
+            f"{module}: import {report['total_ms']:.0f} ms, "
+            f"RSS {report['rss_mb']:.1f} MB"
+        )
+        for cumulative, name in report["slowest"][: args.top]:
+            print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+        if report["eager"]:
+            print(f"  imported eagerly: {', '.join(report['eager'])}")
+            failed = True
+        if report["total_ms"] > args.max_import_ms:
+            print(f"  import time over {args.max_import_ms:g} ms")
+            failed = True
+        if report["rss_mb"] > args.max_rss_mb:
+            print(f"  RSS over {args.max_rss_mb:g} MB")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
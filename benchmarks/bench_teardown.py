@@ -0,0 +1,101 @@
+"""stop() latency when the input stream's teardown hangs.
+
+Records back to back from a file-backed fake device
+(fake_device.FileInputStream) whose abort() hangs for --hang seconds while
+blocks keep arriving, as from a stuck device. Runs twice: with a 16 kHz
+mono device, and with a 48 kHz stereo one captured at its native rate
+(the app default), whose blocks go through the converter thread. stop()
+should return within STOP_BUDGET regardless, each recording should contain
+only its own audio (no blocks from a stream still being torn down), and
+every retired stream should eventually be closed by the reaper. Reports
+stop() latency and the reaper's counts, and exits with status 1 if a check
+fails.
+
+Usage::
+
+    uv run python benchmarks/bench_teardown.py --hang 1.5 --repeat 3
+"""
+
+import argparse
+import functools
+import logging
+import sys
+import time
+import types
+
+import numpy as np
+from bench_encoders import synthetic_speech
+from fake_device import FileInputStream
+from scipy.signal import resample_poly
+
+import voice_input.recorder as recorder_module
+from voice_input.logger import get_logger
+from voice_input.recorder import SAMPLE_RATE, StreamingRecorder
+
+STOP_BUDGET = 0.005  # Longest acceptable stop() (s)
+EXTRA_SECONDS = 0.1  # Audio a recording may have beyond the key hold (blocks)
+NATIVE_RATE = 48000  # Rate of the fake device in the native-rate case
+NATIVE_CHANNELS = 2
+
+
+def check(args: argparse.Namespace, native_rate: bool) -> bool:
+    """Record back to back from a hanging device and check stop()."""
+    source = synthetic_speech(10.0)
+    rate, channels = SAMPLE_RATE, 1
+    if native_rate:
+        rate, channels = NATIVE_RATE, NATIVE_CHANNELS
+        source = resample_poly(source, rate // SAMPLE_RATE, 1).astype(np.int16)
+    recorder_module.sd = types.SimpleNamespace(
+        InputStream=functools.partial(
+            FileInputStream, source=source, abort_latency=args.hang
+        ),
+        query_devices=lambda kind: {
+            "default_samplerate": rate,
+            "max_input_channels": channels,
+        },
+    )
+    recorder = StreamingRecorder(blocksize=args.blocksize, native_rate=native_rate)
+
+    stop_times = []
+    overlong = 0
+    for _ in range(args.repeat):
+        # Start right away: the previous stream is still hanging in abort()
+        recorder.start()
+        time.sleep(args.hold)
+        start_time = time.perf_counter()
+        audio = recorder.stop()
+        stop_times.append(time.perf_counter() - start_time)
+        if len(audio) > (args.hold + EXTRA_SECONDS) * SAMPLE_RATE:
+            overlong += 1
+    pending = recorder.reaper.pending
+    all_closed = recorder.reaper.wait(timeout=args.hang * args.repeat + 5.0)
+
+    p50 = np.percentile(stop_times, 50) * 1000
+    print(f"{rate} Hz, {channels} ch{' (native rate)' if native_rate else ''}:")
+    print(f"  stop() p50 {p50:.2f} ms, max {max(stop_times) * 1000:.2f} ms")
+    print(
+        f"  reaper: {pending} streams pending after the last stop, "
+        f"{recorder.reaper.hung} hung, {recorder.reaper.reaped} closed"
+    )
+    print(f"  recordings with audio from a retired stream: {overlong}")
+    return max(stop_times) <= STOP_BUDGET and not overlong and all_closed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hang", type=float, default=1.5, help="abort() hangs (s)")
+    parser.add_argument("--repeat", type=int, default=3, help="Recordings")
+    parser.add_argument("--hold", type=float, default=0.5, help="Key held (s)")
+    parser.add_argument("--blocksize", type=int, default=512)
+    args = parser.parse_args()
+
+    get_logger().setLevel(logging.ERROR)
+    ok = check(args, native_rate=False)
+    ok = check(args, native_rate=True) and ok
+    if not ok:
+        print("Teardown check failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
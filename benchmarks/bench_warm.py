@@ -0,0 +1,130 @@
+"""Cold vs warm input stream: hotkey-path latency and idle cost.
+
+Records from a file-backed fake device (fake_device.FileInputStream) that
+takes --open-latency seconds to open, like a real audio device. Cold mode
+opens and closes the stream on every start()/stop(); warm mode keeps it
+open with a pre-roll ring. Reports start()/stop() latency, how much audio
+from before the key press each recording contains, and in warm mode the
+idle CPU used by the callback and the memory it holds, checked against the
+budgets below (exits with status 1 if one is exceeded).
+
+Usage::
+
+    uv run python benchmarks/bench_warm.py --open-latency 0.05 --idle 5
+"""
+
+import argparse
+import functools
+import logging
+import sys
+import time
+import tracemalloc
+import types
+
+import numpy as np
+from bench_encoders import synthetic_speech
+from fake_device import FileInputStream
+
+import voice_input.recorder as recorder_module
+from voice_input.logger import get_logger
+from voice_input.recorder import SAMPLE_RATE, StreamingRecorder
+
+IDLE_CPU_BUDGET = 0.01  # Fraction of one core spent in the callback while idle
+IDLE_MEMORY_BUDGET = 64 * 1024  # Bytes held while idle (pre-roll ring)
+
+
+class TimedRecorder(StreamingRecorder):
+    """Adds up the time spent in the audio callback."""
+
+    callback_seconds = 0.0
+
+    def _audio_callback(self, indata, frames, time_info, status) -> None:
+        start_time = time.perf_counter()
+        super()._audio_callback(indata, frames, time_info, status)
+        self.callback_seconds += time.perf_counter() - start_time
+
+
+def measure_idle(recorder: TimedRecorder, idle: float) -> tuple[float, int]:
+    """Return (callback CPU fraction, bytes allocated by the recorder) while idle."""
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    recorder.callback_seconds = 0.0
+    time.sleep(idle)
+    cpu = recorder.callback_seconds / idle
+    filters = [tracemalloc.Filter(True, recorder_module.__file__)]
+    growth = sum(
+        stat.size_diff
+        for stat in tracemalloc.take_snapshot()
+        .filter_traces(filters)
+        .compare_to(snapshot.filter_traces(filters), "filename")
+    )
+    tracemalloc.stop()
+    return cpu, max(0, growth) + recorder.preroll_nbytes
+
+
+def run(recorder: StreamingRecorder, args: argparse.Namespace) -> dict[str, float]:
+    start_times, stop_times, prerolls = [], [], []
+    for _ in range(args.repeat):
+        time.sleep(args.gap)
+        start_time = time.perf_counter()
+        recorder.start()
+        start_times.append(time.perf_counter() - start_time)
+
+        time.sleep(args.hold)
+        release_time = time.perf_counter()
+        audio = recorder.stop()
+        stop_times.append(time.perf_counter() - release_time)
+        # Audio beyond what was captured while the key was held
+        prerolls.append(len(audio) / SAMPLE_RATE - (release_time - start_time))
+    return {
+        "start": float(np.median(start_times)),
+        "stop": float(np.median(stop_times)),
+        "preroll": max(0.0, float(np.median(prerolls))),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--open-latency", type=float, default=0.05, help="Device open time (s)"
+    )
+    parser.add_argument("--blocksize", type=int, default=512)
+    parser.add_argument("--idle", type=float, default=5.0, help="Idle seconds measured")
+    parser.add_argument("--repeat", type=int, default=10, help="Recordings per mode")
+    parser.add_argument("--hold", type=float, default=1.0, help="Key held (s)")
+    parser.add_argument("--gap", type=float, default=0.5, help="Pause between recordings")
+    args = parser.parse_args()
+
+    get_logger().setLevel(logging.WARNING)
+    recorder_module.sd = types.SimpleNamespace(
+        InputStream=functools.partial(
+            FileInputStream,
+            source=synthetic_speech(10.0),
+            open_latency=args.open_latency,
+        )
+    )
+
+    cold = run(TimedRecorder(blocksize=args.blocksize), args)
+    warm_recorder = TimedRecorder(blocksize=args.blocksize, warm=True)
+    warm_recorder.open()
+    idle_cpu, idle_memory = measure_idle(warm_recorder, args.idle)
+    warm = run(warm_recorder, args)
+    warm_recorder.close()
+
+    print(f"{'mode':>5} {'start ms':>9} {'stop ms':>8} {'pre-roll ms':>12}")
+    for name, result in (("cold", cold), ("warm", warm)):
+        print(
+            f"{name:>5} {result['start'] * 1000:>9.2f} {result['stop'] * 1000:>8.2f} "
+            f"{result['preroll'] * 1000:>12.0f}"
+        )
+    print(
+        f"warm idle: callback CPU {idle_cpu:.3%} (budget {IDLE_CPU_BUDGET:.0%}), "
+        f"memory {idle_memory / 1024:.1f} KB (budget {IDLE_MEMORY_BUDGET // 1024} KB)"
+    )
+    if idle_cpu > IDLE_CPU_BUDGET or idle_memory > IDLE_MEMORY_BUDGET:
+        print("Idle budget exceeded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
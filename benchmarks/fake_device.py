@@ -0,0 +1,95 @@
+"""File-backed stand-in for sounddevice.InputStream.
+
+Plays a WAV file (or an int16 array) to the stream callback from a thread
+at the real sample rate, looping, like a microphone would. Opening can be
+given a delay to emulate the device-open cost of a real input stream, and
+aborting one to emulate a device whose teardown hangs.
+
+Usage::
+
+    recorder_module.sd = types.SimpleNamespace(
+        InputStream=functools.partial(FileInputStream, source="speech.wav")
+    )
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.io import wavfile
+
+
+class FileInputStream:
+    """Delivers audio from a file in real time, block by block."""
+
+    def __init__(
+        self,
+        callback,
+        source: str | Path | np.ndarray,
+        blocksize: int = 0,
+        samplerate: int = 16000,
+        channels: int = 1,
+        open_latency: float = 0.0,
+        abort_latency: float = 0.0,
+        **kwargs: object,
+    ) -> None:
+        """Initialize the stream.
+
+        Args:
+            callback: sounddevice-style callback(indata, frames, time, status).
+            source: WAV file path (int16 mono) or int16 samples.
+            blocksize: Frames per callback (0: 10 ms).
+            samplerate: Rate at which blocks are delivered.
+            channels: Channels delivered (each a copy of the source).
+            open_latency: Seconds spent "opening the device" here.
+            abort_latency: Seconds abort() hangs before stopping (blocks
+                keep arriving meanwhile, as from a stuck device).
+        """
+        if isinstance(source, np.ndarray):
+            samples = source
+        else:
+            _, samples = wavfile.read(source)
+        samples = np.ascontiguousarray(samples, dtype=np.int16).reshape(-1, 1)
+        self._samples = np.repeat(samples, channels, axis=1)
+        self._callback = callback
+        self._blocksize = blocksize or samplerate // 100
+        self._interval = self._blocksize / samplerate
+        self._running = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._abort_latency = abort_latency
+        time.sleep(open_latency)
+
+    def _run(self) -> None:
+        position = 0
+        next_time = time.perf_counter()
+        while self._running.is_set():
+            end = position + self._blocksize
+            block = self._samples.take(range(position, end), axis=0, mode="wrap")
+            position = end % len(self._samples)
+            self._callback(block, len(block), None, None)
+            next_time += self._interval
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+
+    def start(self) -> None:
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _halt(self) -> None:
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join()
+
+    def abort(self) -> None:
+        time.sleep(self._abort_latency)
+        self._halt()
+
+    stop = abort
+
+    def close(self) -> None:
+        self._halt()
+
+    @property
+    def active(self) -> bool:
+        return self._running.is_set()
@@ -0,0 +1,190 @@
+"""Local stub of the OpenAI Whisper API for benchmarks.
+
+Emulates ``POST /v1/audio/transcriptions`` and ``GET /v1/models/{id}`` with
+configurable server latency (fixed and per audio second) and upload bandwidth,
+so the effect of client-side changes (connection reuse, compression, chunking)
+can be measured without network access or API costs. Slow tail requests and
+429 rate-limit responses can be injected to exercise retries and hedging.
+
+Usage::
+
+    with StubWhisperServer(latency=0.5, bandwidth=250_000) as server:
+        client = TranscriptionClient(api_key="stub", base_url=server.base_url)
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+READ_CHUNK = 4096
+WAV_BYTES_PER_SECOND = 32000  # 16 kHz int16 mono, used to estimate clip length
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """Doesn't print tracebacks when a client hangs up (e.g. a losing hedge)."""
+
+    def handle_error(self, request: object, client_address: object) -> None:
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubWhisperServer:
+    """Threaded HTTP server emulating the Whisper transcription endpoint."""
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        bandwidth: float | None = None,
+        text: str = "スタブの文字起こし結果です。",
+        latency_per_second: float = 0.0,
+        tail_rate: float = 0.0,
+        tail_latency: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float | None = None,
+        fail_first: int = 0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the stub server.
+
+        Args:
+            latency: Seconds of simulated inference time per request.
+            bandwidth: Simulated upload bandwidth in bytes per second.
+                None means unlimited.
+            text: Transcription returned for every request.
+            latency_per_second: Extra inference seconds per second of audio,
+                estimated from the upload size as 16 kHz int16 WAV.
+            tail_rate: Fraction of requests that take tail_latency extra.
+            tail_latency: Extra seconds for tail requests.
+            error_rate: Fraction of requests answered with 429.
+            retry_after: Retry-After header (seconds) sent with 429s.
+            fail_first: Number of initial requests answered with 429,
+                regardless of error_rate.
+            seed: Seed for choosing tail and failing requests.
+        """
+        self.latency = latency
+        self.latency_per_second = latency_per_second
+        self.bandwidth = bandwidth
+        self.text = text
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.fail_first = fail_first
+        self.request_count = 0
+        self.connection_count = 0  # TCP connections accepted
+        self.model_count = 0  # GET /models requests (e.g. preconnects)
+        self.bytes_received = 0
+        self.error_count = 0
+        self.tail_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _QuietHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Return the base URL to pass to TranscriptionClient."""
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+            def setup(self) -> None:
+                # One handler per connection; keep-alive requests reuse it
+                super().setup()
+                with stub._lock:
+                    stub.connection_count += 1
+
+            def _send_json(
+                self, body: dict, status: int = 200, headers: dict | None = None
+            ) -> None:
+                payload = json.dumps(body, ensure_ascii=False).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _read_body(self) -> int:
+                remaining = int(self.headers.get("Content-Length", 0))
+                total = remaining
+                start_time = time.perf_counter()
+                while remaining > 0:
+                    chunk = self.rfile.read(min(READ_CHUNK, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    if stub.bandwidth:
+                        expected = (total - remaining) / stub.bandwidth
+                        delay = expected - (time.perf_counter() - start_time)
+                        if delay > 0:
+                            time.sleep(delay)
+                return total
+
+            def do_GET(self) -> None:
+                model = self.path.rstrip("/").rsplit("/", 1)[-1]
+                with stub._lock:
+                    stub.model_count += 1
+                self._send_json(
+                    {"id": model, "object": "model", "created": 0, "owned_by": "stub"}
+                )
+
+            def do_POST(self) -> None:
+                size = self._read_body()
+                with stub._lock:
+                    stub.request_count += 1
+                    stub.bytes_received += size
+                    fail = (
+                        stub.request_count <= stub.fail_first
+                        or stub._random.random() < stub.error_rate
+                    )
+                    tail = not fail and stub._random.random() < stub.tail_rate
+                    stub.error_count += fail
+                    stub.tail_count += tail
+                if fail:
+                    headers = {}
+                    if stub.retry_after is not None:
+                        headers["Retry-After"] = f"{stub.retry_after:g}"
+                    self._send_json(
+                        {"error": {"message": "Rate limit reached", "type": "requests"}},
+                        status=429,
+                        headers=headers,
+                    )
+                    return
+                audio_seconds = size / WAV_BYTES_PER_SECOND
+                delay = stub.latency + stub.latency_per_second * audio_seconds
+                if tail:
+                    delay += stub.tail_latency
+                time.sleep(delay)
+                self._send_json({"text": stub.text})
+
+        return Handler
+
+    def start(self) -> "StubWhisperServer":
+        """Start serving on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubWhisperServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
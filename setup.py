@@ -25,12 +25,17 @@ OPTIONS = {
         "openai",
         "pyperclip",
         "dotenv",
+        "soundfile",
+        # Used by the paste helper (the app's executable run with --paste-helper)
+        "AppKit",
+        "Quartz",
     ],
     "includes": [
         "voice_input",
         "voice_input.transcriber",
         "voice_input.recorder",
         "voice_input.output",
+        "voice_input.paste_helper",
         "voice_input.hotkey",
         "voice_input.config",
     ],
@@ -1,28 +1,83 @@
 """Mac menu bar application for voice input."""
 
-import queue
+import importlib
 import threading
+import time
+from collections import deque
+from pathlib import Path
 
-import numpy as np
 import rumps
-
+from PyObjCTools import AppHelper
+
+from .cache import create_cache
+from .chunking import (
+    CHUNK_SECONDS,
+    LONG_FORM_THRESHOLD,
+    MAX_WORKERS,
+    ChunkedTranscriber,
+)
 from .config import load_config, save_config
+from .dictation import DictationProcessor
+from .encoder import EncoderStage
+from .engine import (
+    DEFAULT_ENGINE,
+    ENGINE_NAMES,
+    EngineUnavailableError,
+    TranscriptionEngine,
+    create_engine,
+)
+from .events import (
+    DictationRecovered,
+    DictationTraced,
+    ErrorOccurred,
+    EventDispatcher,
+    StartRecording,
+    StatusChanged,
+    StopRecording,
+    TranscriptCopied,
+)
 from .hotkey import HOTKEY_NAMES, HotkeyListener
 from .logger import get_logger
-from .output import output_text
-from .recorder import SAMPLE_RATE, StreamingRecorder, save_audio
-from .transcriber import transcribe
+from .output import copy_to_clipboard, create_output_sink
+from .pauses import COLLAPSED_PAUSE_SECONDS, MAX_PAUSE_SECONDS
+from .pipeline import (
+    JOB_DEADLINE,
+    MAX_PENDING,
+    DictationJob,
+    DictationPipeline,
+    PipelineFullError,
+)
+from .pipeline import (
+    MAX_WORKERS as DICTATION_WORKERS,
+)
+from .recorder import (
+    INPUT_CHANNEL,
+    MAX_MEMORY_SECONDS,
+    MAX_RECORDING_SECONDS,
+    PREROLL_SECONDS,
+    SAMPLE_RATE,
+    StreamingRecorder,
+)
+from .spool import Spool, SpoolDrainer, SpoolJob
+from .streaming import SpeculativeTranscriber, StreamingSession
+from .tracing import Tracer
 
 logger = get_logger()
 
-# Minimum recording duration in seconds
-MIN_RECORDING_SECONDS = 0.3
-
-# Minimum RMS (root mean square) amplitude to consider as speech
+# Minimum per-frame RMS (root mean square) amplitude to consider as speech
 # int16 audio ranges from -32768 to 32767
-# This threshold filters out silence and very quiet recordings
+# Recordings without any speech frames (see vad.detect_speech) are skipped
 MIN_RMS_THRESHOLD = 100
 
+# Imported on a background thread once the menu bar is up, so neither
+# startup nor the first dictation pays for them
+PRELOAD_MODULES = ("sounddevice", "pyperclip", "soundfile")
+REMOTE_PRELOAD_MODULES = ("httpx", "openai")
+
+# Recovered dictations listed in the menu
+RECOVERED_ITEMS = 10
+RECOVERED_LABEL_CHARS = 40
+
 
 class VoiceInputApp(rumps.App):
     """Mac menu bar application for voice input using Whisper API."""
@@ -40,13 +95,94 @@ class VoiceInputApp(rumps.App):
         self._current_hotkey = self._config.get("hotkey", "ctrl_l")
         self._rms_threshold = self._config.get("rms_threshold", MIN_RMS_THRESHOLD)
 
-        self.recorder = StreamingRecorder()
-        self._event_queue: queue.Queue[str] = queue.Queue()
+        self.recorder = StreamingRecorder(
+            blocksize=self._config.get("blocksize", 0),
+            latency=self._config.get("latency", "high"),
+            warm=self._config.get("warm_input", False),
+            preroll_seconds=self._config.get("preroll_seconds", PREROLL_SECONDS),
+            native_rate=self._config.get("native_rate", True),
+            input_channel=self._config.get("input_channel", INPUT_CHANNEL),
+            max_memory_seconds=self._config.get(
+                "max_memory_seconds", MAX_MEMORY_SECONDS
+            ),
+            max_seconds=self._config.get(
+                "max_recording_seconds", MAX_RECORDING_SECONDS
+            ),
+        )
+        self.encoder_stage = EncoderStage(self._config.get("encoder", "flac"))
+        # Shared by all engines so switching engines keeps the memory tier
+        self.cache = create_cache(self._config)
+        self.transcriber = self._create_engine(self._config.get("engine", DEFAULT_ENGINE))
+        self._long_form_threshold = self._config.get(
+            "long_form_threshold", LONG_FORM_THRESHOLD
+        )
+        self.chunked_transcriber = ChunkedTranscriber(
+            self.transcriber,
+            self.encoder_stage,
+            chunk_seconds=self._config.get("chunk_seconds", CHUNK_SECONDS),
+            max_workers=self._config.get("max_parallel_requests", MAX_WORKERS),
+        )
+        self._streaming = self._config.get("streaming", False)
+        self.speculative_transcriber = SpeculativeTranscriber(
+            self.transcriber, self.encoder_stage
+        )
+        self._session: StreamingSession | None = None
+
+        # Dictations that fail to transcribe are kept on disk and retried
+        self.spool = Spool()
+        self.spool_drainer = SpoolDrainer(
+            self.spool,
+            self._transcribe_spooled,
+            self._on_spooled_result,
+            is_network_error=self._is_network_error,
+        )
+        self._recovered: deque[str] = deque(maxlen=RECOVERED_ITEMS)
+
+        # Per-stage latency of each dictation, shown in the menu
+        self.tracer = Tracer(enabled=self._config.get("tracing", True))
+
+        # Pastes through a long-lived helper process (started in _warm_up)
+        self.output_sink = create_output_sink(self._config.get("output", "paste"))
+
+        self.processor = DictationProcessor(
+            self.transcriber,
+            self.encoder_stage,
+            self.chunked_transcriber,
+            spool=self.spool,
+            output=self.output_sink.deliver,
+            rms_threshold=self._rms_threshold,
+            long_form_threshold=self._long_form_threshold,
+            incremental=self._config.get("incremental_output", False),
+            collapse=self._config.get("collapse_pauses", False),
+            max_pause_seconds=self._config.get(
+                "max_pause_seconds", MAX_PAUSE_SECONDS
+            ),
+            collapsed_pause_seconds=self._config.get(
+                "collapsed_pause_seconds", COLLAPSED_PAUSE_SECONDS
+            ),
+            debug=debug,
+        )
+        # Dictations run on a bounded pool; their text is pasted in order
+        self.pipeline = DictationPipeline(
+            self.processor,
+            self._on_dictation_done,
+            output=self.output_sink.deliver,
+            max_workers=self._config.get("dictation_workers", DICTATION_WORKERS),
+            max_pending=self._config.get("max_pending_dictations", MAX_PENDING),
+            deadline=self._config.get("dictation_deadline", JOB_DEADLINE),
+        )
+        # Background threads post events; handlers run on the main thread,
+        # which is woken only when something is posted
+        self.events = EventDispatcher(
+            wakeup=lambda: AppHelper.callAfter(self.events.dispatch_pending)
+        )
 
         self.hotkey_listener = HotkeyListener(
-            on_press=lambda: self._event_queue.put("start"),
-            on_release=lambda: self._event_queue.put("stop"),
+            on_press=lambda: self.events.post(StartRecording()),
+            on_release=lambda: self.events.post(StopRecording()),
             hotkey=self._current_hotkey,
+            # Open the API connection while the user is still speaking
+            on_warmup=lambda: self.transcriber.preconnect(),
         )
 
         # Menu items
@@ -63,13 +199,45 @@ class VoiceInputApp(rumps.App):
             self._hotkey_items[key_id] = item
             self.hotkey_menu.add(item)
 
+        self.streaming_item = rumps.MenuItem(
+            "Streaming Mode", callback=self._on_streaming_toggled
+        )
+        self.streaming_item.state = int(self._streaming)
+
+        # Engine submenu
+        self.engine_menu = rumps.MenuItem("Engine")
+        self._engine_items = {}
+        for engine_id, engine_name in ENGINE_NAMES.items():
+            item = rumps.MenuItem(engine_name, callback=self._on_engine_selected)
+            item.engine_id = engine_id  # Store engine_id for callback
+            if engine_id == self.transcriber.name:
+                item.state = 1  # Checkmark
+            self._engine_items[engine_id] = item
+            self.engine_menu.add(item)
+
+        # Recovered dictations submenu (click to copy again)
+        self.recovered_menu = rumps.MenuItem("Recovered")
+        self.recovered_menu.add(rumps.MenuItem("No recovered dictations"))
+
+        self.last_dictation_item = rumps.MenuItem("Last dictation: -")
+        self.cancel_item = rumps.MenuItem(
+            "Cancel Current Dictation", callback=self._on_cancel_selected
+        )
+
         self.menu = [
             self.status_item,
+            self.last_dictation_item,
+            self.cancel_item,
             None,  # Separator
             self.hotkey_menu,
+            self.engine_menu,
+            self.streaming_item,
+            self.recovered_menu,
             rumps.MenuItem("Language: Japanese"),
         ]
 
+        self._register_event_handlers()
+
     def _on_hotkey_selected(self, sender: rumps.MenuItem) -> None:
         """Handle hotkey selection from menu."""
         key_id = sender.key_id
@@ -87,123 +255,277 @@ class VoiceInputApp(rumps.App):
         self._config["hotkey"] = key_id
         save_config(self._config)
 
-    @rumps.timer(0.05)
-    def _check_events(self, _sender: object) -> None:
-        """Poll for hotkey events from the queue."""
+    def _create_engine(self, name: str) -> TranscriptionEngine:
+        """Create the transcription engine, falling back to the API engine."""
+        try:
+            engine = create_engine(name, self._config, self.cache)
+        except EngineUnavailableError as e:
+            logger.warning("App: %s; using %s engine", e, DEFAULT_ENGINE)
+            engine = create_engine(DEFAULT_ENGINE, self._config, self.cache)
+        self._apply_encoder(engine)
+        return engine
+
+    def _apply_encoder(self, engine: TranscriptionEngine) -> None:
+        """Use the engine's preferred encoder, or the configured one."""
+        self.encoder_stage.set_encoder(
+            engine.preferred_encoder or self._config.get("encoder", "flac")
+        )
+
+    def _on_engine_selected(self, sender: rumps.MenuItem) -> None:
+        """Handle engine selection from menu."""
+        engine_id = sender.engine_id
+        if engine_id == self.transcriber.name:
+            return
+
         try:
-            while True:
-                event = self._event_queue.get_nowait()
-                if event == "start":
-                    self._start_recording()
-                elif event == "stop":
-                    self._stop_recording()
-                elif event.startswith("status:"):
-                    status = event[7:]
-                    self.title = "Voice Input"
-                    self.status_item.title = f"Status: {status}"
-                elif event.startswith("error:"):
-                    message = event[6:]
-                    self.title = "Voice Input"
-                    self.status_item.title = "Status: Error"
-                    rumps.notification(
-                        title="Voice Input Error",
-                        subtitle="",
-                        message=message,
-                    )
-        except queue.Empty:
-            pass
+            engine = create_engine(engine_id, self._config, self.cache)
+        except EngineUnavailableError as e:
+            logger.warning("App: %s", e)
+            rumps.notification(title="Voice Input Error", subtitle="", message=str(e))
+            return
+
+        # Update checkmarks
+        for item in self._engine_items.values():
+            item.state = 0
+        sender.state = 1
+
+        old_engine, self.transcriber = self.transcriber, engine
+        self._apply_encoder(engine)
+        self.chunked_transcriber.set_engine(engine)
+        self.processor.set_engine(engine)
+        self.speculative_transcriber.set_engine(engine)
+        old_engine.close()
+        logger.info("App: Engine changed to %s", engine_id)
+
+        # Save config
+        self._config["engine"] = engine_id
+        save_config(self._config)
+
+    def _on_streaming_toggled(self, sender: rumps.MenuItem) -> None:
+        """Toggle transcribing segments while the hotkey is still held."""
+        self._streaming = not self._streaming
+        sender.state = int(self._streaming)
+
+        # Save config
+        self._config["streaming"] = self._streaming
+        save_config(self._config)
+
+    def _register_event_handlers(self) -> None:
+        """Route events posted by background threads to UI-thread handlers."""
+        self.events.register(StartRecording, lambda _event: self._start_recording())
+        self.events.register(StopRecording, lambda _event: self._stop_recording())
+        self.events.register(StatusChanged, self._show_status)
+        self.events.register(ErrorOccurred, self._show_error)
+        self.events.register(
+            DictationRecovered, lambda event: self._show_recovered(event.text)
+        )
+        self.events.register(DictationTraced, self._show_trace)
+        self.events.register(TranscriptCopied, self._show_copied)
+
+    def _show_status(self, event: StatusChanged) -> None:
+        """Show the result of processing in the menu (main thread)."""
+        self.title = "Voice Input"
+        self.status_item.title = f"Status: {event.status}"
+
+    def _show_trace(self, event: DictationTraced) -> None:
+        """Show the last dictation's stage latencies in the menu (main thread)."""
+        self.last_dictation_item.title = f"Last dictation: {event.summary}"
+
+    def _show_error(self, event: ErrorOccurred) -> None:
+        """Show an error in the menu and notify (main thread)."""
+        self.title = "Voice Input"
+        self.status_item.title = "Status: Error"
+        rumps.notification(
+            title="Voice Input Error",
+            subtitle="",
+            message=event.message,
+        )
+
+    def _show_copied(self, event: TranscriptCopied) -> None:
+        """Tell the user to paste a transcript themselves (main thread)."""
+        rumps.notification(
+            title="Voice Input",
+            subtitle="Transcript copied to clipboard",
+            message=event.text,
+        )
 
     def _start_recording(self) -> None:
         """Start recording audio."""
         logger.info("App: Start recording triggered")
+        if self.pipeline.full:
+            # Backpressure: earlier dictations are stuck; don't queue more
+            logger.warning(
+                "App: %d dictations pending, not recording", self.pipeline.pending
+            )
+            self.status_item.title = "Status: Busy (cancel or wait)"
+            return
         try:
             self.title = "Recording..."
             self.status_item.title = "Status: Recording..."
-            self.recorder.start()
+            self._session = None
+            if self._streaming:
+                self._session = self.speculative_transcriber.start_session()
+            self.recorder.start(
+                on_segment=self._session.on_segment if self._session else None
+            )
         except Exception as e:
-            logger.exception(f"App: Failed to start recording: {e}")
-            self._event_queue.put(f"error:{e}")
+            logger.exception("App: Failed to start recording: %s", e)
+            self.events.post(ErrorOccurred(str(e)))
 
     def _stop_recording(self) -> None:
         """Stop recording and process audio."""
         logger.info("App: Stop recording triggered")
+        if not self.recorder.is_recording:
+            return  # Recording was refused (pipeline full)
+        trace = self.tracer.start()
         try:
-            audio_data = self.recorder.stop()
+            with trace.span("stop"):
+                audio_data = self.recorder.stop()
+            session, self._session = self._session, None
             self.title = "Processing..."
             self.status_item.title = "Status: Processing..."
 
-            # Process in background thread
-            logger.debug("App: Starting audio processing thread")
-            threading.Thread(
-                target=self._process_audio,
-                args=(audio_data,),
-                daemon=True,
-            ).start()
+            job = self.pipeline.submit(audio_data, session, trace)
+            logger.debug("App: Dictation %s submitted", job.id)
+        except PipelineFullError as e:
+            logger.warning("App: %s", e)
+            self.events.post(ErrorOccurred(str(e)))
         except Exception as e:
-            logger.exception(f"App: Failed to stop recording: {e}")
-            self._event_queue.put(f"error:{e}")
-
-    def _process_audio(self, audio_data) -> None:
-        """Transcribe audio and output text (runs in background thread)."""
-        logger.debug(f"App: Processing audio data ({len(audio_data)} samples)")
-
-        # Check minimum duration
-        if len(audio_data) < SAMPLE_RATE * MIN_RECORDING_SECONDS:
-            logger.info("App: Recording too short, skipping")
-            self._event_queue.put("status:Ready (too short)")
-            return
-
-        # Check if audio is too quiet (likely no speech)
-        rms = np.sqrt(np.mean(audio_data.astype(np.float64) ** 2))
-        logger.debug(f"App: RMS={rms:.2f}, threshold={self._rms_threshold}")
-        if self._debug:
-            print(f"[DEBUG] RMS: {rms:.2f} (threshold: {self._rms_threshold})")
-        if rms < self._rms_threshold:
-            logger.info("App: Audio too quiet, skipping")
-            self._event_queue.put("status:Ready (no audio)")
+            logger.exception("App: Failed to stop recording: %s", e)
+            self.events.post(ErrorOccurred(str(e)))
+
+    def _on_cancel_selected(self, _sender: rumps.MenuItem) -> None:
+        """Cancel the dictation currently being processed."""
+        if self.pipeline.cancel_current() is None:
+            logger.info("App: Nothing to cancel")
+
+    def _on_dictation_done(self, job: DictationJob) -> None:
+        """Report a finished dictation (runs on a pipeline thread)."""
+        result, trace = job.result, job.trace
+        if result.text is not None and self.tracer.enabled:
+            # Skipped recordings would only skew the histograms
+            self.tracer.finish(trace)
+            self.events.post(DictationTraced(trace.summary()))
+        if result.error is not None:
+            message = str(result.error)
+            if result.spooled:
+                message += " (saved, will retry)"
+            self.events.post(ErrorOccurred(message))
             return
+        if result.text is not None:
+            # The network is up: retry anything spooled earlier
+            self.spool_drainer.wake()
+        if result.copied:
+            self.events.post(TranscriptCopied(result.text))
+        self.events.post(StatusChanged(result.status))
+
+    def _is_network_error(self, error: Exception) -> bool:
+        """Return whether a failure means the engine is still unreachable."""
+        return isinstance(
+            error, (ConnectionError, TimeoutError, *self.transcriber.transient_errors)
+        )
 
-        try:
-            logger.debug("App: Saving audio to file")
-            audio_path = save_audio(audio_data)
+    def _transcribe_spooled(self, job: SpoolJob, path: Path) -> str:
+        """Transcribe a spooled dictation (runs on a drainer thread)."""
+        if job.kind == "pcm":
+            from scipy.io import wavfile
 
-            logger.info("App: Starting transcription")
-            text = transcribe(audio_path)
-            logger.info(f"App: Transcription complete ({len(text)} chars)")
+            _, audio = wavfile.read(path)
+            if len(audio) > self._long_form_threshold * SAMPLE_RATE:
+                return self.chunked_transcriber.transcribe(audio, job.language)
+        return self.transcriber.transcribe(path, job.language)
 
-            audio_path.unlink(missing_ok=True)
-            logger.debug("App: Temporary audio file deleted")
+    def _on_spooled_result(self, job: SpoolJob, text: str) -> None:
+        """Copy a recovered transcript to the clipboard and list it in the menu.
 
-            if text and text.strip():
-                logger.debug("App: Outputting text")
-                output_text(text)
-                self._event_queue.put("status:Ready")
-                logger.info("App: Processing complete")
-            else:
-                logger.info("App: No speech detected in transcription")
-                self._event_queue.put("status:Ready (no speech)")
+        It is not pasted: the user has moved on since the dictation.
+        """
+        if not text.strip():
+            return
+        copy_to_clipboard(text)
+        self.events.post(DictationRecovered(text))
+
+    def _show_recovered(self, text: str) -> None:
+        """Add a recovered transcript to the menu and notify (main thread)."""
+        self._recovered.appendleft(text)
+        self.recovered_menu.clear()
+        for recovered_text in self._recovered:
+            label = recovered_text
+            if len(label) > RECOVERED_LABEL_CHARS:
+                label = label[:RECOVERED_LABEL_CHARS] + "…"
+            item = rumps.MenuItem(label, callback=self._on_recovered_selected)
+            item.text = recovered_text  # Store full text for callback
+            self.recovered_menu.add(item)
+        rumps.notification(
+            title="Voice Input",
+            subtitle="Recovered dictation copied to clipboard",
+            message=text,
+        )
 
-        except Exception as e:
-            logger.exception(f"App: Error during audio processing: {e}")
-            self._event_queue.put(f"error:{e}")
+    def _on_recovered_selected(self, sender: rumps.MenuItem) -> None:
+        """Copy a recovered transcript to the clipboard again."""
+        copy_to_clipboard(sender.text)
 
     def run(self) -> None:
         """Start the app and hotkey listener."""
         logger.info("App: Starting Voice Input application")
-        logger.info(f"App: Hotkey={self._current_hotkey}, RMS threshold={self._rms_threshold}")
+        logger.info(
+            "App: Hotkey=%s, RMS threshold=%s, Encoder=%s, Engine=%s",
+            self._current_hotkey,
+            self._rms_threshold,
+            self.encoder_stage.encoder_name,
+            self.transcriber.name,
+        )
         self.hotkey_listener.start()
+        # Runs once the run loop has started, i.e. after the menu bar is up
+        AppHelper.callAfter(
+            lambda: threading.Thread(target=self._warm_up, daemon=True).start()
+        )
         super().run()
 
+    def _warm_up(self) -> None:
+        """Import heavy modules and open the warm input stream (background)."""
+        start_time = time.perf_counter()
+        modules = PRELOAD_MODULES
+        if self.transcriber.remote:
+            modules += REMOTE_PRELOAD_MODULES
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass  # Optional (soundfile) or reported on first use
+        logger.debug(
+            "App: Preloaded modules in %.2fs", time.perf_counter() - start_time
+        )
+        self.output_sink.start()
+
+        if self._config.get("warm_input", False):
+            try:
+                self.recorder.open()
+            except Exception as e:
+                # start() retries opening on the first key press
+                logger.exception("App: Failed to open warm input stream: %s", e)
+
 
 def main() -> None:
     """Entry point for menu bar app."""
     import argparse
     import logging
     import os
+    import sys
 
     from dotenv import load_dotenv
 
     from .logger import set_console_log_level
+    from .paste_helper import HELPER_FLAG
+
+    if sys.argv[1:2] == [HELPER_FLAG]:
+        # The app bundle's executable started as the paste helper
+        # (see output.helper_command)
+        from .paste_helper import main as paste_helper_main
+
+        paste_helper_main(sys.argv[2:])
+        return
 
     parser = argparse.ArgumentParser(description="Voice Input - Mac menu bar app")
     parser.add_argument("--debug", action="store_true", help="Enable debug output")
@@ -214,7 +536,8 @@ def main() -> None:
 
     load_dotenv()
 
-    if not os.environ.get("OPENAI_API_KEY"):
+    engine = load_config().get("engine")
+    if engine == "openai" and not os.environ.get("OPENAI_API_KEY"):
         print("Error: OPENAI_API_KEY environment variable is not set")
         print("Please create a .env file with your API key")
         return
@@ -0,0 +1,268 @@
+"""Preallocated sample buffer written directly by the audio callback."""
+
+import mmap
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+DEFAULT_CAPACITY_SECONDS = 30.0  # Initial capacity; grows by doubling
+GROW_AHEAD = 0.5  # Fill fraction at which the next, larger array is prepared
+# Spilled samples are dropped from the process's resident memory in steps of
+# this many bytes once written (they stay in the file and the page cache)
+SPILL_RELEASE_BYTES = 4 * 1024 * 1024
+
+_preparer: ThreadPoolExecutor | None = None
+_preparer_lock = threading.Lock()
+
+
+def _background() -> ThreadPoolExecutor:
+    """Return the thread that prepares buffers' next arrays."""
+    global _preparer
+    with _preparer_lock:
+        if _preparer is None:
+            _preparer = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="voice-input-buffer"
+            )
+        return _preparer
+
+
+@dataclass
+class _Allocation:
+    """A larger array prepared off the audio callback.
+
+    Attributes:
+        data: The new array.
+        mapping: Its scratch file mapping, if spilled.
+        copied: Samples already copied into data (None: data maps the same
+            file as the current array, so it already holds every sample).
+        released: Bytes of the mapping already released.
+    """
+
+    data: np.ndarray
+    mapping: mmap.mmap | None
+    copied: int | None
+    released: int = 0
+
+
+class AudioBuffer:
+    """Growable, preallocated int16 buffer for a single recording.
+
+    The audio callback copies each block straight into the preallocated
+    array, so there is no per-block allocation and no queue of small arrays.
+    Capacity doubles as the buffer fills, without the callback doing the
+    allocation or bulk copy: once the buffer is GROW_AHEAD full, a
+    background thread allocates the next array (or scratch file mapping)
+    and copies the samples recorded so far, and the callback then only
+    copies the few blocks written meanwhile. Only a block that doesn't fit
+    before that is ready makes the callback wait for it.
+    view() returns the recorded samples without copying.
+
+    With max_memory, a buffer that would grow beyond that many samples moves
+    to a memory-mapped scratch file (unlinked, so nothing is left behind)
+    and grows there by extending the file, without copying again. Written
+    pages are released from resident memory as recording goes on, so a very
+    long recording doesn't keep its whole length in RAM; view() is still a
+    plain array over the mapping. With max_length, samples beyond that many
+    are dropped and full becomes True.
+
+    A buffer is meant for one recording: views stay valid after the
+    recording ends, so start a new buffer instead of reusing one whose
+    view may still be in use.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        dtype: type = np.int16,
+        max_memory: int | None = None,
+        max_length: int | None = None,
+    ) -> None:
+        """Initialize the buffer.
+
+        Args:
+            capacity: Initial capacity in samples.
+            dtype: Sample type.
+            max_memory: Samples kept in RAM before spilling to a scratch
+                file (None: never spill).
+            max_length: Samples kept at most (None: unlimited).
+        """
+        if max_length is not None:
+            capacity = min(capacity, max_length)
+        self._data = np.empty(max(capacity, 1), dtype=dtype)
+        self._length = 0
+        self._grow_count = 0
+        self._max_memory = max_memory
+        self._max_length = max_length
+        self._dropped = 0
+        self._spill_file = None
+        self._mmap: mmap.mmap | None = None
+        self._released = 0  # Bytes of the mapping released so far
+        self._next: Future | None = None  # Larger array being prepared
+        self._background = _background()
+
+    def append(self, block: np.ndarray) -> None:
+        """Append a block of samples (called from the audio callback).
+
+        Args:
+            block: Samples to append; any shape, flattened in C order.
+        """
+        samples = block.reshape(-1)
+        if self._max_length is not None:
+            keep = self._max_length - self._length
+            if len(samples) > keep:
+                self._dropped += len(samples) - keep
+                samples = samples[:keep]
+        end = self._length + len(samples)
+        if self._next is not None and (self._next.done() or end > len(self._data)):
+            # Waits only if the block doesn't fit before the array is ready
+            self._swap(self._next.result())
+        if end > len(self._data):
+            self._grow(end)
+        self._data[self._length : end] = samples
+        self._length = end
+        if self._mmap is not None:
+            self._release_written()
+        if self._next is None and end >= len(self._data) * GROW_AHEAD:
+            self._prepare()
+
+    def _prepare(self) -> None:
+        """Start preparing an array of twice the capacity in the background."""
+        capacity = len(self._data) * 2
+        if self._max_length is not None:
+            capacity = min(capacity, self._max_length)
+        if capacity <= len(self._data):
+            return
+        self._next = self._background.submit(self._allocate, capacity, self._length)
+
+    def _allocate(self, capacity: int, length: int) -> _Allocation:
+        """Allocate capacity samples and copy the first length (background).
+
+        The current array isn't replaced while this runs (append() swaps
+        only once it's done), and the callback only writes beyond length.
+        """
+        if self._mmap is None and (
+            self._max_memory is None or capacity <= self._max_memory
+        ):
+            data = np.empty(capacity, dtype=self._data.dtype)
+            data[:length] = self._data[:length]
+            return _Allocation(data, None, length)
+        mapping = self._map(capacity)
+        data = np.frombuffer(mapping, dtype=self._data.dtype)
+        if self._mmap is not None:
+            return _Allocation(data, mapping, None)
+        # Samples recorded so far move from RAM to the file, and leave
+        # resident memory right away
+        data[:length] = self._data[:length]
+        written = length * self._data.dtype.itemsize
+        released = written - written % SPILL_RELEASE_BYTES
+        if released and hasattr(mmap, "MADV_DONTNEED"):
+            mapping.madvise(mmap.MADV_DONTNEED, 0, released)
+        else:
+            released = 0
+        return _Allocation(data, mapping, length, released)
+
+    def _swap(self, allocation: _Allocation) -> None:
+        """Switch to a prepared array, copying samples written meanwhile."""
+        self._next = None
+        if allocation.copied is None:
+            # Same file: the samples are there but not resident in the new
+            # mapping; the old mapping stays valid for earlier views
+            written = self._length * self._data.dtype.itemsize
+            self._released = written - written % SPILL_RELEASE_BYTES
+        else:
+            copied = allocation.copied
+            allocation.data[copied : self._length] = self._data[copied : self._length]
+            if allocation.mapping is not None:
+                self._released = allocation.released
+        if allocation.mapping is not None:
+            self._mmap = allocation.mapping
+        self._data = allocation.data
+        self._grow_count += 1
+
+    def _grow(self, min_capacity: int) -> None:
+        """Grow on this thread, for a block the prepared array can't hold."""
+        capacity = len(self._data)
+        while capacity < min_capacity:
+            capacity *= 2
+        if self._max_length is not None:
+            capacity = min(capacity, self._max_length)
+        if self._mmap is not None or (
+            self._max_memory is not None and capacity > self._max_memory
+        ):
+            self._grow_spilled(capacity)
+        else:
+            data = np.empty(capacity, dtype=self._data.dtype)
+            data[: self._length] = self._data[: self._length]
+            self._data = data
+        self._grow_count += 1
+
+    def _map(self, capacity: int) -> mmap.mmap:
+        """Map a scratch file of capacity samples, creating or extending it."""
+        size = capacity * self._data.dtype.itemsize
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(prefix="voice_input_")
+        self._spill_file.truncate(size)
+        return mmap.mmap(self._spill_file.fileno(), size)
+
+    def _grow_spilled(self, capacity: int) -> None:
+        """Move to a scratch file mapping of capacity samples."""
+        itemsize = self._data.dtype.itemsize
+        mapping = self._map(capacity)
+        data = np.frombuffer(mapping, dtype=self._data.dtype)
+        if self._mmap is None:
+            # Samples recorded so far move from RAM to the file once
+            data[: self._length] = self._data[: self._length]
+        else:
+            # The file already holds them and they aren't resident in the
+            # new mapping; the old mapping stays valid for earlier views
+            written = self._length * itemsize
+            self._released = written - written % SPILL_RELEASE_BYTES
+        self._data = data
+        self._mmap = mapping
+
+    def _release_written(self) -> None:
+        """Drop written pages of the mapping from resident memory."""
+        written = self._length * self._data.dtype.itemsize
+        end = written - written % SPILL_RELEASE_BYTES
+        if end > self._released and hasattr(mmap, "MADV_DONTNEED"):
+            # Shared file mapping: the data stays in the file; pages are
+            # read back in if a view touches them again
+            self._mmap.madvise(
+                mmap.MADV_DONTNEED, self._released, end - self._released
+            )
+            self._released = end
+
+    def view(self) -> np.ndarray:
+        """Return the recorded samples as a view (O(1), no copy)."""
+        return self._data[: self._length]
+
+    @property
+    def capacity(self) -> int:
+        """Return the current capacity in samples."""
+        return len(self._data)
+
+    @property
+    def grow_count(self) -> int:
+        """Return how many times the buffer had to grow."""
+        return self._grow_count
+
+    @property
+    def spilled(self) -> bool:
+        """Return whether the samples live in a scratch file."""
+        return self._mmap is not None
+
+    @property
+    def full(self) -> bool:
+        """Return whether max_length was reached."""
+        return self._max_length is not None and self._length >= self._max_length
+
+    @property
+    def dropped(self) -> int:
+        """Return how many samples were dropped beyond max_length."""
+        return self._dropped
+
+    def __len__(self) -> int:
+        return self._length
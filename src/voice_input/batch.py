@@ -0,0 +1,278 @@
+"""Batch transcription of recorded audio files.
+
+Files are decoded block by block, downmixed and resampled to 16 kHz as they
+are read, then go through the same pipeline as live dictation (VAD trim,
+encoding, chunking for long files, the request scheduler). Results are
+appended to a JSONL file as they finish, so an interrupted run can be
+resumed: files already in the output are skipped.
+"""
+
+import json
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from .audio_buffer import AudioBuffer
+from .chunking import LONG_FORM_THRESHOLD, ChunkedTranscriber
+from .encoder import EncoderStage
+from .engine import TranscriptionEngine
+from .logger import get_logger
+from .recorder import SAMPLE_RATE
+from .resample import StreamResampler
+from .vad import detect_speech
+
+logger = get_logger()
+
+AUDIO_EXTENSIONS = {".wav", ".flac", ".ogg", ".oga", ".mp3"}
+DECODE_BLOCK_FRAMES = 65536  # Frames decoded at a time
+DEFAULT_WORKERS = 4
+
+
+def find_audio_files(paths: list[Path]) -> list[Path]:
+    """Expand files and directories into a sorted list of audio files.
+
+    Args:
+        paths: Files and/or directories (searched recursively).
+
+    Returns:
+        Audio files, without duplicates.
+    """
+    found: dict[Path, None] = {}
+    for path in paths:
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file() and child.suffix.lower() in AUDIO_EXTENSIONS:
+                    found[child] = None
+        else:
+            found[path] = None
+    return list(found)
+
+
+def _read_blocks(path: Path) -> Iterator[tuple[int, np.ndarray]]:
+    """Yield (sample rate, float32 mono block) for an audio file."""
+    try:
+        import soundfile
+    except (ImportError, OSError):
+        soundfile = None
+
+    if soundfile is not None:
+        with soundfile.SoundFile(path) as f:
+            while True:
+                block = f.read(DECODE_BLOCK_FRAMES, dtype="float32", always_2d=True)
+                if not len(block):
+                    return
+                yield f.samplerate, block.mean(axis=1, dtype=np.float32)
+
+    # Without soundfile only WAV can be read (memory-mapped, so still streamed)
+    from scipy.io import wavfile
+
+    sample_rate, data = wavfile.read(path, mmap=True)
+    if data.ndim == 1:
+        data = data[:, np.newaxis]
+    for start in range(0, len(data), DECODE_BLOCK_FRAMES):
+        block = _pcm_to_float(data[start : start + DECODE_BLOCK_FRAMES])
+        yield sample_rate, block.mean(axis=1, dtype=np.float32)
+
+
+def _pcm_to_float(block: np.ndarray) -> np.ndarray:
+    """Scale WAV samples of any dtype to float32 in [-1, 1).
+
+    8-bit WAV is unsigned (silence at 128); 24-bit is read as int32 with the
+    samples in the upper bytes, so it scales like 32-bit. Float WAV is
+    already in range.
+    """
+    if block.dtype == np.uint8:
+        return (block.astype(np.float32) - 128.0) / 128.0
+    if np.issubdtype(block.dtype, np.signedinteger):
+        full_scale = float(2 ** (8 * block.dtype.itemsize - 1))
+        return block.astype(np.float32) / full_scale
+    return block.astype(np.float32)
+
+
+def _to_int16(block: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(block * 32768.0), -32768, 32767).astype(np.int16)
+
+
+def load_audio(path: Path) -> np.ndarray:
+    """Decode an audio file to 16 kHz mono int16, streaming.
+
+    Args:
+        path: WAV, FLAC, Ogg or MP3 file (anything but WAV needs soundfile).
+
+    Returns:
+        Samples at SAMPLE_RATE.
+    """
+    buffer: AudioBuffer | None = None
+    resampler: StreamResampler | None = None
+    for sample_rate, block in _read_blocks(path):
+        if resampler is None:
+            resampler = StreamResampler(sample_rate)
+            buffer = AudioBuffer(DECODE_BLOCK_FRAMES * 16)
+        buffer.append(_to_int16(resampler.process(block)))
+    if resampler is None:
+        return np.zeros(0, dtype=np.int16)
+    buffer.append(_to_int16(resampler.flush()))
+    return buffer.view()
+
+
+def completed_files(output: Path) -> set[str]:
+    """Return files with a transcript in an existing JSONL output.
+
+    Args:
+        output: JSONL file from a previous run (may not exist).
+
+    Returns:
+        Resolved paths of the files with a successful result (as strings).
+        Failed files are retried.
+    """
+    done: set[str] = set()
+    try:
+        with output.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Partial line from an interrupted run
+                if "text" in record:
+                    done.add(str(Path(record["file"]).resolve()))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _terminate_last_line(output: Path) -> None:
+    """End a partial last line left by an interrupted run, so appends start clean."""
+    try:
+        with output.open("rb+") as f:
+            if f.seek(0, 2) == 0:
+                return
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+    except FileNotFoundError:
+        pass
+
+
+class BatchTranscriber:
+    """Transcribes audio files concurrently and writes JSONL results."""
+
+    def __init__(
+        self,
+        engine: TranscriptionEngine,
+        encoder_stage: EncoderStage,
+        workers: int = DEFAULT_WORKERS,
+        long_form_threshold: float = LONG_FORM_THRESHOLD,
+        language: str = "ja",
+    ) -> None:
+        """Initialize the batch transcriber.
+
+        Args:
+            engine: Transcription engine (rate limiting comes from its
+                request scheduler).
+            encoder_stage: Encoder applied before upload.
+            workers: Files processed at once.
+            long_form_threshold: Files longer than this (seconds, after
+                trimming) are transcribed in parallel chunks.
+            language: Language code for transcription.
+        """
+        self._engine = engine
+        self._encoder_stage = encoder_stage
+        self._workers = workers
+        self._long_form_threshold = long_form_threshold
+        self._language = language
+        self._chunked = ChunkedTranscriber(engine, encoder_stage)
+
+    def _transcribe_file(self, path: Path) -> dict:
+        start_time = time.perf_counter()
+        audio = load_audio(path)
+        decoded_time = time.perf_counter()
+        record = {
+            "file": str(path.resolve()),
+            "audio_seconds": round(len(audio) / SAMPLE_RATE, 3),
+        }
+
+        vad = detect_speech(audio)
+        if not vad.has_speech:
+            text = ""
+        elif vad.end - vad.start > self._long_form_threshold * SAMPLE_RATE:
+            text = self._chunked.transcribe(audio[vad.start : vad.end], self._language)
+        else:
+            speech = audio[vad.start : vad.end]
+            encoded = self._encoder_stage.encode(speech)
+            try:
+                text = self._engine.transcribe(
+                    encoded.buffer, self._language, pcm=speech
+                )
+            finally:
+                encoded.release()
+        end_time = time.perf_counter()
+
+        record["text"] = text
+        record["decode_seconds"] = round(decoded_time - start_time, 3)
+        record["transcribe_seconds"] = round(end_time - decoded_time, 3)
+        record["total_seconds"] = round(end_time - start_time, 3)
+        return record
+
+    def run(self, paths: list[Path], output: Path) -> dict:
+        """Transcribe files, appending one JSON line per file to output.
+
+        Args:
+            paths: Files and/or directories.
+            output: JSONL output; files already transcribed there are skipped.
+
+        Returns:
+            Summary with files, skipped, failed, audio_seconds,
+            wall_seconds and throughput (audio seconds per wall second).
+        """
+        files = find_audio_files(paths)
+        done = completed_files(output)
+        # Resolved, so a file given by another relative path still matches
+        pending = [path for path in files if str(path.resolve()) not in done]
+        logger.info(
+            "Batch: %d files, %d already done", len(files), len(files) - len(pending)
+        )
+
+        _terminate_last_line(output)
+        audio_seconds = 0.0
+        failed = 0
+        start_time = time.perf_counter()
+        with (
+            output.open("a", encoding="utf-8") as out,
+            ThreadPoolExecutor(
+                max_workers=self._workers, thread_name_prefix="voice-input-batch"
+            ) as executor,
+        ):
+            futures = {
+                executor.submit(self._transcribe_file, path): path for path in pending
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    record = future.result()
+                    audio_seconds += record["audio_seconds"]
+                    logger.info(
+                        "Batch: %s (%.1fs) done in %.2fs",
+                        path,
+                        record["audio_seconds"],
+                        record["total_seconds"],
+                    )
+                except Exception as e:
+                    failed += 1
+                    logger.warning("Batch: %s failed: %s", path, e)
+                    record = {"file": str(path.resolve()), "error": str(e)}
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+        wall_seconds = time.perf_counter() - start_time
+        self._chunked.shutdown()
+
+        return {
+            "files": len(pending),
+            "skipped": len(files) - len(pending),
+            "failed": failed,
+            "audio_seconds": audio_seconds,
+            "wall_seconds": wall_seconds,
+            "throughput": audio_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+        }
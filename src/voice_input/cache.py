@@ -0,0 +1,256 @@
+"""Content-addressed cache of transcription results.
+
+Results are keyed by a hash of the audio samples plus everything else that
+affects the output (engine, model, language, temperature), so the same
+audio is never paid for twice. Callers pass the int16 PCM they encoded, so
+the key doesn't depend on the encoder or its settings. A small in-memory
+LRU sits in front of an on-disk tier under ~/.voice-input/cache/ that is
+evicted by total size.
+"""
+
+import hashlib
+import io
+import json
+import os
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from .config import CONFIG_DIR
+from .logger import get_logger
+
+logger = get_logger()
+
+CACHE_DIR = CONFIG_DIR / "cache"
+MEMORY_ENTRIES = 128  # Results kept in the in-memory LRU
+DISK_MAX_BYTES = 10 * 1024 * 1024  # Total size of the on-disk tier
+
+
+def _wav_data_range(data: memoryview) -> tuple[int, int]:
+    """Return the (start, end) of a WAV file's data chunk.
+
+    Hashing only the samples makes the key independent of header details.
+    Non-WAV input is hashed whole.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return 0, len(data)
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = bytes(data[offset : offset + 4])
+        (chunk_size,) = struct.unpack_from("<I", data, offset + 4)
+        if chunk_id == b"data":
+            return offset + 8, min(len(data), offset + 8 + chunk_size)
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return 0, len(data)
+
+
+def _update(digest: "hashlib._Hash", data: memoryview) -> None:
+    start, end = _wav_data_range(data)
+    # Release the slice right away: an exported BytesIO buffer can't be resized
+    with data[start:end] as samples:
+        digest.update(samples)
+
+
+def audio_key(audio: np.ndarray | Path | bytes | io.BytesIO, *params: object) -> str:
+    """Return the cache key for audio and transcription parameters.
+
+    Args:
+        audio: int16 PCM samples (preferred), or an audio file, encoded
+            bytes, or a buffer (hashed from its current position, which is
+            left unchanged). For WAV only the samples are hashed, giving the
+            same key as the PCM itself.
+        *params: Engine, model, language, temperature, etc.
+
+    Returns:
+        Hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    if isinstance(audio, np.ndarray):
+        digest.update(np.ascontiguousarray(audio, dtype="<i2"))
+    elif isinstance(audio, Path):
+        with memoryview(audio.read_bytes()) as data:
+            _update(digest, data)
+    elif isinstance(audio, bytes):
+        with memoryview(audio) as data:
+            _update(digest, data)
+    else:
+        position = audio.tell()
+        with audio.getbuffer() as buffer, buffer[position:] as data:
+            _update(digest, data)
+    digest.update(repr(params).encode())
+    return digest.hexdigest()
+
+
+def create_cache(config: dict) -> "TranscriptCache | None":
+    """Create the transcript cache described by the app configuration.
+
+    Args:
+        config: App configuration (cache_enabled, cache_max_mb).
+
+    Returns:
+        Cache instance, or None if caching is disabled.
+    """
+    if not config.get("cache_enabled", True):
+        return None
+    max_mb = config.get("cache_max_mb", DISK_MAX_BYTES / (1024 * 1024))
+    return TranscriptCache(disk_max_bytes=int(max_mb * 1024 * 1024))
+
+
+class TranscriptCache:
+    """Two-tier (memory LRU + disk) transcript cache. Thread-safe."""
+
+    def __init__(
+        self,
+        directory: Path | None = CACHE_DIR,
+        memory_entries: int = MEMORY_ENTRIES,
+        disk_max_bytes: int = DISK_MAX_BYTES,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory: Directory of the disk tier. None disables it.
+            memory_entries: Maximum entries in the memory tier.
+            disk_max_bytes: Maximum total size of the disk tier.
+        """
+        self._directory = directory
+        self._memory_entries = memory_entries
+        self._disk_max_bytes = disk_max_bytes
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: int | None = None  # Scanned on first write
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        """Look up a transcript.
+
+        Args:
+            key: Key from audio_key().
+
+        Returns:
+            Cached transcript, or None on a miss.
+        """
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                self._log("hit (memory)")
+                return text
+
+        text = self._read_disk(key)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+                self._log("miss")
+                return None
+            self.disk_hits += 1
+            self._remember(key, text)
+            self._log("hit (disk)")
+            return text
+
+    def put(self, key: str, text: str) -> None:
+        """Store a transcript in both tiers.
+
+        Args:
+            key: Key from audio_key().
+            text: Transcript.
+        """
+        with self._lock:
+            self._remember(key, text)
+        self._write_disk(key, text)
+
+    def _remember(self, key: str, text: str) -> None:
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def _log(self, result: str) -> None:
+        logger.info(
+            "Cache: %s (hits: %d memory / %d disk, misses: %d)",
+            result,
+            self.memory_hits,
+            self.disk_hits,
+            self.misses,
+        )
+
+    def _read_disk(self, key: str) -> str | None:
+        if self._directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with path.open(encoding="utf-8") as f:
+                text = json.load(f)["text"]
+            os.utime(path)  # Mark as recently used for eviction
+            return text
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Cache: Ignoring unreadable entry %s: %s", path.name, e)
+            return None
+
+    def _write_disk(self, key: str, text: str) -> None:
+        if self._directory is None:
+            return
+        path = self._path(key)
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            payload = json.dumps({"text": text}, ensure_ascii=False).encode()
+            try:
+                replaced = path.stat().st_size  # Overwriting an entry
+            except FileNotFoundError:
+                replaced = 0
+            temp_path = path.with_suffix(".tmp")
+            temp_path.write_bytes(payload)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning("Cache: Failed to write entry: %s", e)
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(p.stat().st_size for p in self._entries())
+            else:
+                self._disk_bytes += len(payload) - replaced
+            if self._disk_bytes > self._disk_max_bytes:
+                self._evict()
+
+    def _entries(self) -> list[Path]:
+        try:
+            return list(self._directory.glob("*.json"))
+        except OSError:
+            return []
+
+    def _evict(self) -> None:
+        """Delete least recently used files until under the size limit."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        # Evict down to 90% so we don't rescan on every write
+        target = self._disk_max_bytes * 0.9
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._disk_bytes = total
+        logger.debug(
+            "Cache: Evicted %d entries, disk tier now %d bytes", removed, total
+        )
@@ -0,0 +1,346 @@
+"""Long-form transcription: split at pauses, transcribe chunks in parallel.
+
+A single upload of a multi-minute recording is slow and can exceed the API's
+25 MB file limit. For recordings above a duration threshold, the audio is
+split at low-energy points near fixed intervals, chunks are transcribed
+concurrently within a requests-per-minute budget, and the texts are joined
+back in order.
+"""
+
+import re
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+import numpy as np
+
+from .encoder import EncoderStage
+from .engine import CancelToken, TranscriptionEngine
+from .logger import get_logger
+from .recorder import SAMPLE_RATE
+from .vad import frame_energy
+
+logger = get_logger()
+
+LONG_FORM_THRESHOLD = 120.0  # Use chunked transcription above this (seconds)
+CHUNK_SECONDS = 60.0  # Nominal chunk length
+SEARCH_SECONDS = 5.0  # Look this far either side of a nominal split for a pause
+OVERLAP_SECONDS = 0.2  # Audio shared by neighbouring chunks
+MAX_WORKERS = 4  # Concurrent requests (the API throttles beyond ~8)
+
+FRAME_SECONDS = 0.03  # Energy frame length
+SMOOTH_SECONDS = 0.3  # Pause must be quiet over this span, not a single frame
+# Boundary overlap is matched on whole tokens: words in space-separated
+# text, single characters in Japanese/Chinese. A CJK character counts as
+# half a word, so the shortest overlap removed is 2 words or 4 characters.
+MIN_OVERLAP_WORDS = 2.0
+MAX_OVERLAP_TOKENS = 30
+CJK_CHARACTER_WEIGHT = 0.5
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f"
+_CJK_CHARACTER = re.compile(f"[{_CJK}]")
+_TOKEN = re.compile(f"[{_CJK}]|[^\\s{_CJK}]+")
+_PUNCTUATION = "\"'.,!?;:()[]「」『』、。，．！？…"
+
+
+@dataclass
+class Chunk:
+    """A slice of the recording.
+
+    Attributes:
+        index: Position in the recording.
+        start: First sample (including overlap).
+        end: One past the last sample (including overlap).
+        audio: View of the samples.
+    """
+
+    index: int
+    start: int
+    end: int
+    audio: np.ndarray
+
+
+def find_split_points(
+    audio: np.ndarray,
+    chunk_seconds: float = CHUNK_SECONDS,
+    search_seconds: float = SEARCH_SECONDS,
+) -> list[int]:
+    """Find sample positions near every chunk_seconds where the audio is quietest.
+
+    Args:
+        audio: Audio samples.
+        chunk_seconds: Nominal distance between split points.
+        search_seconds: Search this far either side of each nominal point.
+
+    Returns:
+        Sorted split positions in samples (excluding 0 and len(audio)).
+    """
+    frame_length = int(FRAME_SECONDS * SAMPLE_RATE)
+    energy = frame_energy(audio, frame_length)
+    smooth = max(1, int(SMOOTH_SECONDS / FRAME_SECONDS))
+    energy = np.convolve(energy, np.ones(smooth) / smooth, mode="same")
+
+    frames_per_chunk = int(chunk_seconds / FRAME_SECONDS)
+    search = int(search_seconds / FRAME_SECONDS)
+    splits = []
+    previous = 0
+    nominal = frames_per_chunk
+    # Leave at least half a chunk for the final piece
+    while nominal + frames_per_chunk // 2 < len(energy):
+        low = max(previous + 1, nominal - search)
+        high = min(len(energy), nominal + search + 1)
+        window = energy[low:high]
+        # Split in the middle of the quietest run, not at its edge
+        quiet = np.flatnonzero(window <= window.min() * 1.05 + 1e-6)
+        run = quiet[np.flatnonzero(np.diff(quiet) != 1)]
+        run_start = quiet[0]
+        run_end = run[0] if len(run) else quiet[-1]
+        frame = low + int((run_start + run_end) // 2)
+        splits.append(frame * frame_length + frame_length // 2)
+        previous = frame
+        nominal = frame + frames_per_chunk
+    return splits
+
+
+def split_audio(
+    audio: np.ndarray,
+    chunk_seconds: float = CHUNK_SECONDS,
+    overlap_seconds: float = OVERLAP_SECONDS,
+) -> list[Chunk]:
+    """Split audio into chunks at low-energy points.
+
+    Args:
+        audio: Audio samples (int16).
+        chunk_seconds: Nominal chunk length.
+        overlap_seconds: Audio added on each side of a split.
+
+    Returns:
+        Chunks in order. Chunk audio are views, not copies.
+    """
+    samples = audio.reshape(-1)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    bounds = [0, *find_split_points(samples, chunk_seconds), len(samples)]
+    chunks = []
+    for index, (start, end) in enumerate(zip(bounds, bounds[1:])):
+        start = max(0, start - overlap)
+        end = min(len(samples), end + overlap)
+        chunks.append(Chunk(index, start, end, samples[start:end]))
+    return chunks
+
+
+def notify_completed(
+    futures: list[Future[str]], on_text: Callable[[int, str], None] | None
+) -> None:
+    """Call on_text(index, text) as each future completes successfully.
+
+    Runs on the thread completing the future (or right away if it is done);
+    failures are left for the caller collecting the results.
+    """
+    if on_text is None:
+        return
+    for index, future in enumerate(futures):
+
+        def done(future: Future[str], index: int = index) -> None:
+            if not future.cancelled() and future.exception() is None:
+                on_text(index, future.result())
+
+        future.add_done_callback(done)
+
+
+def gather(futures: list[Future[str]], cancel: CancelToken | None = None) -> list[str]:
+    """Return the futures' results in order.
+
+    Returns early on the first failure or when cancel is cancelled; futures
+    that haven't started yet are then cancelled.
+
+    Raises:
+        TranscriptionCancelledError: If cancel is cancelled first.
+        Exception: The first failure.
+    """
+    try:
+        if cancel is not None:
+            outstanding = set(futures)
+            while outstanding:
+                done, outstanding = wait(
+                    outstanding | {cancel.future}, return_when=FIRST_COMPLETED
+                )
+                outstanding.discard(cancel.future)
+                cancel.check()
+                for future in done:
+                    if future.exception() is not None:
+                        raise future.exception()
+        return [future.result() for future in futures]
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+
+def _append(result: str, text: str) -> str:
+    """Append a transcript piece, adding a space where the language needs one."""
+    # Space-separated languages need a separator; Japanese doesn't
+    if result and text and result[-1].isascii() and text[0].isascii():
+        result += " "
+    return result + text
+
+
+def join(texts: list[str]) -> str:
+    """Join transcripts of segments that don't overlap (e.g. cut at pauses).
+
+    Nothing is removed at the boundaries: a word that ends one segment and
+    starts the next was said twice.
+
+    Args:
+        texts: Transcripts in segment order.
+
+    Returns:
+        Combined transcript.
+    """
+    result = ""
+    for text in texts:
+        result = _append(result, text.strip())
+    return result
+
+
+def _normalize(token: str) -> str:
+    """Return a token as compared across a boundary (case and punctuation)."""
+    return token.strip(_PUNCTUATION).lower() or token
+
+
+def _overlap(result_tokens: list[str], tokens: list[str]) -> int:
+    """Return how many leading tokens repeat the end of result_tokens (0: none)."""
+    limit = min(len(result_tokens), len(tokens), MAX_OVERLAP_TOKENS)
+    for size in range(limit, 0, -1):
+        if result_tokens[-size:] != tokens[:size]:
+            continue
+        weight = sum(
+            CJK_CHARACTER_WEIGHT if _CJK_CHARACTER.fullmatch(token) else 1.0
+            for token in tokens[:size]
+        )
+        if weight >= MIN_OVERLAP_WORDS:
+            return size
+    return 0
+
+
+def stitch(texts: list[str]) -> str:
+    """Join chunk transcripts, dropping text repeated across a boundary.
+
+    Overlapping audio can make the end of one chunk's text reappear at the
+    start of the next; the longest such repeat of whole words (characters
+    in Japanese) is removed, if it is at least MIN_OVERLAP_WORDS long. Use
+    join() for segments that don't overlap.
+
+    Args:
+        texts: Transcripts in chunk order.
+
+    Returns:
+        Combined transcript.
+    """
+    result = ""
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        matches = list(_TOKEN.finditer(text))
+        tail = [_normalize(token) for token in _TOKEN.findall(result)]
+        size = _overlap(tail, [_normalize(m.group()) for m in matches])
+        if size:
+            text = text[matches[size - 1].end() :].lstrip()
+        result = _append(result, text)
+    return result
+
+
+class ChunkedTranscriber:
+    """Transcribes long recordings as parallel chunks."""
+
+    def __init__(
+        self,
+        transcriber: TranscriptionEngine,
+        encoder_stage: EncoderStage,
+        chunk_seconds: float = CHUNK_SECONDS,
+        max_workers: int = MAX_WORKERS,
+    ) -> None:
+        """Initialize the chunked transcriber.
+
+        Args:
+            transcriber: Engine used for each chunk.
+            encoder_stage: Encoder applied to each chunk before upload.
+            chunk_seconds: Nominal chunk length.
+            max_workers: Maximum concurrent requests.
+        """
+        self._transcriber = transcriber
+        self._encoder_stage = encoder_stage
+        self._chunk_seconds = chunk_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="voice-input-chunk"
+        )
+
+    def _transcribe_chunk(
+        self, chunk: Chunk, language: str, cancel: CancelToken | None
+    ) -> str:
+        encoded = self._encoder_stage.encode(chunk.audio)
+        try:
+            start_time = time.perf_counter()
+            text = self._transcriber.transcribe(
+                encoded.buffer, language, cancel, pcm=chunk.audio
+            )
+            logger.debug(
+                "Chunking: Chunk %d (%.1fs) done in %.2fs",
+                chunk.index,
+                (chunk.end - chunk.start) / SAMPLE_RATE,
+                time.perf_counter() - start_time,
+            )
+            return text
+        finally:
+            encoded.release()
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        language: str = "ja",
+        on_text: Callable[[int, str], None] | None = None,
+        cancel: CancelToken | None = None,
+    ) -> str:
+        """Transcribe a long recording.
+
+        Args:
+            audio: Audio samples (int16).
+            language: Language code for transcription.
+            on_text: Called with (chunk index, text) as each chunk finishes,
+                in completion order, from a worker thread.
+            cancel: Stops waiting for the chunks when cancelled.
+
+        Returns:
+            Combined transcript.
+
+        Raises:
+            TranscriptionCancelledError: If cancel is cancelled first.
+        """
+        start_time = time.perf_counter()
+        chunks = split_audio(audio, self._chunk_seconds)
+        logger.info(
+            "Chunking: %.1fs split into %d chunks",
+            len(audio) / SAMPLE_RATE,
+            len(chunks),
+        )
+        futures = [
+            self._executor.submit(self._transcribe_chunk, chunk, language, cancel)
+            for chunk in chunks
+        ]
+        notify_completed(futures, on_text)
+        # Collect in order; the first failure propagates
+        text = stitch(gather(futures, cancel))
+        logger.info(
+            "Chunking: %d chunks transcribed in %.2fs",
+            len(chunks),
+            time.perf_counter() - start_time,
+        )
+        return text
+
+    def set_engine(self, transcriber: TranscriptionEngine) -> None:
+        """Use a different engine for subsequent requests."""
+        self._transcriber = transcriber
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
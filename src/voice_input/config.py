@@ -9,9 +9,43 @@ CONFIG_FILE = CONFIG_DIR / "config.json"
 DEFAULT_CONFIG = {
     "hotkey": "ctrl_l",
     "rms_threshold": 100,
+    "encoder": "flac",
+    "blocksize": 0,
+    "latency": "high",
+    "native_rate": True,
+    "input_channel": 1,
+    "warm_input": False,
+    "preroll_seconds": 0.3,
+    "max_memory_seconds": 600.0,
+    "max_recording_seconds": 7200.0,
+    "long_form_threshold": 120.0,
+    "chunk_seconds": 60.0,
+    "collapse_pauses": False,
+    "max_pause_seconds": 1.0,
+    "collapsed_pause_seconds": 0.3,
+    "max_parallel_requests": 4,
+    "requests_per_minute": 50,
+    "request_deadline": 30.0,
+    "hedge_percent": 5.0,
+    "dictation_workers": 2,
+    "max_pending_dictations": 4,
+    "dictation_deadline": 120.0,
+    "streaming": False,
+    "engine": "openai",
+    "local_model": "small",
+    "local_threads": 4,
+    "local_compute_type": "int8",
+    "cache_enabled": True,
+    "cache_max_mb": 10,
+    "tracing": True,
+    "output": "paste",
+    "incremental_output": False,
 }
 
 VALID_HOTKEYS = ["ctrl_l", "ctrl_r", "alt_l", "alt_r"]
+VALID_ENCODERS = ["wav", "wav_8k", "flac", "opus"]
+VALID_ENGINES = ["openai", "local"]
+VALID_OUTPUTS = ["paste", "clipboard"]
 
 
 def load_config() -> dict:
@@ -29,6 +63,15 @@ def load_config() -> dict:
             # Validate hotkey value
             if config.get("hotkey") not in VALID_HOTKEYS:
                 config["hotkey"] = DEFAULT_CONFIG["hotkey"]
+            # Validate encoder value
+            if config.get("encoder") not in VALID_ENCODERS:
+                config["encoder"] = DEFAULT_CONFIG["encoder"]
+            # Validate engine value
+            if config.get("engine") not in VALID_ENGINES:
+                config["engine"] = DEFAULT_CONFIG["engine"]
+            # Validate output value
+            if config.get("output", DEFAULT_CONFIG["output"]) not in VALID_OUTPUTS:
+                config["output"] = DEFAULT_CONFIG["output"]
             return config
     except (json.JSONDecodeError, OSError):
         return DEFAULT_CONFIG.copy()
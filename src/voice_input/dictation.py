@@ -0,0 +1,288 @@
+"""Processing of a finished recording: VAD, encode, transcribe, output.
+
+This is everything that happens between the hotkey release and the text
+being pasted, independent of the menu bar UI, so the same code path can be
+driven headlessly (see benchmarks/bench_e2e.py).
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .chunking import LONG_FORM_THRESHOLD, ChunkedTranscriber, join, stitch
+from .encoder import EncoderStage
+from .engine import CancelToken, TranscriptionCancelledError, TranscriptionEngine
+from .logger import get_logger
+from .output import IncrementalOutput, output_text
+from .pauses import COLLAPSED_PAUSE_SECONDS, MAX_PAUSE_SECONDS, collapse_pauses
+from .recorder import SAMPLE_RATE, encode_wav
+from .spool import Spool, SpoolTicket
+from .streaming import StreamingSession
+from .tracing import NULL_TRACE, Trace
+from .vad import RMS_THRESHOLD, detect_speech
+
+logger = get_logger()
+
+MIN_RECORDING_SECONDS = 0.3  # Shorter recordings are ignored
+
+
+@dataclass
+class DictationResult:
+    """Outcome of processing one recording.
+
+    Attributes:
+        status: Status shown in the menu ("Ready", "Ready (no speech)", ...).
+        text: Transcript, or None if nothing was transcribed.
+        error: The failure, if processing failed.
+        spooled: Whether the failed dictation was saved for a retry.
+        cancelled: Whether the dictation was cancelled before its output.
+        copied: Whether the transcript was copied to the clipboard because
+            it couldn't be pasted in full.
+    """
+
+    status: str
+    text: str | None = None
+    error: Exception | None = None
+    spooled: bool = False
+    cancelled: bool = False
+    copied: bool = False
+
+
+class DictationProcessor:
+    """Turns a finished recording into pasted text."""
+
+    def __init__(
+        self,
+        transcriber: TranscriptionEngine,
+        encoder_stage: EncoderStage,
+        chunked_transcriber: ChunkedTranscriber,
+        spool: Spool | None = None,
+        output: Callable[[str], None] = output_text,
+        rms_threshold: float = RMS_THRESHOLD,
+        long_form_threshold: float = LONG_FORM_THRESHOLD,
+        incremental: bool = False,
+        collapse: bool = False,
+        max_pause_seconds: float = MAX_PAUSE_SECONDS,
+        collapsed_pause_seconds: float = COLLAPSED_PAUSE_SECONDS,
+        debug: bool = False,
+    ) -> None:
+        """Initialize the processor.
+
+        Args:
+            transcriber: Engine for short recordings.
+            encoder_stage: Encoder applied before upload.
+            chunked_transcriber: Used for recordings above long_form_threshold.
+            spool: Where failed dictations are kept for a retry (None: dropped).
+            output: Delivers the transcript (pastes by default).
+            rms_threshold: Minimum RMS for speech (see vad.detect_speech).
+            long_form_threshold: Trimmed recordings longer than this many
+                seconds are transcribed in parallel chunks.
+            incremental: Output streaming and long-form transcripts segment
+                by segment as they complete, instead of all at the end.
+            collapse: Shorten pauses longer than max_pause_seconds to
+                collapsed_pause_seconds before upload (not in streaming
+                mode, whose earlier segments are already sent).
+            max_pause_seconds: See pauses.collapse_pauses.
+            collapsed_pause_seconds: See pauses.collapse_pauses.
+            debug: Print VAD details to stdout.
+        """
+        self._transcriber = transcriber
+        self._encoder_stage = encoder_stage
+        self._chunked_transcriber = chunked_transcriber
+        self._spool = spool
+        self._output = output
+        self._rms_threshold = rms_threshold
+        self._long_form_threshold = long_form_threshold
+        self._incremental = incremental
+        self._collapse = collapse
+        self._max_pause_seconds = max_pause_seconds
+        self._collapsed_pause_seconds = collapsed_pause_seconds
+        self._debug = debug
+
+    def set_engine(self, transcriber: TranscriptionEngine) -> None:
+        """Use a different engine for subsequent dictations."""
+        self._transcriber = transcriber
+
+    def process(
+        self,
+        audio_data: np.ndarray,
+        session: StreamingSession | None = None,
+        trace: Trace = NULL_TRACE,
+        cancel: CancelToken | None = None,
+        output: Callable[[str], None] | None = None,
+    ) -> DictationResult:
+        """Transcribe a recording and output the text.
+
+        Args:
+            audio_data: The recording (int16), as returned by recorder.stop().
+            session: Streaming session that already has the earlier segments
+                in flight, if streaming mode is on.
+            trace: Records the vad, collapse, encode, transcribe and output
+                stages.
+            cancel: Cancels the transcription; a cancelled dictation outputs
+                nothing more and is not spooled.
+            output: Delivers this dictation's transcript instead of the
+                processor's output (e.g. to keep dictations in order).
+
+        Returns:
+            What happened. Errors are returned, not raised.
+        """
+        output = output or self._output
+        logger.debug(
+            "App: Processing dictation %s (%d samples)", trace.id, len(audio_data)
+        )
+
+        # Check minimum duration
+        if len(audio_data) < SAMPLE_RATE * MIN_RECORDING_SECONDS:
+            logger.info("App: Recording too short, skipping")
+            if session:
+                session.cancel()
+            return DictationResult("Ready (too short)")
+
+        # Check for speech and trim leading/trailing silence
+        with trace.span("vad"):
+            vad = detect_speech(audio_data, self._rms_threshold)
+        logger.info(
+            "App: VAD speech=%.2fs, trimmed %.2fs leading / %.2fs trailing",
+            vad.speech_seconds,
+            vad.leading_seconds,
+            vad.trailing_seconds,
+        )
+        if self._debug:
+            print(
+                f"[DEBUG] Speech: {vad.speech_seconds:.2f}s, trimmed "
+                f"{vad.leading_seconds:.2f}s + {vad.trailing_seconds:.2f}s "
+                f"(threshold: {self._rms_threshold})"
+            )
+        if not vad.has_speech:
+            logger.info("App: No speech detected by VAD, skipping")
+            if session:
+                session.cancel()
+            return DictationResult("Ready (no audio)")
+
+        speech = audio_data[vad.start : vad.end]
+        if self._collapse and session is None:
+            with trace.span("collapse"):
+                collapsed = collapse_pauses(
+                    audio_data,
+                    vad,
+                    self._max_pause_seconds,
+                    self._collapsed_pause_seconds,
+                )
+            speech = collapsed.audio
+            logger.info(
+                "App: Collapsed %d pauses, %.2fs -> %.2fs (ratio %.2f)",
+                collapsed.pauses,
+                collapsed.original_samples / SAMPLE_RATE,
+                len(speech) / SAMPLE_RATE,
+                collapsed.ratio,
+            )
+
+        encoded = None
+        ticket = None
+        text = None
+        incremental = None
+        try:
+            if session is not None:
+                # Segments already sent started at 0; only the end is trimmed
+                logger.info("App: Finishing streaming transcription")
+                incremental = self._incremental_output(output, join)
+                with trace.span("transcribe"):
+                    text = session.finish(
+                        audio_data[: vad.end],
+                        on_text=incremental.submit if incremental else None,
+                        cancel=cancel,
+                    )
+            elif len(speech) > self._long_form_threshold * SAMPLE_RATE:
+                logger.info("App: Starting long-form transcription")
+                # Chunks overlap, so their texts are stitched
+                incremental = self._incremental_output(output, stitch)
+                with trace.span("transcribe"):
+                    text = self._chunked_transcriber.transcribe(
+                        speech,
+                        on_text=incremental.submit if incremental else None,
+                        cancel=cancel,
+                    )
+            else:
+                logger.debug("App: Encoding trimmed audio")
+                with trace.span("encode"):
+                    # Already on a processing thread: no hop to the encoder's
+                    encoded = self._encoder_stage.encode(speech)
+
+                if self._spool is not None:
+                    # Kept in case the upload fails; written only if it fails or is slow.
+                    # The ticket takes the buffer instead of a copy of it.
+                    ticket = self._spool.stage(
+                        encoded.detach(), Path(encoded.buffer.name).suffix
+                    )
+
+                logger.info("App: Starting transcription")
+                with trace.span("transcribe"):
+                    text = self._transcriber.transcribe(
+                        encoded.buffer, cancel=cancel, pcm=speech
+                    )
+                if ticket is not None:
+                    ticket.done()
+            logger.info("App: Transcription complete (%d chars)", len(text))
+
+            if not (text and text.strip()):
+                logger.info("App: No speech detected in transcription")
+                return DictationResult("Ready (no speech)", text=text)
+
+            if cancel is not None:
+                cancel.check()
+            logger.debug("App: Outputting text")
+            with trace.span("output"):
+                if incremental is not None:
+                    if not incremental.finish(text):
+                        return DictationResult(
+                            "Ready (copied to clipboard)", text=text, copied=True
+                        )
+                else:
+                    output(text)
+            logger.info("App: Processing complete")
+            return DictationResult("Ready", text=text)
+
+        except TranscriptionCancelledError:
+            # Cancelled on purpose: nothing to retry
+            if ticket is not None:
+                ticket.done()
+            if session is not None:
+                session.cancel()
+            logger.info("App: Dictation %s cancelled", trace.id)
+            return DictationResult("Ready (cancelled)", cancelled=True)
+        except Exception as e:
+            logger.exception("App: Error during audio processing: %s", e)
+            spooled = text is None and self._spool_failed(ticket, speech)
+            return DictationResult("Error", text=text, error=e, spooled=spooled)
+        finally:
+            if encoded is not None:
+                encoded.release()
+
+    def _incremental_output(
+        self, output: Callable[[str], None], combine: Callable[[list[str]], str]
+    ) -> IncrementalOutput | None:
+        """Return a per-dictation IncrementalOutput if incremental mode is on."""
+        if not self._incremental:
+            return None
+        return IncrementalOutput(output, combine=combine)
+
+    def _spool_failed(self, ticket: SpoolTicket | None, audio: np.ndarray) -> bool:
+        """Keep a dictation whose transcription failed for a later retry.
+
+        Returns:
+            True if the audio is spooled.
+        """
+        if ticket is not None:
+            return ticket.fail()
+        if self._spool is None:
+            return False
+        # Long-form and streaming dictations: spool the trimmed recording
+        try:
+            self._spool.save(encode_wav(audio).getvalue(), ".wav", kind="pcm")
+            return True
+        except OSError as e:
+            logger.exception("App: Failed to spool dictation: %s", e)
+            return False
@@ -0,0 +1,293 @@
+"""Upload encoders that compress recorded audio before transcription."""
+
+import io
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .logger import get_logger
+from .recorder import SAMPLE_RATE, encode_wav
+
+logger = get_logger()
+
+DEFAULT_ENCODER = "flac"
+FALLBACK_ENCODER = "wav"
+DOWNSAMPLED_RATE = 8000  # Sample rate of the "wav_8k" encoder
+
+
+class EncoderUnavailableError(RuntimeError):
+    """Raised when an encoder's optional dependency is not installed."""
+
+
+class AudioEncoder:
+    """Base class for upload encoders.
+
+    Subclasses write int16 mono audio at SAMPLE_RATE into a buffer in a
+    format the Whisper API accepts.
+    """
+
+    name = ""
+    filename = ""
+
+    def check_available(self) -> None:
+        """Raise EncoderUnavailableError if the encoder cannot be used."""
+
+    def encode(self, audio: np.ndarray, buffer: io.BytesIO) -> None:
+        """Encode audio into buffer, replacing its contents."""
+        raise NotImplementedError
+
+
+class WavEncoder(AudioEncoder):
+    """Uncompressed 16 kHz int16 WAV (about 32 KB per second of audio)."""
+
+    name = "wav"
+    filename = "audio.wav"
+
+    def encode(self, audio: np.ndarray, buffer: io.BytesIO) -> None:
+        encode_wav(audio, buffer)
+
+
+class DownsampledWavEncoder(AudioEncoder):
+    """8 kHz int16 WAV: half the bytes of "wav", at some cost in accuracy."""
+
+    name = "wav_8k"
+    filename = "audio.wav"
+
+    def encode(self, audio: np.ndarray, buffer: io.BytesIO) -> None:
+        from scipy.signal import resample_poly
+
+        resampled = resample_poly(
+            audio.reshape(-1).astype(np.float32), DOWNSAMPLED_RATE, SAMPLE_RATE
+        )
+        pcm = np.clip(np.rint(resampled), -32768, 32767).astype(np.int16)
+        encode_wav(pcm, buffer, sample_rate=DOWNSAMPLED_RATE)
+
+
+class _SoundFileEncoder(AudioEncoder):
+    """Encoder backed by libsndfile via the optional soundfile package."""
+
+    format = ""
+    subtype = ""
+
+    def check_available(self) -> None:
+        try:
+            import soundfile
+        except (ImportError, OSError) as e:
+            raise EncoderUnavailableError(
+                f"Encoder '{self.name}' requires the soundfile package: {e}"
+            ) from e
+        if self.format not in soundfile.available_formats():
+            raise EncoderUnavailableError(
+                f"Encoder '{self.name}': libsndfile has no {self.format} support"
+            )
+
+    def encode(self, audio: np.ndarray, buffer: io.BytesIO) -> None:
+        import soundfile
+
+        buffer.seek(0)
+        buffer.truncate()
+        soundfile.write(
+            buffer,
+            audio.reshape(-1),
+            SAMPLE_RATE,
+            format=self.format,
+            subtype=self.subtype,
+        )
+        buffer.seek(0)
+
+
+class FlacEncoder(_SoundFileEncoder):
+    """Lossless FLAC, typically 40-60% smaller than WAV for speech."""
+
+    name = "flac"
+    filename = "audio.flac"
+    format = "FLAC"
+    subtype = "PCM_16"
+
+
+class OpusEncoder(_SoundFileEncoder):
+    """Lossy Ogg/Opus, roughly a tenth of the size of WAV."""
+
+    name = "opus"
+    filename = "audio.ogg"
+    format = "OGG"
+    subtype = "OPUS"
+
+
+ENCODERS: dict[str, type[AudioEncoder]] = {
+    encoder.name: encoder
+    for encoder in (WavEncoder, DownsampledWavEncoder, FlacEncoder, OpusEncoder)
+}
+
+
+def get_encoder(name: str) -> AudioEncoder:
+    """Get an encoder by name, falling back to WAV if it is unavailable.
+
+    Args:
+        name: Encoder name (wav, wav_8k, flac, opus).
+
+    Returns:
+        Encoder instance.
+    """
+    encoder_cls = ENCODERS.get(name)
+    if encoder_cls is None:
+        logger.warning(
+            "Encoder: Unknown encoder '%s', using %s", name, FALLBACK_ENCODER
+        )
+        return ENCODERS[FALLBACK_ENCODER]()
+
+    encoder = encoder_cls()
+    try:
+        encoder.check_available()
+    except EncoderUnavailableError as e:
+        logger.warning("Encoder: %s; using %s", e, FALLBACK_ENCODER)
+        return ENCODERS[FALLBACK_ENCODER]()
+    return encoder
+
+
+@dataclass
+class EncodedAudio:
+    """Result of encoding one recording.
+
+    Attributes:
+        buffer: Encoded audio, positioned at the start. Named so the API can
+            detect the format.
+        encoder: Name of the encoder used.
+        raw_bytes: Size the audio would have as 16 kHz int16 WAV.
+        encoded_bytes: Size of the encoded audio.
+        encode_time: Seconds spent encoding.
+    """
+
+    buffer: io.BytesIO
+    encoder: str
+    raw_bytes: int
+    encoded_bytes: int
+    encode_time: float
+    _stage: "EncoderStage | None" = field(default=None, repr=False)
+
+    @property
+    def bytes_saved(self) -> int:
+        """Return how many bytes were saved compared to raw WAV."""
+        return self.raw_bytes - self.encoded_bytes
+
+    def release(self) -> None:
+        """Return the buffer to the stage for reuse once it has been uploaded."""
+        if self._stage is not None:
+            self._stage._release_buffer(self.buffer)
+            self._stage = None
+
+    def detach(self) -> io.BytesIO:
+        """Take the buffer for good: release() won't return it for reuse.
+
+        For keeping the encoded audio past the upload without copying it
+        (see Spool.stage).
+        """
+        self._stage = None
+        return self.buffer
+
+
+class EncoderStage:
+    """Encodes recordings between recorder and transcriber.
+
+    Dictations, chunks and segments are already processed off the UI thread,
+    so they call encode() directly, with no hop to another thread. Buffers
+    are recycled through EncodedAudio.release() so back-to-back dictations
+    don't reallocate.
+    """
+
+    def __init__(self, encoder: str = DEFAULT_ENCODER) -> None:
+        """Initialize the encoder stage.
+
+        Args:
+            encoder: Encoder name (see ENCODERS).
+        """
+        self._encoder = get_encoder(encoder)
+        self._free_buffers: queue.SimpleQueue[io.BytesIO] = queue.SimpleQueue()
+        self._stats_lock = threading.Lock()
+        self._count = 0
+        self._total_raw_bytes = 0
+        self._total_encoded_bytes = 0
+        self._total_encode_time = 0.0
+
+    @property
+    def encoder_name(self) -> str:
+        """Return the name of the encoder in use."""
+        return self._encoder.name
+
+    def set_encoder(self, encoder: str) -> None:
+        """Switch encoder for subsequent recordings.
+
+        Args:
+            encoder: Encoder name (see ENCODERS).
+        """
+        self._encoder = get_encoder(encoder)
+
+    def encode(
+        self, audio: np.ndarray, encoder: AudioEncoder | None = None
+    ) -> EncodedAudio:
+        """Encode audio on the calling thread.
+
+        Args:
+            audio: Audio data as numpy array (int16).
+            encoder: Encoder to use. Defaults to the configured one.
+
+        Returns:
+            Encoded audio. Call release() on it after uploading.
+        """
+        encoder = encoder or self._encoder
+        try:
+            buffer = self._free_buffers.get_nowait()
+        except queue.Empty:
+            buffer = io.BytesIO()
+
+        start_time = time.perf_counter()
+        encoder.encode(audio, buffer)
+        encode_time = time.perf_counter() - start_time
+        buffer.name = encoder.filename
+
+        result = EncodedAudio(
+            buffer=buffer,
+            encoder=encoder.name,
+            raw_bytes=44 + audio.size * 2,
+            encoded_bytes=buffer.getbuffer().nbytes,
+            encode_time=encode_time,
+            _stage=self,
+        )
+        with self._stats_lock:
+            self._count += 1
+            self._total_raw_bytes += result.raw_bytes
+            self._total_encoded_bytes += result.encoded_bytes
+            self._total_encode_time += encode_time
+
+        saved_percent = 100 * result.bytes_saved / result.raw_bytes
+        logger.info(
+            "Encoder: %s %d -> %d bytes (saved %.1f%%) in %.1fms",
+            encoder.name,
+            result.raw_bytes,
+            result.encoded_bytes,
+            saved_percent,
+            encode_time * 1000,
+        )
+        return result
+
+    def _release_buffer(self, buffer: io.BytesIO) -> None:
+        self._free_buffers.put(buffer)
+
+    def stats(self) -> dict:
+        """Return cumulative encoding metrics.
+
+        Returns:
+            Dictionary with count, raw_bytes, encoded_bytes, bytes_saved and
+            encode_time (seconds) totals.
+        """
+        with self._stats_lock:
+            return {
+                "count": self._count,
+                "raw_bytes": self._total_raw_bytes,
+                "encoded_bytes": self._total_encoded_bytes,
+                "bytes_saved": self._total_raw_bytes - self._total_encoded_bytes,
+                "encode_time": self._total_encode_time,
+            }
@@ -0,0 +1,230 @@
+"""Transcription engine interface and factory."""
+
+import io
+import threading
+from concurrent.futures import Future, InvalidStateError
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .cache import TranscriptCache
+
+# Audio accepted by engines: a file path, raw encoded bytes or a buffer
+AudioInput = Path | bytes | BinaryIO
+
+DEFAULT_ENGINE = "openai"
+
+# Sampling temperature used by every engine (see transcriber.py for why 0).
+# Part of the cache key, since it affects the transcript.
+TEMPERATURE = 0
+
+# Display names for menu
+ENGINE_NAMES = {
+    "openai": "OpenAI Whisper API",
+    "local": "Local (faster-whisper)",
+}
+
+
+class EngineUnavailableError(RuntimeError):
+    """Raised when an engine's optional dependency is not installed."""
+
+
+class TranscriptionCancelledError(Exception):
+    """Raised when a transcription is cancelled through its CancelToken."""
+
+
+class CancelToken:
+    """Cancels a transcription from another thread and bounds its duration.
+
+    Code that waits on futures includes the token's future in
+    concurrent.futures.wait(), so it wakes up as soon as cancel() is called
+    instead of when the request finishes. Code that would sleep (rate
+    limiting, retry backoff) calls wait() instead.
+
+    Attributes:
+        future: Completes when the token is cancelled.
+        deadline: time.monotonic() by which requests must finish (None: no
+            limit beyond the engine's own).
+    """
+
+    def __init__(self, deadline: float | None = None) -> None:
+        self.future: Future[None] = Future()
+        self.deadline = deadline
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """Cancel (idempotent, any thread)."""
+        self._event.set()
+        try:
+            self.future.set_result(None)
+        except InvalidStateError:
+            pass  # Already cancelled
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Sleep until cancelled or timeout seconds have passed.
+
+        Returns:
+            True if cancelled.
+        """
+        return self._event.wait(timeout)
+
+    @property
+    def cancelled(self) -> bool:
+        """Return whether cancel() was called."""
+        return self.future.done()
+
+    def check(self) -> None:
+        """Raise TranscriptionCancelledError if cancelled."""
+        if self.cancelled:
+            raise TranscriptionCancelledError("Transcription cancelled")
+
+
+class TranscriptionEngine:
+    """Base class for speech-to-text engines.
+
+    Engines are long-lived: create one at startup and reuse it for every
+    dictation. transcribe() must be safe to call from several threads.
+    """
+
+    name = ""
+    # Encoder to use instead of the configured one (None: no preference).
+    # Local engines decode on the same machine, so compressing is wasted work.
+    preferred_encoder: str | None = None
+
+    # Whether requests leave the machine (rate limited, retried and hedged)
+    remote = False
+    # Errors worth retrying (rate limits, server and connection errors)
+    transient_errors: tuple[type[Exception], ...] = ()
+    # Result cache consulted before transcribing (None: disabled)
+    cache: "TranscriptCache | None" = None
+
+    @property
+    def model_id(self) -> str:
+        """Return the model name, as part of the cache key."""
+        return ""
+
+    def transcribe(
+        self,
+        audio: AudioInput,
+        language: str = "ja",
+        cancel: CancelToken | None = None,
+        pcm: "np.ndarray | None" = None,
+    ) -> str:
+        """Transcribe encoded audio, using the result cache if attached.
+
+        Args:
+            audio: Path to an audio file, encoded audio bytes, or a binary
+                buffer. Buffers are read from their current position.
+            language: Language code for transcription (default: "ja").
+            cancel: Aborts the transcription when cancelled.
+            pcm: The int16 samples audio was encoded from. The cache key is
+                computed from them, so it doesn't depend on the encoder
+                (None: computed from audio).
+
+        Returns:
+            Transcribed text.
+
+        Raises:
+            TranscriptionCancelledError: If cancel is cancelled.
+        """
+        if cancel is not None:
+            cancel.check()
+        cache = self.cache
+        if cache is None:
+            return self._transcribe(audio, language, cancel)
+
+        from .cache import audio_key
+
+        if pcm is not None:
+            key = audio_key(pcm, self.name, self.model_id, language, TEMPERATURE)
+        else:
+            if not isinstance(audio, (Path, bytes, io.BytesIO)):
+                # Other streams can only be read once: hash and upload a copy
+                name = getattr(audio, "name", None)
+                audio = io.BytesIO(audio.read())
+                if isinstance(name, str):
+                    audio.name = name
+            key = audio_key(audio, self.name, self.model_id, language, TEMPERATURE)
+        text = cache.get(key)
+        if text is None:
+            text = self._transcribe(audio, language, cancel)
+            cache.put(key, text)
+        return text
+
+    def _transcribe(
+        self, audio: AudioInput, language: str, cancel: CancelToken | None = None
+    ) -> str:
+        """Transcribe encoded audio without the cache (implemented by engines).
+
+        Engines that can stop part-way check cancel; the rest leave it to
+        the caller (see RequestScheduler).
+        """
+        raise NotImplementedError
+
+    def preconnect(self) -> None:
+        """Prepare for an upcoming transcription (non-blocking).
+
+        Called when the hotkey is pressed. Does nothing by default.
+        """
+
+    def close(self) -> None:
+        """Release connections, models and threads."""
+
+
+def create_engine(
+    name: str,
+    config: dict | None = None,
+    cache: "TranscriptCache | None" = None,
+) -> TranscriptionEngine:
+    """Create an engine by name.
+
+    Args:
+        name: Engine name ("openai" or "local").
+        config: App configuration; local_model, local_threads and
+            local_compute_type are used by the local engine;
+            requests_per_minute, request_deadline and hedge_percent by the
+            request scheduler wrapping remote engines.
+        cache: Result cache to attach to the engine.
+
+    Returns:
+        Engine instance.
+
+    Raises:
+        EngineUnavailableError: If the engine's dependency is missing.
+        ValueError: If the name is unknown.
+    """
+    config = config or {}
+    if name == "openai":
+        from .transcriber import TranscriptionClient
+
+        # The scheduler retries, so the SDK must not retry on its own
+        engine = TranscriptionClient(max_retries=0)
+    elif name == "local":
+        from .local_engine import (
+            DEFAULT_COMPUTE_TYPE,
+            DEFAULT_MODEL,
+            DEFAULT_THREADS,
+            LocalWhisperEngine,
+        )
+
+        engine = LocalWhisperEngine(
+            model=config.get("local_model", DEFAULT_MODEL),
+            threads=config.get("local_threads", DEFAULT_THREADS),
+            compute_type=config.get("local_compute_type", DEFAULT_COMPUTE_TYPE),
+        )
+    else:
+        raise ValueError(f"Unknown transcription engine: {name}")
+
+    if engine.remote:
+        from .scheduler import RequestScheduler, RetryPolicy
+
+        engine = RequestScheduler(
+            engine,
+            requests_per_minute=config.get("requests_per_minute", 50),
+            retry=RetryPolicy(deadline=config.get("request_deadline", 30.0)),
+            hedge_percent=config.get("hedge_percent", 5.0),
+        )
+    engine.cache = cache
+    return engine
@@ -0,0 +1,142 @@
+"""Typed UI events and a dispatcher that wakes the UI thread on demand.
+
+Background threads (hotkey listener, transcription, spool drainer) post
+events; the UI thread runs their handlers. Instead of polling a queue on a
+timer, the dispatcher calls a ``wakeup`` function once when the first event
+arrives, and the UI toolkit schedules dispatch_pending() on its own thread.
+Nothing here depends on the UI toolkit, so it also runs on Linux.
+"""
+
+import threading
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from .logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class StartRecording:
+    """The hotkey was pressed."""
+
+
+@dataclass(frozen=True)
+class StopRecording:
+    """The hotkey was released."""
+
+
+@dataclass(frozen=True)
+class StatusChanged:
+    """Processing finished; show the status in the menu."""
+
+    status: str
+
+
+@dataclass(frozen=True)
+class ErrorOccurred:
+    """Something failed; notify the user."""
+
+    message: str
+
+
+@dataclass(frozen=True)
+class DictationRecovered:
+    """A spooled dictation was transcribed."""
+
+    text: str
+
+
+@dataclass(frozen=True)
+class TranscriptCopied:
+    """A transcript couldn't be pasted in full and was copied instead."""
+
+    text: str
+
+
+@dataclass(frozen=True)
+class DictationTraced:
+    """Per-stage latency of the last dictation (see tracing.Trace.summary)."""
+
+    summary: str
+
+
+class EventDispatcher:
+    """Thread-safe event queue whose consumer is woken only when needed.
+
+    post() may be called from any thread. dispatch_pending() runs the
+    handlers and must be called on the consuming (UI) thread: either from
+    the wakeup callback's scheduled call, or in a loop with wait().
+    """
+
+    def __init__(self, wakeup: Callable[[], None] | None = None) -> None:
+        """Initialize the dispatcher.
+
+        Args:
+            wakeup: Called (on the posting thread) when an event arrives and
+                no dispatch is scheduled yet. It should arrange for
+                dispatch_pending() to run on the UI thread, and must not
+                block.
+        """
+        self._wakeup = wakeup
+        self._handlers: dict[type, Callable] = {}
+        self._pending: deque[object] = deque()
+        self._scheduled = False
+        self._condition = threading.Condition()
+
+    def register(self, event_type: type, handler: Callable) -> None:
+        """Run handler(event) for each event of event_type."""
+        self._handlers[event_type] = handler
+
+    def post(self, event: object) -> None:
+        """Queue an event and wake the consumer if it is idle."""
+        with self._condition:
+            self._pending.append(event)
+            self._condition.notify()
+            if self._scheduled:
+                return
+            self._scheduled = True
+        if self._wakeup is not None:
+            try:
+                self._wakeup()
+            except BaseException:
+                # Nothing was scheduled: let the next post() try again
+                with self._condition:
+                    self._scheduled = False
+                raise
+
+    def dispatch_pending(self) -> int:
+        """Run the handlers of all queued events, in posting order.
+
+        A failing handler is logged and does not stop the others.
+
+        Returns:
+            The number of events dispatched.
+        """
+        with self._condition:
+            # Events posted from here on schedule another dispatch
+            self._scheduled = False
+            events = list(self._pending)
+            self._pending.clear()
+        for event in events:
+            handler = self._handlers.get(type(event))
+            if handler is None:
+                logger.warning("Events: No handler for %s", type(event).__name__)
+                continue
+            try:
+                handler(event)
+            except Exception as e:
+                logger.exception(
+                    "Events: %s handler failed: %s", type(event).__name__, e
+                )
+        return len(events)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until an event is queued (for consumers without a run loop).
+
+        Returns:
+            True if events are pending, False on timeout.
+        """
+        with self._condition:
+            return bool(self._condition.wait_for(lambda: self._pending, timeout))
@@ -33,6 +33,7 @@ class HotkeyListener:
         on_press: Callable[[], None],
         on_release: Callable[[], None],
         hotkey: str = "ctrl_l",
+        on_warmup: Callable[[], None] | None = None,
     ) -> None:
         """Initialize the hotkey listener.
 
@@ -40,9 +41,13 @@ class HotkeyListener:
             on_press: Callback when hotkey is pressed.
             on_release: Callback when hotkey is released.
             hotkey: Hotkey identifier (ctrl_l, ctrl_r, alt_l, alt_r).
+            on_warmup: Optional callback invoked directly on the listener
+                thread as soon as the hotkey is pressed, before on_press.
+                Must return immediately (e.g. start a background preconnect).
         """
         self._on_press = on_press
         self._on_release = on_release
+        self._on_warmup = on_warmup
         self._hotkey = HOTKEY_MAP.get(hotkey, keyboard.Key.ctrl_l)
         self._listener: keyboard.Listener | None = None
         self._is_pressed = False  # Debounce flag
@@ -61,6 +66,8 @@ class HotkeyListener:
         """Handle key press events."""
         if key == self._hotkey and not self._is_pressed:
             self._is_pressed = True
+            if self._on_warmup:
+                self._on_warmup()
             self._on_press()
 
     def _handle_release(self, key: keyboard.Key | keyboard.KeyCode) -> None:
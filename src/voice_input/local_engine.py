@@ -0,0 +1,199 @@
+"""Offline CPU transcription with faster-whisper (CTranslate2)."""
+
+import io
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+import numpy as np
+
+from .engine import (
+    TEMPERATURE,
+    AudioInput,
+    CancelToken,
+    EngineUnavailableError,
+    TranscriptionCancelledError,
+    TranscriptionEngine,
+)
+from .logger import get_logger
+
+logger = get_logger()
+
+DEFAULT_MODEL = "small"  # faster-whisper model size or local model directory
+DEFAULT_COMPUTE_TYPE = "int8"  # Quantized weights: fastest on CPU
+DEFAULT_THREADS = min(4, os.cpu_count() or 1)
+BEAM_SIZE = 5
+
+
+def _load_faster_whisper():
+    try:
+        import faster_whisper
+    except ImportError as e:
+        raise EngineUnavailableError(
+            "The local engine requires the faster-whisper package "
+            "(pip install faster-whisper)"
+        ) from e
+    return faster_whisper
+
+
+def _decode_wav(audio: AudioInput) -> np.ndarray | None:
+    """Decode 16 kHz int16 WAV to float32 without ffmpeg.
+
+    Returns:
+        Samples in [-1, 1), or None if the audio is in another format (the
+        read position of buffers is then left unchanged).
+    """
+    from scipy.io import wavfile
+
+    opener = open(audio, "rb") if isinstance(audio, Path) else nullcontext(audio)
+    with opener as f:
+        position = f.tell()
+        is_wav = f.read(4) == b"RIFF"
+        f.seek(position)
+        if not is_wav:
+            return None
+        try:
+            sample_rate, data = wavfile.read(f)
+        except ValueError:
+            f.seek(position)
+            return None
+    if data.dtype != np.int16 or sample_rate != 16000:
+        return None
+    return data.reshape(-1).astype(np.float32) / 32768.0
+
+
+class LocalWhisperEngine(TranscriptionEngine):
+    """Whisper running locally on CPU via faster-whisper.
+
+    The model is loaded once in the background at construction and kept
+    resident, so latency is predictable and no network is needed.
+    """
+
+    name = "local"
+    preferred_encoder = "wav"
+
+    def __init__(
+        self,
+        model: str = DEFAULT_MODEL,
+        threads: int = DEFAULT_THREADS,
+        compute_type: str = DEFAULT_COMPUTE_TYPE,
+    ) -> None:
+        """Initialize the engine and start loading the model.
+
+        Args:
+            model: Model size (e.g. "small", "large-v3") or model directory.
+            threads: CPU threads used for inference.
+            compute_type: CTranslate2 compute type (e.g. "int8", "float32").
+
+        Raises:
+            EngineUnavailableError: If faster-whisper is not installed.
+        """
+        self._faster_whisper = _load_faster_whisper()
+        self._model_name = model
+        self._threads = threads
+        self._compute_type = compute_type
+        self._model = None
+        self._load_error: Exception | None = None
+        self._loaded = threading.Event()
+        threading.Thread(
+            target=self._load_model, name="voice-input-model-loader", daemon=True
+        ).start()
+
+    def _load_model(self) -> None:
+        start_time = time.perf_counter()
+        try:
+            self._model = self._faster_whisper.WhisperModel(
+                self._model_name,
+                device="cpu",
+                compute_type=self._compute_type,
+                cpu_threads=self._threads,
+            )
+            logger.info(
+                "LocalEngine: Loaded %s (%s, %d threads) in %.2fs",
+                self._model_name,
+                self._compute_type,
+                self._threads,
+                time.perf_counter() - start_time,
+            )
+        except Exception as e:
+            self._load_error = e
+            logger.exception(
+                "LocalEngine: Failed to load model %s: %s", self._model_name, e
+            )
+        finally:
+            self._loaded.set()
+
+    def _get_model(self):
+        self._loaded.wait()
+        if self._model is None:
+            raise RuntimeError(
+                f"Local model {self._model_name} failed to load: {self._load_error}"
+            )
+        return self._model
+
+    @property
+    def model_id(self) -> str:
+        """Return the model and compute type (quantization changes results)."""
+        return f"{self._model_name}:{self._compute_type}"
+
+    def _transcribe(
+        self,
+        audio: AudioInput,
+        language: str = "ja",
+        cancel: CancelToken | None = None,
+    ) -> str:
+        """Transcribe audio with the resident local model.
+
+        Args:
+            audio: Path to an audio file, encoded audio bytes, or a binary
+                buffer. 16 kHz int16 WAV is decoded directly; other formats
+                go through faster-whisper's decoder.
+            language: Language code for transcription (default: "ja").
+            cancel: Checked between decoded segments.
+
+        Returns:
+            Transcribed text.
+        """
+        model = self._get_model()
+        if isinstance(audio, bytes):
+            audio = io.BytesIO(audio)
+        source = _decode_wav(audio)
+        if source is None:
+            source = str(audio) if isinstance(audio, Path) else audio
+
+        start_time = time.perf_counter()
+        try:
+            segments, _info = model.transcribe(
+                source,
+                language=language,
+                beam_size=BEAM_SIZE,
+                # Same hallucination countermeasure as the API engine
+                temperature=TEMPERATURE,
+            )
+            texts = []
+            # Segments are decoded lazily, so cancelling stops the decoding
+            for segment in segments:
+                if cancel is not None:
+                    cancel.check()
+                texts.append(segment.text)
+            text = "".join(texts).strip()
+        except TranscriptionCancelledError:
+            logger.info("LocalEngine: Transcription cancelled")
+            raise
+        except Exception as e:
+            elapsed = time.perf_counter() - start_time
+            logger.exception(
+                "LocalEngine: Transcription failed after %.2fs: %s", elapsed, e
+            )
+            raise
+        logger.info(
+            "LocalEngine: Transcription completed in %.2fs",
+            time.perf_counter() - start_time,
+        )
+        return text
+
+    def close(self) -> None:
+        """Drop the model."""
+        self._model = None
@@ -1,7 +1,20 @@
-"""Logging configuration for voice input application."""
-
+"""Logging configuration for voice input application.
+
+Log calls never touch the disk or the console on the calling thread: the
+logger's only handler puts records on a bounded queue, and a background
+listener thread formats and writes them. This matters because records are
+logged from the PortAudio callback and the UI thread, where a disk stall
+would become an audio overflow or a frozen menu. If the writer falls behind
+and the queue is full, records are dropped (and the number dropped is
+logged once there is room again) rather than blocking the caller.
+"""
+
+import atexit
 import logging
+import queue
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 # Log directory: ~/Library/Logs/VoiceInput/
@@ -10,16 +23,121 @@ LOG_DIR = Path.home() / "Library" / "Logs" / "VoiceInput"
 # Logger name used throughout the application
 LOGGER_NAME = "voice_input"
 
+# Records waiting for the writer thread (a record is typically under 1 KB)
+LOG_QUEUE_SIZE = 1000
+LOG_MAX_BYTES = 10 * 1024 * 1024  # A day's log is rotated beyond this size
+LOG_BACKUP_COUNT = 5  # Rotated files kept per day (.1 to .5)
+
+_listener: QueueListener | None = None
+
+
+class _DailyFileHandler(RotatingFileHandler):
+    """Writes to voice_input_YYYYMMDD.log, switching files when the date changes.
+
+    Within a day the file is rotated like RotatingFileHandler when it
+    exceeds max_bytes. The log directory and file are created on the first
+    record, which keeps get_logger() (called when each module is imported)
+    free of disk access.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, backup_count: int) -> None:
+        self._directory = directory
+        self._day = datetime.now().strftime("%Y%m%d")
+        self._next_day: str | None = None
+        super().__init__(
+            self._path(self._day),
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+
+    def _path(self, day: str) -> Path:
+        return self._directory / f"voice_input_{day}.log"
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        day = datetime.fromtimestamp(record.created).strftime("%Y%m%d")
+        if day != self._day:
+            self._next_day = day
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self) -> None:
+        if self._next_day is None:
+            super().doRollover()
+            return
+        # New day: continue in that day's file instead of renaming this one
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        self._day, self._next_day = self._next_day, None
+        self.baseFilename = str(self._path(self._day).absolute())
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """Queue handler that never blocks and leaves formatting to the listener.
+
+    Attributes:
+        dropped: Records dropped so far because the queue was full.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+        # Guards the counts, which threads logging at once update together;
+        # held only around non-blocking puts
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same process, so the record is passed as is; the message is only
+        # formatted (msg % args) by the writer thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        with self._drop_lock:
+            try:
+                if self._unreported:
+                    self.queue.put_nowait(
+                        logging.makeLogRecord(
+                            {
+                                "name": record.name,
+                                "levelno": logging.WARNING,
+                                "levelname": "WARNING",
+                                "msg": "Logger: Dropped %d records (queue full)",
+                                "args": (self._unreported,),
+                            }
+                        )
+                    )
+                    self._unreported = 0
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+                self._unreported += 1
+
+
+class _LogListener(QueueListener):
+    """Queue listener whose stop() waits for room instead of failing when full."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
 
 def get_logger() -> logging.Logger:
     """Get or create the application logger.
 
     Uses Python's built-in logger registry (singleton pattern).
-    Handlers are configured only once on first call.
+    Handlers are configured only once on first call, which also starts the
+    background writer thread (stopped and flushed at exit).
 
     Returns:
         Configured logger instance.
     """
+    global _listener
     logger = logging.getLogger(LOGGER_NAME)
 
     # Already configured
@@ -28,12 +146,8 @@ def get_logger() -> logging.Logger:
 
     logger.setLevel(logging.DEBUG)
 
-    # Create log directory
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
-
-    # File handler with rotation by date
-    log_file = LOG_DIR / f"voice_input_{datetime.now().strftime('%Y%m%d')}.log"
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    # File handler with rotation by date and size (opened on the first record)
+    file_handler = _DailyFileHandler(LOG_DIR, LOG_MAX_BYTES, LOG_BACKUP_COUNT)
     file_handler.setLevel(logging.DEBUG)
 
     # Console handler (for CLI/debug mode)
@@ -48,8 +162,14 @@ def get_logger() -> logging.Logger:
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _listener = _LogListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    logger.addHandler(_BoundedQueueHandler(log_queue))
 
     return logger
 
@@ -60,8 +180,8 @@ def set_console_log_level(level: int) -> None:
     Args:
         level: Logging level (e.g., logging.DEBUG, logging.INFO).
     """
-    logger = logging.getLogger(LOGGER_NAME)
-    for handler in logger.handlers:
+    get_logger()
+    for handler in _listener.handlers:
         if isinstance(handler, logging.StreamHandler) and not isinstance(
             handler, logging.FileHandler
         ):
@@ -2,20 +2,51 @@
 
 import argparse
 import os
+from pathlib import Path
 
 from dotenv import load_dotenv
 
+from .batch import DEFAULT_WORKERS, BatchTranscriber
+from .cache import create_cache
+from .chunking import ChunkedTranscriber
+from .config import DEFAULT_CONFIG, VALID_ENCODERS, VALID_ENGINES, load_config
+from .encoder import EncoderStage
+from .engine import EngineUnavailableError, TranscriptionEngine, create_engine
 from .output import output_text
-from .recorder import record_and_save
-from .transcriber import transcribe
+from .pauses import COLLAPSED_PAUSE_SECONDS, MAX_PAUSE_SECONDS, collapse_pauses
+from .recorder import SAMPLE_RATE, record_audio
+from .vad import detect_speech
 
 
 def main() -> None:
     """Main entry point for the voice input tool."""
     load_dotenv()
 
+    # Options shared by recording and batch mode
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--encoder",
+        choices=VALID_ENCODERS,
+        help="Upload encoding (default: encoder from config, "
+        f"{DEFAULT_CONFIG['encoder']})",
+    )
+    common.add_argument(
+        "--engine",
+        choices=VALID_ENGINES,
+        help="Transcription engine (default: engine from config, "
+        f"{DEFAULT_CONFIG['engine']})",
+    )
+    common.add_argument(
+        "--long-form-threshold",
+        type=float,
+        help="Split recordings longer than this many seconds into parallel chunks "
+        f"(default: long_form_threshold from config, "
+        f"{DEFAULT_CONFIG['long_form_threshold']:g})",
+    )
+
     parser = argparse.ArgumentParser(
-        description="Record voice and transcribe to text using Whisper API"
+        description="Record voice and transcribe to text using Whisper API",
+        parents=[common],
     )
     parser.add_argument(
         "-d",
@@ -29,33 +60,141 @@ def main() -> None:
         action="store_true",
         help="Only copy to clipboard, don't paste",
     )
+    parser.add_argument(
+        "--collapse-pauses",
+        action="store_true",
+        help="Shorten long pauses before upload "
+        "(default: collapse_pauses from config)",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    batch_parser = subparsers.add_parser(
+        "batch",
+        parents=[common],
+        help="Transcribe audio files or directories",
+        description="Transcribe WAV/FLAC/Ogg/MP3 files (directories are searched "
+        "recursively) and write one JSON line per file. Files already in the "
+        "output are skipped, so an interrupted run can be resumed.",
+    )
+    batch_parser.add_argument("paths", nargs="+", type=Path, help="Files or directories")
+    batch_parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=Path("transcripts.jsonl"),
+        help="JSONL output file (default: transcripts.jsonl)",
+    )
+    batch_parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Files transcribed at once (default: {DEFAULT_WORKERS})",
+    )
+    batch_parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        help="API request limit (default: requests_per_minute from config, "
+        f"{DEFAULT_CONFIG['requests_per_minute']})",
+    )
     args = parser.parse_args()
 
-    if not os.environ.get("OPENAI_API_KEY"):
-        print("Error: OPENAI_API_KEY environment variable is not set")
+    config = load_config()
+    # Options not given on the command line come from the config file
+    for option in ("encoder", "engine", "long_form_threshold"):
+        if getattr(args, option) is None:
+            setattr(args, option, config.get(option, DEFAULT_CONFIG[option]))
+    if args.command == "batch" and args.requests_per_minute:
+        config["requests_per_minute"] = args.requests_per_minute
+    # Local engine starts loading its model while we record
+    engine = _create_engine(args.engine, config)
+    if engine is None:
+        return
+
+    if args.command == "batch":
+        _run_batch(args, engine)
+        return
+
+    # Import the API client and open its connection while we record
+    engine.preconnect()
+
+    # Record audio (encoded in memory, nothing touches the disk)
+    audio = record_audio(args.duration)
+
+    # Skip silent recordings and trim leading/trailing silence
+    vad = detect_speech(audio)
+    if not vad.has_speech:
+        print("No speech detected.")
         return
+    print(
+        f"Trimmed {vad.leading_seconds:.2f}s leading / "
+        f"{vad.trailing_seconds:.2f}s trailing silence."
+    )
+    if args.collapse_pauses or config.get("collapse_pauses", False):
+        collapsed = collapse_pauses(
+            audio,
+            vad,
+            config.get("max_pause_seconds", MAX_PAUSE_SECONDS),
+            config.get("collapsed_pause_seconds", COLLAPSED_PAUSE_SECONDS),
+        )
+        audio = collapsed.audio
+        print(
+            f"Collapsed {collapsed.pauses} pauses "
+            f"({collapsed.removed_seconds:.2f}s removed, ratio {collapsed.ratio:.2f})."
+        )
+    else:
+        audio = audio[vad.start : vad.end]
+    encoder_stage = EncoderStage(engine.preferred_encoder or args.encoder)
+
+    # Transcribe
+    print("Transcribing...")
+    if len(audio) > args.long_form_threshold * SAMPLE_RATE:
+        text = ChunkedTranscriber(engine, encoder_stage).transcribe(audio)
+    else:
+        text = engine.transcribe(encoder_stage.encode(audio).buffer, pcm=audio)
+    print(f"Transcribed: {text}")
+
+    # Output
+    if args.no_paste:
+        from .output import copy_to_clipboard
 
-    # Record audio
-    audio_path = record_and_save(args.duration)
+        copy_to_clipboard(text)
+        print("Copied to clipboard.")
+    else:
+        output_text(text)
+        print("Pasted.")
 
+
+def _create_engine(name: str, config: dict) -> TranscriptionEngine | None:
+    """Create the engine, printing an error and returning None on failure."""
+    if name == "openai" and not os.environ.get("OPENAI_API_KEY"):
+        print("Error: OPENAI_API_KEY environment variable is not set")
+        return None
     try:
-        # Transcribe
-        print("Transcribing...")
-        text = transcribe(audio_path)
-        print(f"Transcribed: {text}")
-
-        # Output
-        if args.no_paste:
-            from .output import copy_to_clipboard
-
-            copy_to_clipboard(text)
-            print("Copied to clipboard.")
-        else:
-            output_text(text)
-            print("Pasted.")
-    finally:
-        # Clean up temp file
-        audio_path.unlink(missing_ok=True)
+        return create_engine(name, config, create_cache(config))
+    except EngineUnavailableError as e:
+        print(f"Error: {e}")
+        return None
+
+
+def _run_batch(args: argparse.Namespace, engine: TranscriptionEngine) -> None:
+    """Transcribe files for the batch subcommand and print a summary."""
+    encoder_stage = EncoderStage(engine.preferred_encoder or args.encoder)
+    batch = BatchTranscriber(
+        engine,
+        encoder_stage,
+        workers=args.workers,
+        long_form_threshold=args.long_form_threshold,
+    )
+    summary = batch.run(args.paths, args.output)
+    print(
+        f"Transcribed {summary['files']} files ({summary['skipped']} skipped, "
+        f"{summary['failed']} failed) to {args.output}"
+    )
+    print(
+        f"{summary['audio_seconds']:.1f}s of audio in {summary['wall_seconds']:.1f}s "
+        f"({summary['throughput']:.1f} audio-seconds per second)"
+    )
+    engine.close()
 
 
 if __name__ == "__main__":
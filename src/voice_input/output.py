@@ -1,15 +1,49 @@
 """Text output module for clipboard and paste."""
 
+import os
+import select
 import subprocess
+import sys
+import threading
 import time
+from collections.abc import Callable
+from dataclasses import dataclass
 
-import pyperclip
-
+from .chunking import join
 from .logger import get_logger
+from .paste_helper import (
+    FRAME_HEADER,
+    HELPER_FLAG,
+    MAX_FRAME_BYTES,
+    OK,
+    READY,
+    decode_payload,
+    encode_frame,
+)
 
 logger = get_logger()
 
 PASTE_TIMEOUT = 5.0  # Timeout for osascript in seconds
+HELPER_START_TIMEOUT = 5.0  # Seconds to wait for the helper's "ready"
+# Seconds to wait for a paste acknowledgement (the helper itself waits up to
+# CLIPBOARD_TIMEOUT + PASTE_READ_TIMEOUT)
+HELPER_REPLY_TIMEOUT = 3.0
+HELPER_RETRY_DELAY = 5.0  # First wait before restarting a helper that failed
+HELPER_MAX_RETRY_DELAY = 300.0  # Upper bound of the (doubling) wait
+
+
+def helper_command() -> list[str]:
+    """Return the command line that starts the paste helper.
+
+    In a frozen app bundle (py2app, PyInstaller) there is no interpreter to
+    run ``-m`` with; the app's executable runs the helper when given
+    HELPER_FLAG instead. py2app's sys.executable is the embedded interpreter,
+    so its launcher is taken from EXECUTABLEPATH.
+    """
+    if getattr(sys, "frozen", False):
+        executable = os.environ.get("EXECUTABLEPATH", sys.executable)
+        return [executable, HELPER_FLAG]
+    return [sys.executable, "-m", "voice_input.paste_helper"]
 
 
 def copy_to_clipboard(text: str) -> None:
@@ -18,8 +52,10 @@ def copy_to_clipboard(text: str) -> None:
     Args:
         text: Text to copy.
     """
+    import pyperclip
+
     pyperclip.copy(text)
-    logger.debug(f"Copied to clipboard: {text[:50]}...")
+    logger.debug("Copied to clipboard: %s...", text[:50])
 
 
 def paste() -> None:
@@ -33,9 +69,11 @@ def paste() -> None:
 
     See Issue #3 for details.
     """
+    import pyperclip
+
     # Verify clipboard content before paste
     clipboard_content = pyperclip.paste()
-    logger.debug(f"Clipboard before paste: {clipboard_content[:50]}...")
+    logger.debug("Clipboard before paste: %s...", clipboard_content[:50])
 
     time.sleep(0.1)  # Small delay before paste
     logger.debug("Sending Cmd+V via AppleScript")
@@ -52,13 +90,13 @@ def paste() -> None:
             timeout=PASTE_TIMEOUT,
         )
         if result.returncode != 0:
-            logger.warning(f"osascript failed: {result.stderr}")
+            logger.warning("osascript failed: %s", result.stderr)
         else:
             logger.debug("Cmd+V sent via AppleScript")
     except subprocess.TimeoutExpired:
-        logger.warning(f"osascript timed out after {PASTE_TIMEOUT}s")
+        logger.warning("osascript timed out after %ss", PASTE_TIMEOUT)
     except Exception as e:
-        logger.exception(f"Failed to paste: {e}")
+        logger.exception("Failed to paste: %s", e)
 
 
 def output_text(text: str) -> None:
@@ -69,3 +107,332 @@ def output_text(text: str) -> None:
     """
     copy_to_clipboard(text)
     paste()
+
+
+@dataclass
+class OutputTiming:
+    """Timing of one delivered transcript.
+
+    Attributes:
+        start: Seconds spent starting the helper (0.0 if already running).
+        paste: Seconds from sending the text until it was acknowledged.
+        fallback: Whether the helper failed and osascript was used instead.
+    """
+
+    start: float = 0.0
+    paste: float = 0.0
+    fallback: bool = False
+
+
+class OutputSink:
+    """Where transcripts go: pasted, copied or collected.
+
+    deliver() is called from the processing thread, one transcript at a
+    time.
+    """
+
+    last_timing: OutputTiming | None = None
+
+    def deliver(self, text: str) -> None:
+        """Output a transcript."""
+        raise NotImplementedError
+
+    def start(self) -> None:
+        """Prepare ahead of the first deliver() (non-essential)."""
+
+    def close(self) -> None:
+        """Release resources held by the sink."""
+
+
+class ClipboardSink(OutputSink):
+    """Copies transcripts to the clipboard without pasting."""
+
+    def deliver(self, text: str) -> None:
+        start_time = time.perf_counter()
+        copy_to_clipboard(text)
+        self.last_timing = OutputTiming(paste=time.perf_counter() - start_time)
+
+
+class CollectingSink(OutputSink):
+    """Keeps transcripts in a list (for benchmarks and tests)."""
+
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+
+    def deliver(self, text: str) -> None:
+        self.texts.append(text)
+        self.last_timing = OutputTiming()
+
+
+class PasteSink(OutputSink):
+    """Pastes through a long-lived helper process (see paste_helper).
+
+    The helper is started on first use (or by start()) and reused for every
+    paste. Each paste is acknowledged by the helper once the target app has
+    read the clipboard, so there is no fixed delay and the next paste (e.g.
+    the next piece of an IncrementalOutput) can't replace the clipboard
+    before the previous one landed.
+
+    If the helper reports an error, that transcript is pasted with
+    output_text() instead. If it can't be started, exits or stops answering,
+    it is marked broken: pastes go straight to output_text() until a retry
+    delay has passed (doubling while it keeps failing), so a broken helper
+    isn't respawned for every paste.
+    """
+
+    def __init__(self, command: list[str] | None = None) -> None:
+        """Initialize the sink.
+
+        Args:
+            command: Helper command line. Defaults to helper_command(); pass
+                e.g. helper_command() + ["--dry-run"] to exercise the
+                protocol without pasting.
+        """
+        self._command = command or helper_command()
+        self._process: subprocess.Popen | None = None
+        self._retry_delay = HELPER_RETRY_DELAY
+        self._broken_until = 0.0  # time.monotonic() before which it isn't tried
+        self._lock = threading.Lock()
+
+    def _read_exactly(self, size: int, deadline: float) -> bytes:
+        """Read size bytes from the helper.
+
+        Raises:
+            TimeoutError: If they don't arrive by the deadline.
+            ConnectionError: If the helper exited.
+        """
+        fd = self._process.stdout.fileno()
+        data = b""
+        while len(data) < size:
+            timeout = max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                raise TimeoutError("Paste helper did not answer in time")
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                raise ConnectionError("Paste helper exited")
+            data += chunk
+        return data
+
+    def _read_reply(self, timeout: float) -> dict:
+        """Read one frame from the helper.
+
+        Raises:
+            TimeoutError: If it doesn't arrive in time.
+            ConnectionError: If the helper exited or sent a malformed frame.
+        """
+        deadline = time.monotonic() + timeout
+        (length,) = FRAME_HEADER.unpack(self._read_exactly(FRAME_HEADER.size, deadline))
+        if length > MAX_FRAME_BYTES:
+            raise ConnectionError(f"Paste helper sent a {length}-byte frame")
+        try:
+            return decode_payload(self._read_exactly(length, deadline))
+        except ValueError as e:
+            raise ConnectionError(f"Paste helper sent a malformed frame: {e}") from e
+
+    def _ensure_started(self) -> None:
+        """Start the helper unless it is running.
+
+        Raises:
+            OSError, TimeoutError, ConnectionError: If it can't be started.
+        """
+        if self._process is not None and self._process.poll() is None:
+            return
+        self._stop_process()
+        # Unbuffered binary pipes, so select() sees exactly what is unread
+        self._process = subprocess.Popen(
+            self._command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0
+        )
+        reply = self._read_reply(HELPER_START_TIMEOUT)
+        if reply.get("status") != READY:
+            raise ConnectionError(
+                f"Paste helper failed to start: {reply.get('message', reply)}"
+            )
+        logger.debug("Output: Paste helper ready")
+
+    def _mark_broken(self, error: Exception) -> None:
+        """Stop the helper and don't try it again for a while."""
+        self._stop_process()
+        self._broken_until = time.monotonic() + self._retry_delay
+        logger.warning(
+            "Output: Paste helper failed (%s), using osascript for the next %.0fs",
+            error,
+            self._retry_delay,
+        )
+        self._retry_delay = min(self._retry_delay * 2, HELPER_MAX_RETRY_DELAY)
+
+    def start(self) -> None:
+        """Start the helper now instead of on the first paste."""
+        with self._lock:
+            try:
+                self._ensure_started()
+            except (OSError, TimeoutError, ConnectionError) as e:
+                self._mark_broken(e)
+
+    def _paste_with_helper(self, text: str, timing: OutputTiming) -> bool:
+        """Paste through the helper.
+
+        Returns:
+            False if the helper is broken or failed (the caller falls back).
+        """
+        if time.monotonic() < self._broken_until:
+            return False
+        try:
+            start_time = time.perf_counter()
+            self._ensure_started()
+            timing.start = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            self._process.stdin.write(encode_frame({"op": "paste", "text": text}))
+            reply = self._read_reply(HELPER_REPLY_TIMEOUT)
+            timing.paste = time.perf_counter() - start_time
+        except (OSError, TimeoutError, ConnectionError) as e:
+            self._mark_broken(e)
+            return False
+        self._retry_delay = HELPER_RETRY_DELAY
+        if reply.get("status") != OK:
+            logger.warning(
+                "Output: Paste helper error (%s), using osascript",
+                reply.get("message", reply),
+            )
+            return False
+        if not reply.get("read", True):
+            logger.debug("Output: Pasted text was not read by any app")
+        return True
+
+    def deliver(self, text: str) -> None:
+        """Paste a transcript, falling back to osascript if the helper fails."""
+        timing = OutputTiming()
+        with self._lock:
+            if not self._paste_with_helper(text, timing):
+                start_time = time.perf_counter()
+                output_text(text)
+                timing.paste = time.perf_counter() - start_time
+                timing.fallback = True
+        self.last_timing = timing
+        logger.debug(
+            "Output: Pasted in %.0f ms (helper start %.0f ms%s)",
+            timing.paste * 1000,
+            timing.start * 1000,
+            ", fallback" if timing.fallback else "",
+        )
+
+    def _stop_process(self) -> None:
+        if self._process is None:
+            return
+        try:
+            # Closing stdin makes the helper exit
+            self._process.stdin.close()
+            self._process.wait(timeout=1.0)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+        self._process = None
+
+    def close(self) -> None:
+        """Stop the helper."""
+        with self._lock:
+            self._stop_process()
+
+
+class IncrementalOutput:
+    """Outputs a transcript piece by piece as its segments complete.
+
+    Segment texts may arrive from several threads in any order; they are
+    delivered strictly in segment order, each as the text it adds to the
+    combined transcript so far. Text that has been
+    delivered is never delivered again: a revised text for a segment that
+    was already output is ignored, one for a pending segment replaces it.
+    """
+
+    def __init__(
+        self,
+        output: Callable[[str], None],
+        fallback: Callable[[str], None] = copy_to_clipboard,
+        combine: Callable[[list[str]], str] = join,
+    ) -> None:
+        """Initialize the output.
+
+        Args:
+            output: Delivers each new piece (e.g. PasteSink.deliver, which
+                pastes at the cursor, so the pieces append).
+            fallback: Receives the whole final transcript when it can't be
+                completed by appending to what was already output.
+            combine: Combines segment texts into a transcript: chunking.join
+                for segments that don't overlap, chunking.stitch for ones
+                that do.
+        """
+        self._output = output
+        self._fallback = fallback
+        self._combine = combine
+        self._texts: list[str] = []  # Delivered segments, in order
+        self._pending: dict[int, str] = {}
+        self._delivered = ""
+        self._lock = threading.Lock()
+
+    def submit(self, index: int, text: str) -> None:
+        """Report the transcript of segment index (thread-safe)."""
+        with self._lock:
+            if index < len(self._texts):
+                if text != self._texts[index]:
+                    logger.debug(
+                        "Output: Segment %d revised after output, ignored", index
+                    )
+                return
+            self._pending[index] = text
+            while len(self._texts) in self._pending:
+                self._texts.append(self._pending.pop(len(self._texts)))
+            self._deliver(self._combine(self._texts))
+
+    def finish(self, text: str) -> bool:
+        """Deliver whatever part of the final transcript is still missing.
+
+        If the final transcript doesn't start with the text already output
+        (a segment was revised after it was pasted), appending a remainder
+        could duplicate or garble text, so the whole transcript goes to the
+        fallback instead.
+
+        Args:
+            text: The complete transcript, combined from all segments.
+
+        Returns:
+            True if the transcript was completed through the output, False
+            if it was handed to the fallback.
+        """
+        with self._lock:
+            if not text.startswith(self._delivered):
+                logger.warning(
+                    "Output: Final transcript differs from output so far, "
+                    "passing it to the fallback"
+                )
+                self._fallback(text)
+                return False
+            self._deliver(text)
+            return True
+
+    def _deliver(self, text: str) -> None:
+        """Output the part of text beyond what was delivered (lock held)."""
+        piece = text[len(self._delivered) :]
+        if not piece.strip():
+            return
+        self._output(piece)
+        self._delivered = text
+
+    @property
+    def delivered(self) -> str:
+        """Return the text output so far."""
+        return self._delivered
+
+
+OUTPUT_SINKS = {"paste": PasteSink, "clipboard": ClipboardSink}
+
+
+def create_output_sink(name: str) -> OutputSink:
+    """Create an output sink by name ("paste" or "clipboard").
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    try:
+        return OUTPUT_SINKS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown output: {name}") from None
@@ -0,0 +1,227 @@
+"""Long-lived paste helper process (run as ``python -m voice_input.paste_helper``).
+
+Pasting from the app's own process doesn't work while the pynput listener
+is active (the Cmd modifier gets lost, see output.paste), so pasting runs
+in a separate process. Spawning osascript per dictation costs hundreds of
+milliseconds; this helper is started once and kept running. In a frozen app
+bundle there is no ``python -m``: the app's own executable runs the helper
+when started with HELPER_FLAG (see output.helper_command and app.main).
+
+Protocol: binary frames over stdin/stdout, each a 4-byte big-endian length
+followed by that many bytes of UTF-8 JSON (see encode_frame/read_frame).
+
+- On startup the helper sends ``{"status": "ready"}`` (or
+  ``{"status": "error", "message": ...}``).
+- ``{"op": "paste", "text": ...}``: put the text on the clipboard, send
+  Cmd+V and wait until the target app has read the clipboard, then reply
+  ``{"status": "ok", "read": true}`` (``false`` if nothing read it within
+  PASTE_READ_TIMEOUT) or an error. Until the reply, the text being pasted
+  can't be replaced by the next one.
+- ``{"op": "copy", "text": ...}``: only put the text on the clipboard.
+- ``{"op": "ping"}``: reply ``{"status": "ok"}``.
+
+The helper exits when stdin is closed. With --dry-run it acknowledges
+commands without touching the clipboard or the keyboard (used to test the
+protocol on machines without AppKit).
+"""
+
+import argparse
+import json
+import struct
+import sys
+import time
+from typing import BinaryIO
+
+HELPER_FLAG = "--paste-helper"  # Runs the helper from the app's executable
+
+READY = "ready"
+OK = "ok"
+ERROR = "error"
+
+FRAME_HEADER = struct.Struct(">I")  # Length of the JSON payload that follows
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+CLIPBOARD_TIMEOUT = 1.0  # Seconds to wait for the clipboard change
+PASTE_READ_TIMEOUT = 1.0  # Seconds to wait for the target app to read the paste
+KEY_V = 9  # kVK_ANSI_V
+
+
+def encode_frame(message: dict) -> bytes:
+    """Return a message as a length-prefixed frame."""
+    payload = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def decode_payload(payload: bytes) -> dict:
+    """Return the message in a frame's payload.
+
+    Raises:
+        ValueError: If the payload isn't a JSON object.
+    """
+    message = json.loads(payload.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("Frame is not a JSON object")
+    return message
+
+
+def read_frame(stream: BinaryIO) -> dict | None:
+    """Read one frame, blocking.
+
+    Returns:
+        The message, or None at the end of the stream.
+
+    Raises:
+        EOFError: If the stream ends inside a frame.
+        ValueError: If the frame is oversized or not a JSON object.
+    """
+    header = _read_exactly(stream, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {length} bytes is too large")
+    payload = _read_exactly(stream, length)
+    if payload is None:
+        raise EOFError("Stream ended inside a frame")
+    return decode_payload(payload)
+
+
+def _read_exactly(stream: BinaryIO, size: int) -> bytes | None:
+    """Read size bytes (None if the stream ends first)."""
+    data = b""
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            if data:
+                raise EOFError("Stream ended inside a frame")
+            return None
+        data += chunk
+    return data
+
+
+class _MacBackend:
+    """Clipboard and key events through AppKit/Quartz."""
+
+    def __init__(self) -> None:
+        import AppKit
+        import Quartz
+
+        self._appkit = AppKit
+        self._quartz = Quartz
+        self._pasteboard = AppKit.NSPasteboard.generalPasteboard()
+
+        # Defined here so the module imports without PyObjC (--dry-run)
+        class PasteboardOwner(AppKit.NSObject):
+            """Provides promised clipboard text when an app reads it."""
+
+            def pasteboard_provideDataForType_(self, pasteboard, data_type):
+                pasteboard.setString_forType_(self.text, data_type)
+                self.read = True
+
+        self._owner = PasteboardOwner.alloc().init()
+
+    def _wait_for_change(self, change_count: int) -> None:
+        # Readiness handshake: the paste must not run before the write landed
+        deadline = time.monotonic() + CLIPBOARD_TIMEOUT
+        while self._pasteboard.changeCount() == change_count:
+            if time.monotonic() > deadline:
+                raise TimeoutError("Clipboard did not update")
+            time.sleep(0.001)
+
+    def copy(self, text: str) -> None:
+        change_count = self._pasteboard.changeCount()
+        self._pasteboard.clearContents()
+        self._pasteboard.setString_forType_(text, self._appkit.NSPasteboardTypeString)
+        self._wait_for_change(change_count)
+
+    def paste(self, text: str) -> bool:
+        """Paste text at the cursor; return whether the target app read it.
+
+        The text goes on the clipboard as a promise, so the pasteboard asks
+        this process for it when the target app handles Cmd+V. That request
+        tells us the paste has been consumed.
+        """
+        appkit = self._appkit
+        change_count = self._pasteboard.changeCount()
+        self._owner.text = text
+        self._owner.read = False
+        self._pasteboard.declareTypes_owner_(
+            [appkit.NSPasteboardTypeString], self._owner
+        )
+        self._wait_for_change(change_count)
+
+        quartz = self._quartz
+        for key_down in (True, False):
+            event = quartz.CGEventCreateKeyboardEvent(None, KEY_V, key_down)
+            quartz.CGEventSetFlags(event, quartz.kCGEventFlagMaskCommand)
+            quartz.CGEventPost(quartz.kCGHIDEventTap, event)
+
+        # The data request arrives through the run loop
+        run_loop = appkit.NSRunLoop.currentRunLoop()
+        deadline = time.monotonic() + PASTE_READ_TIMEOUT
+        while not self._owner.read:
+            if time.monotonic() > deadline:
+                # Nothing read it (e.g. no text field focused): keep the text
+                # on the clipboard without the promise
+                self._pasteboard.setString_forType_(text, appkit.NSPasteboardTypeString)
+                return False
+            run_loop.runMode_beforeDate_(
+                appkit.NSDefaultRunLoopMode,
+                appkit.NSDate.dateWithTimeIntervalSinceNow_(0.01),
+            )
+        return True
+
+
+class _DryRunBackend:
+    def copy(self, text: str) -> None:
+        pass
+
+    def paste(self, text: str) -> bool:
+        return True
+
+
+def _reply(message: dict) -> None:
+    sys.stdout.buffer.write(encode_frame(message))
+    sys.stdout.buffer.flush()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the helper until stdin is closed.
+
+    Args:
+        argv: Command-line arguments (default: sys.argv[1:]).
+    """
+    parser = argparse.ArgumentParser(description="Voice Input paste helper")
+    parser.add_argument("--dry-run", action="store_true", help="Acknowledge only")
+    args = parser.parse_args(argv)
+
+    try:
+        backend = _DryRunBackend() if args.dry_run else _MacBackend()
+    except ImportError as e:
+        _reply({"status": ERROR, "message": str(e)})
+        return
+    _reply({"status": READY})
+
+    while True:
+        try:
+            request = read_frame(sys.stdin.buffer)
+        except (EOFError, ValueError):
+            return  # Out of sync with the app: exit, it restarts the helper
+        if request is None:
+            return
+        op = request.get("op")
+        try:
+            if op == "paste":
+                read = backend.paste(request["text"])
+                _reply({"status": OK, "read": read})
+                continue
+            if op == "copy":
+                backend.copy(request["text"])
+            elif op != "ping":
+                raise ValueError(f"Unknown command: {op}")
+            _reply({"status": OK})
+        except Exception as e:
+            _reply({"status": ERROR, "message": str(e)})
+
+
+if __name__ == "__main__":
+    main()
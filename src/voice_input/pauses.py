@@ -0,0 +1,146 @@
+"""Collapsing of long pauses inside a recording before upload.
+
+Dictations often contain long thinking pauses. Whisper bills and spends
+inference time per second of audio, so pauses longer than a threshold are
+shortened to a short fixed gap before encoding. The cut is crossfaded so it
+doesn't click, and a timeline map is kept to translate positions in the
+collapsed audio back to the original recording.
+
+Pauses are the silent runs of the VAD's per-frame speech decision (see
+vad.detect_speech), so no extra pass over the audio is needed to find them.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .recorder import SAMPLE_RATE
+from .vad import VadResult
+
+MAX_PAUSE_SECONDS = 1.0  # Pauses longer than this are collapsed
+COLLAPSED_PAUSE_SECONDS = 0.3  # ...to a gap of this length
+CROSSFADE_SECONDS = 0.01  # Fade across each cut
+
+
+@dataclass
+class PauseCollapse:
+    """A recording with its long pauses shortened.
+
+    Attributes:
+        audio: Collapsed audio (int16), covering the VAD speech region.
+        anchors: (n, 2) array of (collapsed sample, original sample) at the
+            start of each kept piece, in order; positions between anchors
+            advance together.
+        original_samples: Length of the speech region before collapsing.
+        pauses: Number of pauses collapsed.
+    """
+
+    audio: np.ndarray
+    anchors: np.ndarray
+    original_samples: int
+    pauses: int
+
+    @property
+    def ratio(self) -> float:
+        """Return collapsed length / original length (1.0: nothing removed)."""
+        if self.original_samples == 0:
+            return 1.0
+        return len(self.audio) / self.original_samples
+
+    @property
+    def removed_seconds(self) -> float:
+        """Return how much audio was removed."""
+        return (self.original_samples - len(self.audio)) / SAMPLE_RATE
+
+    def to_original(self, position: int | np.ndarray) -> int | np.ndarray:
+        """Map sample positions in the collapsed audio to the original recording.
+
+        Args:
+            position: Sample index (or array of indices) in self.audio.
+
+        Returns:
+            The corresponding index in the recording passed to collapse_pauses.
+            Positions inside a crossfade map to the end of the earlier piece.
+        """
+        index = np.searchsorted(self.anchors[:, 0], position, side="right") - 1
+        collapsed, original = self.anchors[index].T
+        result = original + (position - collapsed)
+        return int(result) if np.ndim(result) == 0 else result
+
+
+def _silent_runs(speech: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return (start, end) frame indices of the silent runs between speech."""
+    edges = np.diff(np.concatenate(([1], speech.view(np.int8), [1])))
+    starts = np.flatnonzero(edges == -1)
+    ends = np.flatnonzero(edges == 1)
+    # Leading and trailing silence is trimmed by the VAD, not collapsed
+    inner = (starts > 0) & (ends < len(speech))
+    return starts[inner], ends[inner]
+
+
+def collapse_pauses(
+    audio: np.ndarray,
+    vad: VadResult,
+    max_pause_seconds: float = MAX_PAUSE_SECONDS,
+    collapsed_pause_seconds: float = COLLAPSED_PAUSE_SECONDS,
+) -> PauseCollapse:
+    """Shorten pauses longer than max_pause_seconds inside the speech region.
+
+    Each long pause keeps its first and last halves of the collapsed gap,
+    overlapped with a linear crossfade.
+
+    Args:
+        audio: The recording (int16) that vad was computed on.
+        vad: Speech detection result for audio.
+        max_pause_seconds: Pauses longer than this are collapsed.
+        collapsed_pause_seconds: Length of a collapsed pause.
+
+    Returns:
+        The collapsed speech region (audio[vad.start:vad.end] if no pause
+        is long enough) and its timeline map.
+    """
+    samples = audio.reshape(-1)
+    region = samples[vad.start : vad.end]
+    starts, ends = _silent_runs(vad.speech)
+    frame_length = vad.frame_length
+    long_pauses = (ends - starts) * frame_length > max_pause_seconds * SAMPLE_RATE
+    starts = starts[long_pauses] * frame_length
+    ends = ends[long_pauses] * frame_length
+
+    if len(starts) == 0:
+        return PauseCollapse(
+            region, np.array([[0, vad.start]]), len(region), pauses=0
+        )
+
+    gap = int(min(collapsed_pause_seconds, max_pause_seconds) * SAMPLE_RATE)
+    fade = min(int(CROSSFADE_SECONDS * SAMPLE_RATE), gap)
+    # Head and tail kept from each pause; they overlap by fade samples
+    keep = (gap + fade) // 2
+    fade_out = np.linspace(1.0, 0.0, fade, dtype=np.float32)
+    fade_in = 1.0 - fade_out
+
+    # Kept pieces of the recording, in original sample positions
+    piece_starts = np.concatenate(([vad.start], ends - keep))
+    piece_ends = np.concatenate((starts + keep, [vad.end]))
+    pieces = [samples[start:end] for start, end in zip(piece_starts, piece_ends)]
+
+    out = [pieces[0]]
+    anchors = [(0, vad.start)]
+    position = len(pieces[0])
+    for start, piece in zip(piece_starts[1:], pieces[1:]):
+        if fade:
+            # Blend the previous piece's tail into this piece's head
+            blended = out[-1][-fade:] * fade_out + piece[:fade] * fade_in
+            out[-1] = out[-1][:-fade]
+            out.append(np.rint(blended).astype(np.int16))
+        anchors.append((position, start + fade))
+        out.append(piece[fade:])
+        position += len(piece) - fade
+
+    collapsed = np.concatenate(out)
+    return PauseCollapse(
+        collapsed,
+        np.array(anchors, dtype=np.int64),
+        vad.end - vad.start,
+        pauses=len(pieces) - 1,
+    )
@@ -0,0 +1,256 @@
+"""Bounded, ordered processing of finished recordings.
+
+Each released hotkey becomes a DictationJob that runs DictationProcessor on
+a small worker pool. Dictations made back to back are transcribed
+concurrently, but their text is output in recording order: a job's output
+is held until every earlier job has finished (done, failed or cancelled).
+Only MAX_PENDING jobs may be unfinished at once; the app doesn't start a new
+recording while the pipeline is full (backpressure), so a stuck request
+can't pile up work.
+
+A job can be cancelled at any time. Its CancelToken wakes everything
+waiting on the transcription (see RequestScheduler), so the job finishes
+right away and later jobs' text is released. TranscriptionClient also
+aborts the HTTP request on the wire, so it stops uploading and frees its
+connection.
+"""
+
+import itertools
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .dictation import DictationProcessor, DictationResult
+from .engine import CancelToken
+from .logger import get_logger
+from .streaming import StreamingSession
+from .tracing import Trace
+
+logger = get_logger()
+
+MAX_WORKERS = 2  # Dictations transcribed at once
+MAX_PENDING = 4  # Unfinished dictations (running or queued) before refusing more
+JOB_DEADLINE = 120.0  # A dictation's requests fail after this many seconds
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class PipelineFullError(RuntimeError):
+    """Raised when a dictation is submitted while MAX_PENDING are unfinished."""
+
+
+@dataclass
+class DictationJob:
+    """One recording on its way to text.
+
+    Attributes:
+        id: Short id used in the logs.
+        sequence: Recording order (output follows it).
+        audio: The recording; released once the job finishes.
+        session: Streaming session with the earlier segments, if any.
+        trace: Stage latencies of the dictation.
+        state: QUEUED, RUNNING, DONE, CANCELLED or FAILED.
+        cancel: Cancels the job; its deadline is set when the job starts.
+        result: What happened, once the job finished.
+    """
+
+    id: str
+    sequence: int
+    audio: np.ndarray | None
+    session: StreamingSession | None
+    trace: Trace
+    state: str = QUEUED
+    cancel: CancelToken = field(default_factory=CancelToken)
+    result: DictationResult | None = None
+
+    @property
+    def deadline(self) -> float | None:
+        """Return the time.monotonic() by which requests must finish."""
+        return self.cancel.deadline
+
+
+class OrderedOutput:
+    """Outputs the text of several dictations in sequence order. Thread-safe.
+
+    Text of the dictation whose turn it is goes out immediately; text of a
+    later dictation is held until finish() has been called for every
+    earlier one.
+    """
+
+    def __init__(self, output: Callable[[str], None]) -> None:
+        """Initialize the output.
+
+        Args:
+            output: Delivers text (e.g. PasteSink.deliver).
+        """
+        self._output = output
+        self._next = 0  # Sequence whose text may be output now
+        self._held: dict[int, list[str]] = {}
+        self._finished: set[int] = set()
+        self._lock = threading.Lock()
+
+    def deliver(self, sequence: int, text: str) -> None:
+        """Output text of dictation sequence, or hold it until its turn."""
+        with self._lock:
+            if sequence == self._next:
+                self._output(text)
+            else:
+                self._held.setdefault(sequence, []).append(text)
+
+    def finish(self, sequence: int) -> None:
+        """Mark a dictation finished and output held text that is now due."""
+        with self._lock:
+            self._finished.add(sequence)
+            while self._next in self._finished:
+                self._finished.remove(self._next)
+                self._next += 1
+                for text in self._held.pop(self._next, []):
+                    try:
+                        self._output(text)
+                    except Exception as e:
+                        logger.exception("Pipeline: Failed to output held text: %s", e)
+
+
+class DictationPipeline:
+    """Runs dictations on a bounded pool and outputs them in order."""
+
+    def __init__(
+        self,
+        processor: DictationProcessor,
+        on_done: Callable[[DictationJob], None],
+        output: Callable[[str], None],
+        max_workers: int = MAX_WORKERS,
+        max_pending: int = MAX_PENDING,
+        deadline: float = JOB_DEADLINE,
+    ) -> None:
+        """Initialize the pipeline.
+
+        Args:
+            processor: Processes each recording.
+            on_done: Called with each finished job, from a worker thread.
+            output: Delivers the text (in recording order).
+            max_workers: Dictations transcribed at once.
+            max_pending: Unfinished dictations allowed at once.
+            deadline: Seconds a dictation's requests may take once it starts.
+        """
+        self._processor = processor
+        self._on_done = on_done
+        self._output = OrderedOutput(output)
+        self._max_pending = max_pending
+        self._deadline = deadline
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="voice-input-dictation"
+        )
+        self._sequence = itertools.count()
+        self._jobs: list[DictationJob] = []  # Unfinished, in recording order
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Return the number of unfinished dictations."""
+        with self._lock:
+            return len(self._jobs)
+
+    @property
+    def full(self) -> bool:
+        """Return whether submit() would be refused."""
+        return self.pending >= self._max_pending
+
+    def submit(
+        self,
+        audio: np.ndarray,
+        session: StreamingSession | None,
+        trace: Trace,
+    ) -> DictationJob:
+        """Queue a finished recording.
+
+        Args:
+            audio: The recording, as returned by recorder.stop().
+            session: Streaming session for the recording, if any.
+            trace: Trace of the dictation.
+
+        Returns:
+            The queued job.
+
+        Raises:
+            PipelineFullError: If max_pending dictations are unfinished.
+        """
+        with self._lock:
+            if len(self._jobs) >= self._max_pending:
+                raise PipelineFullError(
+                    f"{len(self._jobs)} dictations are still being processed"
+                )
+            sequence = next(self._sequence)
+            job = DictationJob(f"j{sequence + 1:04d}", sequence, audio, session, trace)
+            self._jobs.append(job)
+        logger.debug("Pipeline: Job %s (trace %s) queued", job.id, trace.id)
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job: DictationJob) -> None:
+        with self._lock:
+            if not job.cancel.cancelled:
+                job.state = RUNNING
+                job.cancel.deadline = time.monotonic() + self._deadline
+        try:
+            if job.cancel.cancelled:
+                # Cancelled while queued
+                if job.session is not None:
+                    job.session.cancel()
+                job.result = DictationResult("Ready (cancelled)", cancelled=True)
+            else:
+                job.result = self._processor.process(
+                    job.audio,
+                    job.session,
+                    job.trace,
+                    cancel=job.cancel,
+                    output=lambda text: self._output.deliver(job.sequence, text),
+                )
+        except Exception as e:
+            logger.exception("Pipeline: Job %s failed: %s", job.id, e)
+            job.result = DictationResult("Error", error=e)
+        finally:
+            self._output.finish(job.sequence)
+            with self._lock:
+                if job.result is None or job.result.error is not None:
+                    job.state = FAILED
+                elif job.result.cancelled:
+                    job.state = CANCELLED
+                else:
+                    job.state = DONE
+                job.audio = None
+                job.session = None
+                self._jobs.remove(job)
+        logger.debug("Pipeline: Job %s %s", job.id, job.state)
+        self._on_done(job)
+
+    def cancel_current(self) -> DictationJob | None:
+        """Cancel the oldest unfinished dictation (the one holding up output).
+
+        Returns:
+            The cancelled job, or None if nothing is being processed.
+        """
+        with self._lock:
+            job = self._jobs[0] if self._jobs else None
+        if job is None:
+            return None
+        job.cancel.cancel()
+        logger.info("Pipeline: Cancelling job %s (%s)", job.id, job.state)
+        return job
+
+    def shutdown(self) -> None:
+        """Cancel unfinished dictations and stop the worker threads."""
+        with self._lock:
+            jobs = list(self._jobs)
+        for job in jobs:
+            job.cancel.cancel()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,86 @@
+"""Request rate limiting for the transcription API."""
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .engine import CancelToken
+
+DEFAULT_REQUESTS_PER_MINUTE = 50  # Whisper API default tier limit
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting requests per minute.
+
+    Tokens refill continuously at requests_per_minute / 60 per second, up to
+    burst. Each request takes one token, waiting if none is available.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        burst: int | None = None,
+    ) -> None:
+        """Initialize the bucket (starts full).
+
+        Args:
+            requests_per_minute: Sustained request rate.
+            burst: Maximum tokens held at once. Defaults to one token per
+                second of rate, at least 1.
+        """
+        self._rate = requests_per_minute / 60.0
+        self._capacity = float(burst or max(1, int(self._rate)))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available without waiting.
+
+        Returns:
+            True if a token was taken.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(
+        self, timeout: float | None = None, cancel: "CancelToken | None" = None
+    ) -> bool:
+        """Take a token, waiting until one is available.
+
+        Args:
+            timeout: Maximum seconds to wait. None waits indefinitely.
+            cancel: Stops the wait as soon as it is cancelled.
+
+        Returns:
+            True if a token was taken, False on timeout or cancellation.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self._rate
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            if cancel is None:
+                time.sleep(wait)
+            elif cancel.wait(wait):
+                return False
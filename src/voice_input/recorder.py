@@ -1,40 +1,459 @@
 """Audio recording module using sounddevice."""
 
+import io
 import queue
+import struct
 import tempfile
 import threading
+import time
+from collections import deque
+from collections.abc import Callable
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import numpy as np
-import sounddevice as sd
-from scipy.io import wavfile
 
+from .audio_buffer import DEFAULT_CAPACITY_SECONDS, AudioBuffer
 from .logger import get_logger
 
 SAMPLE_RATE = 16000  # Whisper expects 16kHz
-ABORT_TIMEOUT = 1.0  # Timeout for stream.abort() in seconds
+ABORT_TIMEOUT = 1.0  # A stream teardown taking longer than this counts as hung
+BLOCKSIZE = 0  # Frames per callback; 0 lets PortAudio choose (variable)
+LATENCY = "high"  # PortAudio suggested input latency ("low", "high" or seconds)
+
+# Native-rate capture: the device input carrying the microphone (1 = first)
+INPUT_CHANNEL = 1
+
+# Long recordings: beyond this much audio in RAM (about 19 MB), the buffer
+# spills to a memory-mapped scratch file; audio beyond the limit is dropped
+MAX_MEMORY_SECONDS = 600.0
+MAX_RECORDING_SECONDS = 7200.0
+
+# Warm mode: audio kept from before the key press
+PREROLL_SECONDS = 0.3
+MAX_PREROLL_SECONDS = 2.0  # Memory budget for the pre-roll ring (64 KB)
+
+# Pause detection for streaming (speculative) transcription
+PAUSE_RMS_THRESHOLD = 200  # Blocks quieter than this count as silence
+PAUSE_SECONDS = 0.5  # Silence this long ends a segment
+MIN_SEGMENT_SECONDS = 3.0  # Don't cut segments shorter than this
+
+if TYPE_CHECKING:
+    import sounddevice
+
+    from .resample import BlockConverter
 
 logger = get_logger()
 
+# sounddevice, imported on first use: loading PortAudio is slow
+sd = None
+
+# One reusable in-memory WAV buffer per thread (see encode_wav)
+_wav_buffers = threading.local()
+
+
+def _sounddevice():
+    """Return the sounddevice module, importing it on first use."""
+    global sd
+    if sd is None:
+        import sounddevice
+
+        sd = sounddevice
+    return sd
+
+
+class PauseDetector:
+    """Detects pauses in a live stream, block by block.
+
+    Cheap enough for the audio callback: one dot product per block into a
+    preallocated scratch array. A pause is reported once, when silence has
+    lasted pause_seconds after at least min_segment_seconds since the last
+    reported boundary.
+    """
+
+    def __init__(
+        self,
+        threshold: float = PAUSE_RMS_THRESHOLD,
+        pause_seconds: float = PAUSE_SECONDS,
+        min_segment_seconds: float = MIN_SEGMENT_SECONDS,
+    ) -> None:
+        """Initialize the detector.
+
+        Args:
+            threshold: RMS below which a block counts as silence.
+            pause_seconds: Silence duration that ends a segment.
+            min_segment_seconds: Minimum segment length.
+        """
+        self._threshold_energy = float(threshold) ** 2
+        self._pause_samples = int(pause_seconds * SAMPLE_RATE)
+        self._min_segment_samples = int(min_segment_seconds * SAMPLE_RATE)
+        self._scratch = np.empty(4096, dtype=np.float32)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget state from the previous recording."""
+        self._last_boundary = 0
+        self._silence_start: int | None = None
+        self._reported = False
+
+    def process(self, block: np.ndarray, position: int) -> int | None:
+        """Feed one block.
+
+        Args:
+            block: Samples of the block.
+            position: Sample index of the first sample of the block.
+
+        Returns:
+            Sample index of a segment boundary (the middle of the pause),
+            or None.
+        """
+        samples = block.reshape(-1)
+        n = len(samples)
+        if n == 0:
+            return None
+        if n > len(self._scratch):
+            self._scratch = np.empty(n, dtype=np.float32)
+        scratch = self._scratch[:n]
+        np.copyto(scratch, samples, casting="unsafe")
+        energy = float(np.dot(scratch, scratch)) / n
+
+        if energy >= self._threshold_energy:
+            self._silence_start = None
+            self._reported = False
+            return None
+
+        if self._silence_start is None:
+            self._silence_start = position
+        end = position + n
+        if (
+            not self._reported
+            and end - self._silence_start >= self._pause_samples
+            and self._silence_start - self._last_boundary >= self._min_segment_samples
+        ):
+            self._reported = True
+            self._last_boundary = self._silence_start + self._pause_samples // 2
+            return self._last_boundary
+        return None
+
+
+class PrerollRing:
+    """Fixed-size circular buffer holding the most recent samples."""
+
+    def __init__(self, size: int) -> None:
+        """Initialize the ring.
+
+        Args:
+            size: Number of samples kept.
+        """
+        self._data = np.zeros(max(size, 1), dtype=np.int16)
+        self._position = 0  # Next write index
+        self._filled = 0
+
+    def write(self, block: np.ndarray) -> None:
+        """Add a block, overwriting the oldest samples (no allocation)."""
+        samples = block.reshape(-1)
+        size = len(self._data)
+        if len(samples) >= size:
+            self._data[:] = samples[-size:]
+            self._position = 0
+            self._filled = size
+            return
+        end = self._position + len(samples)
+        if end <= size:
+            self._data[self._position : end] = samples
+        else:
+            split = size - self._position
+            self._data[self._position :] = samples[:split]
+            self._data[: end - size] = samples[split:]
+        self._position = end % size
+        self._filled = min(size, self._filled + len(samples))
+
+    def drain_into(self, buffer: AudioBuffer) -> None:
+        """Append the ring's samples, oldest first, to buffer and empty it."""
+        if self._filled == len(self._data):
+            buffer.append(self._data[self._position :])
+        buffer.append(self._data[: self._position])
+        self._position = 0
+        self._filled = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory held by the ring."""
+        return self._data.nbytes
+
+
+class BlockQueue:
+    """Hands native-rate blocks from the audio callback to the converter.
+
+    Blocks stay in the queue until they are taken under the recorder's
+    convert lock, so whoever holds that lock (the converter thread, or
+    stop() finishing a recording) sees every block not converted yet; none
+    is ever in flight outside it. A SimpleQueue only carries wake-ups.
+    """
+
+    def __init__(self) -> None:
+        self._blocks: deque[np.ndarray] = deque()
+        self._wakeups: queue.SimpleQueue[bool] = queue.SimpleQueue()
+
+    def put(self, block: np.ndarray) -> None:
+        """Queue a block (audio callback; never blocks)."""
+        self._blocks.append(block)
+        self._wakeups.put_nowait(True)
+
+    def close(self) -> None:
+        """Make wait() return False, ending the converter thread."""
+        self._wakeups.put(False)
+
+    def wait(self) -> bool:
+        """Block until a block was queued; False once closed."""
+        return self._wakeups.get()
+
+    def take_all(self) -> list[np.ndarray]:
+        """Remove and return the queued blocks, oldest first."""
+        blocks = []
+        while True:
+            try:
+                blocks.append(self._blocks.popleft())
+            except IndexError:
+                return blocks
+
+
+class StreamReaper:
+    """Tears down retired input streams on one background thread.
+
+    stop() hands the stream over here instead of waiting for
+    stream.abort(), which can take a long time or never return (e.g. when
+    the device went away). The reaper thread aborts and closes the streams
+    in order and times each teardown. One running longer than timeout is
+    logged and counted as hung, and the device is reported as stuck until
+    it returns; streams retired meanwhile wait in the queue behind it. No
+    thread is started per teardown, so repeated hangs can't pile up stuck
+    threads, and a retired stream stays referenced until it is closed, so
+    a hung one is tracked, not leaked.
+    """
+
+    def __init__(self, timeout: float = ABORT_TIMEOUT) -> None:
+        """Initialize the reaper (its thread starts on the first stream).
+
+        Args:
+            timeout: Seconds after which a teardown counts as hung.
+        """
+        self._timeout = timeout
+        self._streams: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._condition = threading.Condition()
+        self._pending = 0  # Retired streams not closed yet (incl. a hung one)
+        self._hung = 0
+        self._reaped = 0
+        self._started: float | None = None  # Start of the running teardown
+        self._stuck = False  # The running teardown exceeded the timeout
+
+    def reap(self, stream: "sounddevice.InputStream") -> None:
+        """Queue a stream for teardown (returns immediately).
+
+        Args:
+            stream: Stream to abort and close.
+        """
+        with self._condition:
+            self._pending += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="voice-input-reaper", daemon=True
+                )
+                self._thread.start()
+            self._check_stuck()
+        self._streams.put(stream)
+
+    def _check_stuck(self) -> None:
+        """Mark the running teardown as hung once it exceeds the timeout.
+
+        Called with the condition held.
+        """
+        if self._started is None or self._stuck:
+            return
+        elapsed = time.monotonic() - self._started
+        if elapsed > self._timeout:
+            self._stuck = True
+            self._hung += 1
+            logger.warning(
+                "Stream teardown hung for %.1fs, input device marked stuck "
+                "(%d streams not closed yet)",
+                elapsed,
+                self._pending,
+            )
+
+    def _run(self) -> None:
+        while True:
+            stream = self._streams.get()
+            with self._condition:
+                self._started = time.monotonic()
+                self._stuck = False
+            self._teardown(stream)
+
+    def _teardown(self, stream: "sounddevice.InputStream") -> None:
+        """Abort and close one stream (on the reaper thread)."""
+        started = time.monotonic()
+        try:
+            stream.abort()
+        except Exception as e:
+            logger.warning("Exception in abort: %s", e)
+        try:
+            stream.close()
+        except Exception as e:
+            logger.warning("Exception in close: %s", e)
+        elapsed = time.monotonic() - started
+        with self._condition:
+            hung = elapsed > self._timeout
+            if hung and not self._stuck:
+                self._hung += 1  # Nobody looked while it hung
+            self._started = None
+            self._stuck = False
+            self._pending -= 1
+            self._reaped += 1
+            self._condition.notify_all()
+        if hung:
+            logger.warning("Stream teardown finished after %.2fs", elapsed)
+        else:
+            logger.debug("Audio stream closed in %.1f ms", elapsed * 1000)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait until every retired stream is closed.
+
+        Returns:
+            True if none is pending, False on timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending, timeout)
+
+    @property
+    def pending(self) -> int:
+        """Return the number of retired streams not closed yet."""
+        return self._pending
+
+    @property
+    def hung(self) -> int:
+        """Return how many teardowns exceeded the timeout."""
+        with self._condition:
+            self._check_stuck()
+            return self._hung
+
+    @property
+    def stuck(self) -> bool:
+        """Return whether a teardown is running past the timeout (device hung)."""
+        with self._condition:
+            self._check_stuck()
+            return self._stuck
+
+    @property
+    def reaped(self) -> int:
+        """Return how many streams were closed."""
+        return self._reaped
+
 
 class StreamingRecorder:
     """Event-driven audio recorder using sounddevice InputStream.
 
     Supports start/stop recording for hold-to-record functionality.
-    Uses queue.Queue instead of Lock for thread-safe buffer access.
+    The callback writes each block directly into a preallocated AudioBuffer
+    (no per-block allocation), and stop() returns a view of it.
+
+    In warm mode the input stream stays open between recordings and the
+    callback keeps the last preroll_seconds in a PrerollRing. start() then
+    only marks the start position (prepending the pre-roll, so the first
+    syllable isn't clipped) and stop() marks the end: no device open or
+    close on the hotkey path.
+
+    Recordings longer than max_memory_seconds are kept in a memory-mapped
+    scratch file instead of RAM (see AudioBuffer), and audio beyond
+    max_seconds is dropped.
+
+    With native_rate, the stream runs at the input device's default rate
+    instead of asking PortAudio for 16 kHz mono, opening as many channels
+    as needed to reach input_channel. The callback then only queues a copy
+    of each block; a converter thread picks out that channel and resamples
+    it (resample.BlockConverter) and feeds the
+    result through the same path as a 16 kHz block. stop() converts the
+    blocks the converter hasn't reached yet itself, under the same lock,
+    so it never waits for that thread and no block from before the key
+    release is lost or lands after the recording was returned.
+
+    stop() never waits for PortAudio: it marks the end of the recording and
+    hands the stream to a StreamReaper, which aborts and closes it in the
+    background. Blocks a retired stream still delivers are ignored, so they
+    can't leak into the next recording.
     """
 
-    def __init__(self) -> None:
-        self._queue: queue.Queue[np.ndarray] = queue.Queue()
-        self._stream: sd.InputStream | None = None
+    def __init__(
+        self,
+        blocksize: int = BLOCKSIZE,
+        latency: float | str = LATENCY,
+        capacity_seconds: float = DEFAULT_CAPACITY_SECONDS,
+        warm: bool = False,
+        preroll_seconds: float = PREROLL_SECONDS,
+        native_rate: bool = False,
+        input_channel: int = INPUT_CHANNEL,
+        max_memory_seconds: float | None = MAX_MEMORY_SECONDS,
+        max_seconds: float = MAX_RECORDING_SECONDS,
+    ) -> None:
+        """Initialize the recorder.
+
+        Args:
+            blocksize: Frames per audio callback (0 = PortAudio default).
+            latency: Suggested input latency ("low", "high" or seconds).
+            capacity_seconds: Initial buffer capacity in seconds.
+            warm: Keep the input stream open between recordings (see open()).
+            preroll_seconds: Audio before start() included in warm mode,
+                at most MAX_PREROLL_SECONDS.
+            native_rate: Capture at the device's native rate and convert to
+                16 kHz off the audio thread.
+            input_channel: Device input to record with native_rate (1 =
+                first). Falls back to the first input if the device has
+                fewer.
+            max_memory_seconds: Audio kept in RAM before the recording
+                spills to a scratch file (None: never spill).
+            max_seconds: Longest recording; later audio is dropped.
+        """
+        self._blocksize = blocksize
+        self._latency = latency
+        self._capacity = int(capacity_seconds * SAMPLE_RATE)
+        self._max_memory = (
+            int(max_memory_seconds * SAMPLE_RATE)
+            if max_memory_seconds is not None
+            else None
+        )
+        self._max_seconds = max_seconds
+        self._buffer = self._new_buffer()
+        self._limit_logged = False
+        self._block_count = 0
+        self._stream: "sounddevice.InputStream | None" = None
+        # Incremented whenever a stream is opened or retired; callbacks of
+        # older streams see a different value and do nothing
+        self._generation = 0
+        self._reaper = StreamReaper()
         self._is_recording: bool = False
+        self._pause_detector = PauseDetector()
+        self._on_segment: Callable[[np.ndarray], None] | None = None
+        self._segment_start = 0
+        self._warm = warm
+        self._preroll = PrerollRing(
+            int(min(preroll_seconds, MAX_PREROLL_SECONDS) * SAMPLE_RATE)
+        )
+        # Orders start()/stop() against the callback while the stream stays open
+        self._lock = threading.Lock()
+        self._native_rate = native_rate
+        self._input_channel = input_channel
+        self._raw_blocks: BlockQueue | None = None
+        self._converter: "BlockConverter | None" = None
+        self._converter_thread: threading.Thread | None = None
+        # Held while converting queued blocks (taken before self._lock)
+        self._convert_lock = threading.Lock()
 
     def _audio_callback(
         self,
         indata: np.ndarray,
         frames: int,
         time: object,
-        status: sd.CallbackFlags,
+        status: "sounddevice.CallbackFlags",
     ) -> None:
         """Called by sounddevice for each audio chunk.
 
@@ -47,118 +466,357 @@ class StreamingRecorder:
         """
         # Log audio stream status if there's an issue
         if status:
-            logger.warning(f"Audio callback status: {status}")
+            logger.warning("Audio callback status: %s", status)
+
+        with self._lock:
+            if not self._is_recording:
+                if self._warm:
+                    self._preroll.write(indata)
+                return
+            position = len(self._buffer)
+            self._buffer.append(indata)
+            self._block_count += 1
+            if self._buffer.full and not self._limit_logged:
+                self._limit_logged = True
+                logger.warning(
+                    "Recording reached %ss, dropping later audio", self._max_seconds
+                )
+            on_segment = self._on_segment
+            if on_segment is not None:
+                boundary = self._pause_detector.process(indata, position)
+                if boundary is not None:
+                    on_segment(self._buffer.view()[self._segment_start : boundary])
+                    self._segment_start = boundary
+
+    def _new_buffer(self) -> AudioBuffer:
+        return AudioBuffer(
+            self._capacity,
+            max_memory=self._max_memory,
+            max_length=int(self._max_seconds * SAMPLE_RATE),
+        )
+
+    def _queue_callback(
+        self,
+        indata: np.ndarray,
+        frames: int,
+        time: object,
+        status: "sounddevice.CallbackFlags",
+    ) -> None:
+        """Audio callback for native-rate streams: hand the block over.
 
-        if self._is_recording:
-            self._queue.put_nowait(indata.copy())
+        PortAudio reuses indata after the callback returns, so it is copied.
+        """
+        if status:
+            logger.warning("Audio callback status: %s", status)
+        raw_blocks = self._raw_blocks
+        if raw_blocks is not None:  # None once the stream is being closed
+            raw_blocks.put(indata.copy())
 
-    def start(self) -> None:
-        """Start recording audio."""
-        logger.info("Recording started")
+    def _convert_blocks(
+        self,
+        converter: "BlockConverter",
+        raw_blocks: BlockQueue,
+        generation: int,
+    ) -> None:
+        """Converter thread: turn queued native-rate blocks into 16 kHz audio."""
+        while raw_blocks.wait():
+            with self._convert_lock:
+                # Once retired, what is left arrived after the recording ended
+                if self._generation == generation:
+                    self._convert_queued(converter, raw_blocks)
+
+    def _convert_queued(
+        self, converter: "BlockConverter", raw_blocks: BlockQueue
+    ) -> None:
+        """Convert and record every queued block (convert lock held)."""
+        for item in raw_blocks.take_all():
+            block = converter.convert(item)
+            if len(block):
+                self._audio_callback(block, len(block), None, None)
+
+    def _device_format(self) -> tuple[int, int]:
+        """Return the (rate, channels) to open the input stream with."""
+        if not self._native_rate:
+            return SAMPLE_RATE, 1
         try:
-            # Clear queue
-            while not self._queue.empty():
-                try:
-                    self._queue.get_nowait()
-                except queue.Empty:
-                    break
-            self._is_recording = True
-
-            self._stream = sd.InputStream(
-                samplerate=SAMPLE_RATE,
-                channels=1,
-                dtype=np.int16,
-                callback=self._audio_callback,
+            device = _sounddevice().query_devices(kind="input")
+            rate = int(device["default_samplerate"])
+            available = int(device["max_input_channels"])
+        except Exception as e:
+            logger.warning("Could not query input device, using 16 kHz mono: %s", e)
+            return SAMPLE_RATE, 1
+        if not 1 <= self._input_channel <= available:
+            logger.warning(
+                "Input channel %d not available (%d inputs), using input 1",
+                self._input_channel,
+                available,
             )
-            self._stream.start()
-            logger.debug("Audio stream opened successfully")
+            return rate, 1
+        # PortAudio opens the first N inputs; the converter keeps the last
+        return rate, self._input_channel
+
+    def _open_stream(self) -> None:
+        if self._reaper.stuck:
+            logger.warning("Opening an input stream while the last one is stuck")
+        rate, channels = self._device_format()
+        try:
+            self._start_stream(rate, channels)
         except Exception as e:
-            logger.exception(f"Failed to start recording: {e}")
+            if (rate, channels) == (SAMPLE_RATE, 1):
+                raise
+            # Some drivers refuse the rate they report; 16 kHz mono may work
+            logger.warning(
+                "Could not open input at %d Hz, %d ch, retrying at 16 kHz mono: %s",
+                rate,
+                channels,
+                e,
+            )
+            self._start_stream(SAMPLE_RATE, 1)
+
+    def _start_stream(self, rate: int, channels: int) -> None:
+        """Open and start the input stream (plus a converter unless 16 kHz mono)."""
+        self._generation += 1
+        generation = self._generation
+        target = self._audio_callback
+        if (rate, channels) != (SAMPLE_RATE, 1):
+            from .resample import BlockConverter
+
+            self._raw_blocks = BlockQueue()
+            self._converter = BlockConverter(rate, channels, channel=channels - 1)
+            self._converter_thread = threading.Thread(
+                target=self._convert_blocks,
+                args=(self._converter, self._raw_blocks, generation),
+                name="voice-input-convert",
+                daemon=True,
+            )
+            self._converter_thread.start()
+            target = self._queue_callback
+
+        def callback(
+            indata: np.ndarray,
+            frames: int,
+            time: object,
+            status: "sounddevice.CallbackFlags",
+        ) -> None:
+            # A retired stream keeps calling until the reaper aborts it
+            if self._generation == generation:
+                target(indata, frames, time, status)
+
+        try:
+            self._stream = _sounddevice().InputStream(
+                samplerate=rate,
+                channels=channels,
+                dtype=np.int16,
+                blocksize=self._blocksize,
+                latency=self._latency,
+                callback=callback,
+            )
+        except Exception:
+            # No stream for _retire_stream() to reap: stop the converter here
+            self._generation += 1
+            if self._raw_blocks is not None:
+                self._raw_blocks.close()
+            self._raw_blocks = None
+            self._converter = None
+            self._converter_thread = None
             raise
+        self._stream.start()
+        logger.debug("Audio stream opened successfully (%d Hz, %d ch)", rate, channels)
 
-    def _abort_with_timeout(self) -> bool:
-        """Abort stream with timeout to prevent hanging.
+    def open(self) -> None:
+        """Open the input stream ahead of the first recording (warm mode).
 
-        Returns:
-            True if abort completed normally, False if timed out.
+        Reopens the stream if it stopped (e.g. the device went away).
         """
-        if not self._stream:
-            return True
-
-        def do_abort() -> None:
-            try:
-                self._stream.abort()
-            except Exception as e:
-                logger.warning(f"Exception in abort: {e}")
+        if self._stream is not None and self._stream.active:
+            return
+        self._retire_stream()
+        self._open_stream()
+        logger.info("Warm input stream opened")
+
+    def close(self) -> None:
+        """Close a warm input stream (in the background, see StreamReaper)."""
+        with self._lock:
+            self._is_recording = False
+            self._retire_stream()
 
-        thread = threading.Thread(target=do_abort)
-        thread.start()
-        thread.join(timeout=ABORT_TIMEOUT)
+    def start(self, on_segment: Callable[[np.ndarray], None] | None = None) -> None:
+        """Start recording audio.
 
-        if thread.is_alive():
-            logger.warning(
-                f"stream.abort() timed out after {ABORT_TIMEOUT}s, forcing continue"
-            )
-            return False
-        return True
+        Args:
+            on_segment: Optional callback for streaming transcription. Called
+                on the audio thread with a view of each finished segment
+                whenever a pause is detected. Must return immediately.
+        """
+        logger.info("Recording started")
+        try:
+            if self._warm:
+                self.open()
+            # Fresh buffer: the previous recording's view may still be in use
+            buffer = self._new_buffer()
+            with self._convert_lock:
+                # Blocks from before the key press go to the pre-roll
+                raw_blocks, converter = self._raw_blocks, self._converter
+                if raw_blocks is not None:
+                    self._convert_queued(converter, raw_blocks)
+                with self._lock:
+                    self._buffer = buffer
+                    self._limit_logged = False
+                    if self._warm:
+                        self._preroll.drain_into(buffer)
+                    self._block_count = 0
+                    self._pause_detector.reset()
+                    self._segment_start = 0
+                    self._on_segment = on_segment
+                    self._is_recording = True
+
+            if not self._warm:
+                self._open_stream()
+        except Exception as e:
+            logger.exception("Failed to start recording: %s", e)
+            raise
 
     def stop(self) -> np.ndarray:
         """Stop recording and return audio data.
 
+        Returns right away: the stream (if not warm) is closed in the
+        background.
+
         Returns:
-            Audio data as numpy array (int16).
+            Audio data as numpy array (int16, 1-D). This is a view of the
+            recording buffer, not a copy.
         """
         logger.info("Recording stopped")
         try:
-            self._is_recording = False
-            if self._stream:
-                logger.debug("Stopping audio stream...")
-                abort_success = self._abort_with_timeout()
-                if abort_success:
-                    logger.debug("Audio stream aborted, closing...")
-                    try:
-                        self._stream.close()
-                    except Exception as e:
-                        logger.warning(f"Exception in close: {e}")
-                    logger.debug("Audio stream closed successfully")
-                else:
-                    logger.warning("Skipping close() due to abort timeout")
-                self._stream = None
-
-            # Collect data from queue
-            logger.debug("Collecting data from queue...")
-            chunks: list[np.ndarray] = []
-            while True:
-                try:
-                    chunk = self._queue.get_nowait()
-                    chunks.append(chunk)
-                except queue.Empty:
-                    break
-
-            buffer_count = len(chunks)
-            if not chunks:
+            with self._convert_lock:
+                # Blocks the converter thread hasn't reached are converted
+                # here rather than waited for; holding the lock until the
+                # view is taken (and the stream retired) keeps the thread
+                # from appending to this recording afterwards
+                raw_blocks, converter = self._raw_blocks, self._converter
+                if raw_blocks is not None:
+                    self._convert_queued(converter, raw_blocks)
+                    if not self._warm:
+                        # The stream ends here: add what the filter still holds.
+                        # A warm stream goes on; those samples start the pre-roll.
+                        tail = converter.flush()
+                        if len(tail):
+                            self._audio_callback(tail, len(tail), None, None)
+                with self._lock:
+                    self._is_recording = False
+                    self._on_segment = None
+                    audio_data = self._buffer.view()
+                    if not self._warm:
+                        self._retire_stream()
+
+            if not len(audio_data):
                 logger.debug("Recording buffer is empty")
-                return np.array([], dtype=np.int16)
+                return audio_data
 
-            logger.debug(f"Concatenating {buffer_count} chunks...")
-            audio_data = np.concatenate(chunks, axis=0)
-            logger.debug("Concatenation complete")
             duration_sec = len(audio_data) / SAMPLE_RATE
             logger.info(
-                f"Recording complete: {buffer_count} chunks, "
-                f"{len(audio_data)} samples, {duration_sec:.2f}s"
+                "Recording complete: %d blocks, %d samples, %.2fs "
+                "(buffer grew %d times%s)",
+                self._block_count,
+                len(audio_data),
+                duration_sec,
+                self._buffer.grow_count,
+                ", spilled to disk" if self._buffer.spilled else "",
             )
+            if self._buffer.dropped:
+                logger.warning(
+                    "Dropped %.2fs beyond the recording limit",
+                    self._buffer.dropped / SAMPLE_RATE,
+                )
             return audio_data
         except Exception as e:
-            logger.exception(f"Failed to stop recording: {e}")
+            logger.exception("Failed to stop recording: %s", e)
             raise
 
+    def _retire_stream(self) -> None:
+        """Detach the stream and hand it to the reaper (non-blocking)."""
+        if not self._stream:
+            return
+        self._generation += 1
+        if self._raw_blocks is not None:
+            # Its callbacks are ignored from now on: end the converter thread
+            self._raw_blocks.close()
+        self._reaper.reap(self._stream)
+        self._stream = None
+        self._raw_blocks = None
+        self._converter = None
+        self._converter_thread = None
+
+    @property
+    def preroll_nbytes(self) -> int:
+        """Return the memory held for the pre-roll (warm mode)."""
+        return self._preroll.nbytes if self._warm else 0
+
+    @property
+    def reaper(self) -> StreamReaper:
+        """Return the reaper closing retired streams (pending, hung counts)."""
+        return self._reaper
+
     @property
     def is_recording(self) -> bool:
         """Return whether recording is in progress."""
         return self._is_recording
 
 
+def encode_wav(
+    audio: np.ndarray,
+    buffer: io.BytesIO | None = None,
+    sample_rate: int = SAMPLE_RATE,
+) -> io.BytesIO:
+    """Encode int16 PCM audio as WAV into an in-memory buffer.
+
+    The buffer is rewound and overwritten, so the same buffer can be reused
+    for every dictation. When no buffer is given, a per-thread buffer is
+    reused; its contents are only valid until the next call on that thread.
+
+    Args:
+        audio: Audio data as numpy array (int16, mono).
+        buffer: Buffer to write into. Defaults to the per-thread buffer.
+        sample_rate: Sample rate written to the header.
+
+    Returns:
+        The buffer, positioned at the start of the WAV data.
+    """
+    if buffer is None:
+        buffer = getattr(_wav_buffers, "buffer", None)
+        if buffer is None:
+            buffer = io.BytesIO()
+            _wav_buffers.buffer = buffer
+
+    pcm = np.ascontiguousarray(audio, dtype="<i2")
+    data_size = pcm.nbytes
+    buffer.seek(0)
+    buffer.truncate()
+    buffer.write(
+        struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF",
+            36 + data_size,
+            b"WAVE",
+            b"fmt ",
+            16,  # fmt chunk size
+            1,  # PCM
+            1,  # channels
+            sample_rate,
+            sample_rate * 2,  # byte rate
+            2,  # block align
+            16,  # bits per sample
+            b"data",
+            data_size,
+        )
+    )
+    buffer.write(memoryview(pcm).cast("B"))
+    buffer.seek(0)
+    # File name lets the API detect the format
+    buffer.name = "audio.wav"
+    return buffer
+
+
 def save_audio(audio: np.ndarray) -> Path:
     """Save audio data to a temporary WAV file.
 
@@ -171,13 +829,13 @@ def save_audio(audio: np.ndarray) -> Path:
     try:
         temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
         temp_path = Path(temp_file.name)
-        temp_file.close()  # Close file handle before writing
-        wavfile.write(str(temp_path), SAMPLE_RATE, audio)
+        with temp_file:
+            temp_file.write(encode_wav(audio).getbuffer())
         file_size = temp_path.stat().st_size
-        logger.debug(f"Audio saved to {temp_path} ({file_size} bytes)")
+        logger.debug("Audio saved to %s (%d bytes)", temp_path, file_size)
         return temp_path
     except Exception as e:
-        logger.exception(f"Failed to save audio: {e}")
+        logger.exception("Failed to save audio: %s", e)
         raise
 
 
@@ -194,6 +852,7 @@ def record_audio(duration: float) -> np.ndarray:
         Audio data as numpy array.
     """
     print(f"Recording for {duration} seconds...")
+    sd = _sounddevice()
     audio = sd.rec(
         int(duration * SAMPLE_RATE),
         samplerate=SAMPLE_RATE,
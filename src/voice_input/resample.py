@@ -0,0 +1,168 @@
+"""Incremental polyphase resampling to the 16 kHz rate Whisper expects.
+
+StreamResampler converts audio block by block, keeping only a filter's
+worth of history, so arbitrarily long inputs can be resampled without
+holding them in memory. It uses the same anti-aliasing filter and delay
+compensation as scipy.signal.resample_poly, so the concatenated output of
+process() and flush() matches a one-shot resample_poly of the whole input.
+"""
+
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .recorder import SAMPLE_RATE
+
+FILTER_HALF_LENGTH = 10  # Filter half-length per unit of max(up, down) (as resample_poly)
+KAISER_BETA = 5.0
+
+
+class StreamResampler:
+    """Stateful rational resampler (float32 mono in, float32 mono out)."""
+
+    def __init__(self, from_rate: int, to_rate: int = SAMPLE_RATE) -> None:
+        """Initialize the resampler.
+
+        Args:
+            from_rate: Input sample rate.
+            to_rate: Output sample rate.
+        """
+        from scipy.signal import firwin
+
+        divisor = gcd(from_rate, to_rate)
+        self._up = to_rate // divisor
+        self._down = from_rate // divisor
+        self.passthrough = self._up == self._down
+        if self.passthrough:
+            return
+
+        max_rate = max(self._up, self._down)
+        half_length = FILTER_HALF_LENGTH * max_rate
+        taps = firwin(
+            2 * half_length + 1, 1.0 / max_rate, window=("kaiser", KAISER_BETA)
+        ) * self._up
+        # Polyphase matrix: row p holds taps p, p + up, p + 2*up, ... reversed,
+        # so a dot product with an input window ending at sample i gives the
+        # contribution of phase p at input position i
+        self._width = -(-len(taps) // self._up)
+        padded = np.zeros(self._width * self._up)
+        padded[: len(taps)] = taps
+        self._phases = padded.reshape(self._width, self._up).T[:, ::-1].astype(np.float32)
+        self._delay = half_length  # Group delay in upsampled samples
+
+        # Input history; _base is the absolute index of its first sample.
+        # Samples before the start of the input are zeros.
+        self._history = np.zeros(self._width - 1, dtype=np.float32)
+        self._base = -(self._width - 1)
+        self._consumed = 0  # Input samples received
+        self._produced = 0  # Output samples emitted
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resample the next block of input.
+
+        Args:
+            block: Input samples (float32, 1-D).
+
+        Returns:
+            Output samples that are fully determined by the input so far.
+        """
+        if self.passthrough:
+            return block
+        self._consumed += len(block)
+        return self._run(block, final=False)
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining output after the last block.
+
+        Returns:
+            Final output samples (the total output length is
+            ceil(input_length * to_rate / from_rate), as resample_poly).
+        """
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        # Enough zeros for the filter tail to clear the last input sample
+        tail = np.zeros(self._delay // self._up + self._width + 1, dtype=np.float32)
+        return self._run(tail, final=True)
+
+    def _run(self, block: np.ndarray, final: bool) -> np.ndarray:
+        buffer = np.concatenate((self._history, block.astype(np.float32, copy=False)))
+        end = self._base + len(buffer)  # One past the last available input
+
+        # Output n needs inputs up to i_n = (n * down + delay) // up
+        last = (end * self._up - 1 - self._delay) // self._down  # Last producible n
+        if final:
+            total = -(-self._consumed * self._up // self._down)
+            last = min(last, total - 1)
+        n = np.arange(self._produced, last + 1, dtype=np.int64)
+        positions = n * self._down + self._delay
+        inputs = positions // self._up
+        phases = positions % self._up
+
+        if len(n):
+            windows = sliding_window_view(buffer, self._width)
+            # Window ending at input i starts at buffer index i - base - width + 1
+            rows = windows[inputs - self._base - self._width + 1]
+            out = np.einsum("nk,nk->n", self._phases[phases], rows)
+            self._produced = int(n[-1]) + 1
+        else:
+            out = np.zeros(0, dtype=np.float32)
+
+        # Keep what the next output still needs
+        next_input = (self._produced * self._down + self._delay) // self._up
+        keep_from = max(0, next_input - self._width + 1 - self._base)
+        keep_from = min(keep_from, len(buffer))
+        self._history = buffer[keep_from:].copy()
+        self._base += keep_from
+        return out.astype(np.float32, copy=False)
+
+
+class BlockConverter:
+    """Converts captured blocks to 16 kHz mono int16, one block at a time.
+
+    One channel is kept and resampled with a StreamResampler, so the result
+    of converting a recording block by block, then calling flush(), matches
+    converting it in one go. Channels
+    are not averaged: on a multi-input interface with one live microphone,
+    the silent inputs would attenuate it and skew the RMS-based VAD.
+    """
+
+    def __init__(self, from_rate: int, channels: int, channel: int = 0) -> None:
+        """Initialize the converter.
+
+        Args:
+            from_rate: Capture sample rate.
+            channels: Capture channel count.
+            channel: Index of the channel to keep (0-based).
+        """
+        self.from_rate = from_rate
+        self.channels = channels
+        self.channel = channel
+        self._resampler = StreamResampler(from_rate)
+
+    def convert(self, block: np.ndarray) -> np.ndarray:
+        """Convert one block.
+
+        Args:
+            block: Captured samples, shape (frames, channels) or (frames,).
+
+        Returns:
+            The 16 kHz int16 samples now determined (may be empty).
+        """
+        if block.ndim == 2 and block.shape[1] > 1:
+            mono = block[:, self.channel].astype(np.float32)
+        else:
+            mono = block.reshape(-1).astype(np.float32)
+        return self._to_int16(self._resampler.process(mono))
+
+    def flush(self) -> np.ndarray:
+        """Return the last samples, still inside the filter, after the last block.
+
+        Returns:
+            Final 16 kHz int16 samples (may be empty).
+        """
+        return self._to_int16(self._resampler.flush())
+
+    @staticmethod
+    def _to_int16(samples: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(samples), -32768, 32767).astype(np.int16)
@@ -0,0 +1,414 @@
+"""Request scheduling for remote engines: rate limiting, retries and hedging.
+
+Every request to a remote engine goes through RequestScheduler, which
+
+- takes a token from a bucket matching the account's requests per minute,
+- retries transient failures (429, 5xx, connection errors) with jittered
+  exponential backoff until an overall deadline, and
+- optionally hedges: if a request is still running after the observed p95
+  latency, an identical request is sent and whichever finishes first wins.
+  Hedges are budgeted to a percentage of primary requests.
+
+A CancelToken passed to transcribe() is waited on together with the
+requests, the rate limit and the retry backoff, so cancelling returns at
+once. Each attempt's requests get a token of their own, cancelled when the
+attempt ends, so engines that can abort a request on the wire (see
+TranscriptionClient) also stop losing hedges and requests past the deadline.
+"""
+
+import io
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .engine import (
+    AudioInput,
+    CancelToken,
+    TranscriptionCancelledError,
+    TranscriptionEngine,
+)
+from .logger import get_logger
+from .ratelimit import DEFAULT_REQUESTS_PER_MINUTE, TokenBucket
+
+logger = get_logger()
+
+MAX_ATTEMPTS = 4  # Attempts per transcription, including the first
+BACKOFF_BASE = 0.5  # Backoff before the first retry (seconds)
+BACKOFF_MAX = 8.0  # Upper bound of a single backoff
+DEADLINE = 30.0  # Give up on a transcription after this many seconds
+HEDGE_PERCENT = 5.0  # Hedged requests allowed, as % of primary requests
+HEDGE_MIN_SAMPLES = 20  # Latencies observed before hedging starts
+HEDGE_PERCENTILE = 95
+LATENCY_WINDOW = 200  # Recent latencies kept for the percentile
+MAX_CONCURRENCY = 8  # Requests (primaries + hedges) in flight at once
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a transcription does not finish before its deadline."""
+
+
+@dataclass
+class RetryPolicy:
+    """Retry attempts and backoff for transient failures.
+
+    Attributes:
+        max_attempts: Attempts per transcription, including the first.
+        backoff_base: Backoff before the first retry.
+        backoff_max: Upper bound of a single backoff.
+        deadline: Overall time limit of a transcription, including retries.
+    """
+
+    max_attempts: int = MAX_ATTEMPTS
+    backoff_base: float = BACKOFF_BASE
+    backoff_max: float = BACKOFF_MAX
+    deadline: float = DEADLINE
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """Return how long to wait before the next attempt.
+
+        Uses "full jitter" (uniform between 0 and the exponential bound) so
+        clients that failed together don't retry together. A Retry-After
+        header on the error's response takes precedence.
+
+        Args:
+            attempt: Number of the attempt that just failed (1-based).
+            error: The failure.
+
+        Returns:
+            Delay in seconds.
+        """
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        bound = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, bound)
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Return the Retry-After of an HTTP error response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LatencyTracker:
+    """Sliding window of request latencies. Thread-safe."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Add the latency of a successful request."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 1) -> float | None:
+        """Return the q-th percentile latency.
+
+        Args:
+            q: Percentile in [0, 100].
+            min_samples: Return None until this many latencies are recorded.
+
+        Returns:
+            Latency in seconds, or None if there are too few samples.
+        """
+        with self._lock:
+            if len(self._latencies) < max(1, min_samples):
+                return None
+            samples = np.fromiter(self._latencies, dtype=np.float64)
+        return float(np.percentile(samples, q))
+
+
+class HedgeBudget:
+    """Caps hedged requests at a percentage of primary requests. Thread-safe."""
+
+    def __init__(self, percent: float = HEDGE_PERCENT) -> None:
+        self._ratio = percent / 100.0
+        self._primaries = 0
+        self._hedges = 0
+        self._lock = threading.Lock()
+
+    def record_primary(self) -> None:
+        """Count a primary request."""
+        with self._lock:
+            self._primaries += 1
+
+    def try_spend(self) -> bool:
+        """Take budget for one hedge if it stays within the percentage.
+
+        Returns:
+            True if the hedge may be sent.
+        """
+        with self._lock:
+            if self._hedges + 1 > self._primaries * self._ratio:
+                return False
+            self._hedges += 1
+            return True
+
+    def refund(self) -> None:
+        """Return budget taken by try_spend() for a hedge that wasn't sent."""
+        with self._lock:
+            self._hedges -= 1
+
+    @property
+    def primaries(self) -> int:
+        """Return the number of primary requests."""
+        return self._primaries
+
+    @property
+    def hedges(self) -> int:
+        """Return the number of hedged requests sent."""
+        return self._hedges
+
+
+class RequestScheduler(TranscriptionEngine):
+    """Wraps a remote engine with rate limiting, retries and hedging.
+
+    Behaves like the wrapped engine (same name, model and encoder
+    preference), so it can be used anywhere an engine is expected.
+    """
+
+    def __init__(
+        self,
+        engine: TranscriptionEngine,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        retry: RetryPolicy | None = None,
+        hedge_percent: float = HEDGE_PERCENT,
+        max_concurrency: int = MAX_CONCURRENCY,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            engine: Engine that sends the actual requests. It should not
+                retry on its own.
+            requests_per_minute: Request budget shared by all callers,
+                including retries and hedges.
+            retry: Retry policy. Defaults to RetryPolicy().
+            hedge_percent: Hedged requests allowed as a percentage of
+                primary requests. 0 disables hedging.
+            max_concurrency: Requests in flight at once.
+        """
+        self._engine = engine
+        self._retry = retry or RetryPolicy()
+        # Allow a burst the size of the pool (e.g. all chunks of a long recording)
+        self._limiter = TokenBucket(requests_per_minute, burst=max_concurrency)
+        self._latency = LatencyTracker()
+        self._hedge_budget = HedgeBudget(hedge_percent)
+        self._hedging = hedge_percent > 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="voice-input-request"
+        )
+        self.name = engine.name
+        self.preferred_encoder = engine.preferred_encoder
+        self.remote = engine.remote
+
+    @property
+    def engine(self) -> TranscriptionEngine:
+        """Return the wrapped engine."""
+        return self._engine
+
+    @property
+    def model_id(self) -> str:
+        """Return the wrapped engine's model."""
+        return self._engine.model_id
+
+    @property
+    def hedge_budget(self) -> HedgeBudget:
+        """Return the hedge counters."""
+        return self._hedge_budget
+
+    def _transcribe(
+        self, audio: AudioInput, language: str, cancel: CancelToken | None = None
+    ) -> str:
+        """Transcribe with retries until the deadline.
+
+        The deadline is the retry policy's, or the token's if that is sooner.
+
+        Raises:
+            DeadlineExceededError: If the deadline passes first.
+            TranscriptionCancelledError: If cancel is cancelled first.
+            Exception: The last error if it isn't transient or attempts run out.
+        """
+        audio = _Replayable(audio)
+        deadline = time.monotonic() + self._retry.deadline
+        if cancel is not None and cancel.deadline is not None:
+            deadline = min(deadline, cancel.deadline)
+        attempt = 1
+        while True:
+            try:
+                return self._attempt(audio, language, deadline, cancel)
+            except (DeadlineExceededError, TranscriptionCancelledError):
+                raise
+            except Exception as e:
+                if not isinstance(e, self._engine.transient_errors):
+                    raise
+                if attempt >= self._retry.max_attempts:
+                    logger.warning(
+                        "Scheduler: Giving up after %d attempts: %s", attempt, e
+                    )
+                    raise
+                delay = self._retry.backoff(attempt, e)
+                if time.monotonic() + delay >= deadline:
+                    logger.warning("Scheduler: No time left to retry: %s", e)
+                    raise
+                logger.warning(
+                    "Scheduler: Attempt %d failed (%s), retrying in %.2fs",
+                    attempt,
+                    type(e).__name__,
+                    delay,
+                )
+                if cancel is None:
+                    time.sleep(delay)
+                else:
+                    cancel.wait(delay)
+                    cancel.check()
+                attempt += 1
+
+    def _attempt(
+        self,
+        audio: "_Replayable",
+        language: str,
+        deadline: float,
+        cancel: CancelToken | None,
+    ) -> str:
+        """Send one request (plus a hedge if it is slow) and return the winner."""
+        acquired = self._limiter.acquire(
+            timeout=max(0.0, deadline - time.monotonic()), cancel=cancel
+        )
+        if cancel is not None:
+            cancel.check()
+        if not acquired:
+            raise DeadlineExceededError("Rate limit wait exceeded the deadline")
+
+        # Cancelled when this attempt returns, aborting requests still running
+        requests_cancel = CancelToken()
+        if cancel is not None:
+            cancel.future.add_done_callback(lambda _: requests_cancel.cancel())
+        try:
+            return self._wait_attempt(
+                audio, language, deadline, cancel, requests_cancel
+            )
+        finally:
+            requests_cancel.cancel()
+
+    def _wait_attempt(
+        self,
+        audio: "_Replayable",
+        language: str,
+        deadline: float,
+        cancel: CancelToken | None,
+        requests_cancel: CancelToken,
+    ) -> str:
+        """Wait for the winner of one attempt's requests."""
+        self._hedge_budget.record_primary()
+        pending = {self._executor.submit(self._send, audio, language, requests_cancel)}
+        # The token's future wakes the waits below when cancelled
+        cancelled = {cancel.future} if cancel is not None else set()
+
+        hedge_delay = None
+        if self._hedging:
+            hedge_delay = self._latency.percentile(HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES)
+        if hedge_delay is not None:
+            done, _ = wait(
+                pending | cancelled,
+                timeout=min(hedge_delay, deadline - time.monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done and self._try_hedge():
+                logger.info(
+                    "Scheduler: Request exceeded p%d (%.2fs), sending hedge (%d/%d)",
+                    HEDGE_PERCENTILE,
+                    hedge_delay,
+                    self._hedge_budget.hedges,
+                    self._hedge_budget.primaries,
+                )
+                pending.add(
+                    self._executor.submit(self._send, audio, language, requests_cancel)
+                )
+
+        error: BaseException | None = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            done, pending = wait(
+                pending | cancelled,
+                timeout=max(0.0, remaining),
+                return_when=FIRST_COMPLETED,
+            )
+            pending -= cancelled
+            if not done:
+                for future in pending:
+                    future.cancel()
+                raise DeadlineExceededError(
+                    "Transcription did not finish before its deadline"
+                )
+            if cancel is not None and cancel.cancelled:
+                for future in pending:
+                    future.cancel()
+                raise TranscriptionCancelledError("Transcription cancelled")
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _try_hedge(self) -> bool:
+        """Take hedge budget and a rate limit token, or neither."""
+        if not self._hedge_budget.try_spend():
+            return False
+        if not self._limiter.try_acquire():
+            self._hedge_budget.refund()
+            return False
+        return True
+
+    def _send(self, audio: "_Replayable", language: str, cancel: CancelToken) -> str:
+        start_time = time.perf_counter()
+        text = self._engine._transcribe(audio.open(), language, cancel)
+        self._latency.record(time.perf_counter() - start_time)
+        return text
+
+    def preconnect(self) -> None:
+        """Let the wrapped engine prepare for a transcription."""
+        self._engine.preconnect()
+
+    def close(self) -> None:
+        """Stop the request threads and close the wrapped engine."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._engine.close()
+
+
+class _Replayable:
+    """Audio that can be sent more than once (retries and hedges).
+
+    Buffers are read once into bytes; each open() returns a fresh buffer
+    with the same name so the format is still inferred correctly.
+    """
+
+    def __init__(self, audio: AudioInput) -> None:
+        if isinstance(audio, (Path, bytes)):
+            self._data = audio
+            self._name = None
+        else:
+            self._name = getattr(audio, "name", None)
+            self._data = audio.read()
+
+    def open(self) -> AudioInput:
+        if isinstance(self._data, Path):
+            return self._data
+        buffer = io.BytesIO(self._data)
+        if isinstance(self._name, str):
+            buffer.name = self._name
+        return buffer
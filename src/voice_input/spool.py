@@ -0,0 +1,453 @@
+"""Durable on-disk spool for dictations that fail to transcribe.
+
+Audio goes into ~/.voice-input/spool/ when an upload fails (or is still
+running after SLOW_UPLOAD_SECONDS, so a crash mid-upload doesn't lose it),
+and a background drainer retries it once the network is back. The layout is
+
+- one audio file per job, written to a temporary name, fsync'd and
+  atomically renamed into place, and
+- journal.jsonl, an append-only log of "add" / "done" / "drop" records,
+  fsync'd after every append. A job is pending if it has an "add" and no
+  "done" or "drop"; the journal is compacted at startup.
+
+On the hot path stage() only hands the encoded audio to a writer thread,
+which holds it in memory and writes it only if the upload turns out slow,
+so the upload never waits for the disk and a successful dictation never
+touches it. Transcripts are never written to the spool.
+"""
+
+import io
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from .config import CONFIG_DIR
+from .logger import get_logger
+
+logger = get_logger()
+
+SPOOL_DIR = CONFIG_DIR / "spool"
+JOURNAL_NAME = "journal.jsonl"
+FAILED_DIR_NAME = "failed"  # Jobs that kept failing are moved here
+MAX_ATTEMPTS = 10  # Non-network failures before a job is given up
+DRAIN_WORKERS = 2  # Spooled jobs transcribed at once
+RETRY_DELAY = 15.0  # First wait before retrying after a failed drain
+MAX_RETRY_DELAY = 600.0  # Upper bound of the (doubling) retry wait
+SLOW_UPLOAD_SECONDS = 2.0  # Staged audio is written once its upload runs this long
+
+
+@dataclass
+class SpoolJob:
+    """A spooled dictation.
+
+    Attributes:
+        id: Unique job id.
+        filename: Audio file name inside the spool directory.
+        language: Language code for transcription.
+        kind: "encoded" for upload-ready audio, "pcm" for a 16 kHz WAV of a
+            recording that needs the long-form path.
+        created: Unix time the dictation was recorded.
+        attempts: Non-network drain failures so far (not persisted).
+    """
+
+    id: str
+    filename: str
+    language: str
+    kind: str
+    created: float
+    attempts: int = 0
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist renames/unlinks in a directory (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SpoolTicket:
+    """Handle for audio staged before an upload.
+
+    Call done() when the upload succeeded or fail() when it didn't.
+    """
+
+    def __init__(self, spool: "Spool", job: SpoolJob, data: bytes | io.BytesIO) -> None:
+        self._spool = spool
+        self.job = job
+        self._data: bytes | io.BytesIO | None = data
+        self.due = time.monotonic() + SLOW_UPLOAD_SECONDS  # Written if still running
+        self.completed = False
+        self.written = False
+        self._lock = threading.Lock()  # Serializes the write
+
+    def done(self) -> None:
+        """Mark the upload as successful (the staged copy is discarded)."""
+        self.completed = True
+        self._spool._queue.put(("done", self))
+
+    def fail(self) -> bool:
+        """Mark the upload as failed, writing the audio now if it isn't yet.
+
+        Returns:
+            True if the audio is spooled (eligible for draining), False if
+            it couldn't be written.
+        """
+        try:
+            self._spool._persist(self)
+        except OSError as e:
+            logger.exception("Spool: Failed to write %s: %s", self.job.id, e)
+            return False
+        self._spool._mark_ready(self.job)
+        logger.info("Spool: Dictation %s saved for retry", self.job.id)
+        return True
+
+
+class Spool:
+    """Crash-safe store of dictations awaiting transcription. Thread-safe."""
+
+    def __init__(self, directory: Path = SPOOL_DIR) -> None:
+        """Open the spool, recovering pending jobs from the journal.
+
+        Args:
+            directory: Spool directory.
+        """
+        self._directory = directory
+        self._journal_path = directory / JOURNAL_NAME
+        self._lock = threading.Lock()
+        self._jobs: dict[str, SpoolJob] = {}  # Written and not done
+        self._ready: dict[str, SpoolJob] = {}  # Failed: eligible for draining
+        self._listeners: list[Callable[[], None]] = []
+        self._queue: queue.SimpleQueue[tuple[str, SpoolTicket]] = queue.SimpleQueue()
+        try:
+            self._recover()
+        except OSError as e:
+            # Unreadable or read-only spool: start empty, new failures may
+            # still be written
+            logger.warning("Spool: Failed to recover %s: %s", directory, e)
+            self._jobs = {}
+            self._ready = {}
+        threading.Thread(
+            target=self._write_loop, name="voice-input-spool", daemon=True
+        ).start()
+
+    def _recover(self) -> None:
+        """Load pending jobs and compact the journal."""
+        jobs: dict[str, SpoolJob] = {}
+        try:
+            with self._journal_path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn write at a crash: the record never committed
+                    op = record.pop("op", None)
+                    if op == "add":
+                        job = SpoolJob(**record)
+                        if (self._directory / job.filename).exists():
+                            jobs[job.id] = job
+                    elif op in ("done", "drop"):
+                        jobs.pop(record.get("id"), None)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Spool: Failed to read journal: %s", e)
+            return
+
+        self._jobs = dict(jobs)
+        self._ready = dict(jobs)
+        if not self._directory.exists():
+            return
+
+        # Rewrite the journal with only pending jobs, then drop orphan files
+        temp_path = self._journal_path.with_suffix(".tmp")
+        with temp_path.open("w", encoding="utf-8") as f:
+            for job in jobs.values():
+                f.write(json.dumps({"op": "add", **self._record(job)}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self._journal_path)
+        keep = {job.filename for job in jobs.values()} | {JOURNAL_NAME, FAILED_DIR_NAME}
+        for path in self._directory.iterdir():
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+        _fsync_directory(self._directory)
+        if jobs:
+            logger.info("Spool: Recovered %d pending dictations", len(jobs))
+
+    @staticmethod
+    def _record(job: SpoolJob) -> dict:
+        record = asdict(job)
+        del record["attempts"]
+        return record
+
+    def _append(self, record: dict) -> None:
+        """Append a record to the journal and fsync it."""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock, self._journal_path.open("a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _new_job(self, suffix: str, language: str, kind: str) -> SpoolJob:
+        job_id = uuid.uuid4().hex
+        return SpoolJob(job_id, f"{job_id}{suffix}", language, kind, time.time())
+
+    def stage(
+        self, data: bytes | io.BytesIO, suffix: str, language: str = "ja"
+    ) -> SpoolTicket:
+        """Keep encoded audio in case its upload fails or is slow.
+
+        Nothing is written unless fail() is called or the upload is still
+        running after SLOW_UPLOAD_SECONDS (then the spool thread writes it),
+        so the caller never waits for the disk.
+
+        Args:
+            data: Encoded audio. A buffer is kept, not copied: the ticket
+                owns it and it must not be modified (reading it, e.g. to
+                upload it, is fine).
+            suffix: File extension matching the encoding (e.g. ".flac").
+            language: Language code for transcription.
+
+        Returns:
+            Ticket to report the upload outcome on.
+        """
+        ticket = SpoolTicket(self, self._new_job(suffix, language, "encoded"), data)
+        self._queue.put(("stage", ticket))
+        return ticket
+
+    def save(
+        self, data: bytes, suffix: str, language: str = "ja", kind: str = "encoded"
+    ) -> SpoolJob:
+        """Spool audio of a failed dictation right away (blocking).
+
+        Args:
+            data: Audio file contents.
+            suffix: File extension (e.g. ".wav").
+            language: Language code for transcription.
+            kind: "encoded" or "pcm" (see SpoolJob).
+
+        Returns:
+            The spooled job, already eligible for draining.
+        """
+        job = self._new_job(suffix, language, kind)
+        self._write(job, data)
+        self._mark_ready(job)
+        return job
+
+    def _persist(self, ticket: SpoolTicket) -> None:
+        """Write a staged ticket's audio unless written or done already."""
+        with ticket._lock:
+            data, ticket._data = ticket._data, None
+            if data is not None and not ticket.completed:
+                self._write(ticket.job, data)
+                ticket.written = True
+
+    def _mark_ready(self, job: SpoolJob) -> None:
+        with self._lock:
+            self._ready[job.id] = job
+        self._notify()
+
+    def _write(self, job: SpoolJob, data: bytes | io.BytesIO) -> None:
+        """Write the audio file atomically, then commit the job to the journal."""
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._directory / job.filename
+        temp_path = path.with_name(f".{job.filename}.tmp")
+        with temp_path.open("wb") as f:
+            if isinstance(data, io.BytesIO):
+                # Whole buffer, whatever its position (an upload may be reading it)
+                with data.getbuffer() as view:
+                    size = f.write(view)
+            else:
+                size = f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        _fsync_directory(self._directory)
+        self._append({"op": "add", **self._record(job)})
+        with self._lock:
+            self._jobs[job.id] = job
+        logger.debug("Spool: Wrote %s (%d bytes)", job.filename, size)
+
+    def _write_loop(self) -> None:
+        staged: deque[SpoolTicket] = deque()  # In due order (fixed delay)
+        while True:
+            timeout = None
+            if staged:
+                timeout = max(0.0, staged[0].due - time.monotonic())
+            try:
+                action, ticket = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                action = None
+            try:
+                if action == "stage":
+                    staged.append(ticket)
+                elif action == "done":
+                    ticket._data = None
+                    if ticket.written:
+                        self.complete(ticket.job)
+            except OSError as e:
+                logger.exception("Spool: Failed to %s %s: %s", action, ticket.job.id, e)
+
+            # Uploads still running after SLOW_UPLOAD_SECONDS: write them now
+            now = time.monotonic()
+            while staged and (staged[0].due <= now or staged[0].completed):
+                ticket = staged.popleft()
+                if ticket.completed:
+                    continue
+                try:
+                    self._persist(ticket)
+                except OSError as e:
+                    logger.exception("Spool: Failed to write %s: %s", ticket.job.id, e)
+
+    def _notify(self) -> None:
+        for listener in list(self._listeners):
+            listener()
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Register a callback run whenever a job becomes ready to drain."""
+        self._listeners.append(listener)
+
+    def path(self, job: SpoolJob) -> Path:
+        """Return the audio file of a job."""
+        return self._directory / job.filename
+
+    def ready(self) -> list[SpoolJob]:
+        """Return jobs eligible for draining, oldest first."""
+        with self._lock:
+            return sorted(self._ready.values(), key=lambda job: job.created)
+
+    def complete(self, job: SpoolJob) -> None:
+        """Remove a transcribed job from the spool."""
+        self._append({"op": "done", "id": job.id})
+        with self._lock:
+            self._jobs.pop(job.id, None)
+            self._ready.pop(job.id, None)
+        self.path(job).unlink(missing_ok=True)
+
+    def drop(self, job: SpoolJob) -> None:
+        """Give up on a job, moving its audio to the failed directory."""
+        failed_dir = self._directory / FAILED_DIR_NAME
+        failed_dir.mkdir(exist_ok=True)
+        try:
+            os.replace(self.path(job), failed_dir / job.filename)
+        except FileNotFoundError:
+            pass
+        self._append({"op": "drop", "id": job.id})
+        with self._lock:
+            self._jobs.pop(job.id, None)
+            self._ready.pop(job.id, None)
+        logger.warning(
+            "Spool: Gave up on %s after %d attempts; audio kept in %s",
+            job.id,
+            job.attempts,
+            failed_dir,
+        )
+
+
+def _is_network_error(error: Exception) -> bool:
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+class SpoolDrainer:
+    """Background thread retrying spooled jobs until they succeed.
+
+    A round starts when a job is spooled, when wake() is called (e.g. after
+    a successful live transcription shows the network is back), or after a
+    retry delay that doubles while the oldest job keeps failing.
+    """
+
+    def __init__(
+        self,
+        spool: Spool,
+        transcribe: Callable[[SpoolJob, Path], str],
+        on_result: Callable[[SpoolJob, str], None],
+        max_workers: int = DRAIN_WORKERS,
+        is_network_error: Callable[[Exception], bool] = _is_network_error,
+    ) -> None:
+        """Start the drainer.
+
+        Args:
+            spool: Spool to drain.
+            transcribe: Transcribes a job given its audio file.
+            on_result: Called with each recovered transcript.
+            max_workers: Jobs transcribed at once.
+            is_network_error: Whether a failure means we are still offline.
+                Those are retried indefinitely; other failures count
+                towards MAX_ATTEMPTS.
+        """
+        self._spool = spool
+        self._transcribe = transcribe
+        self._on_result = on_result
+        self._is_network_error = is_network_error
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="voice-input-drain"
+        )
+        self._wake = threading.Event()
+        self._stopped = False
+        self._delay = RETRY_DELAY
+        spool.add_listener(self.wake)
+        self._thread = threading.Thread(
+            target=self._run, name="voice-input-drainer", daemon=True
+        )
+        self._thread.start()
+
+    def wake(self) -> None:
+        """Start a drain round now (if anything is pending)."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        # Recovered jobs are tried right away
+        self._wake.set()
+        while not self._stopped:
+            self._wake.wait(timeout=self._delay)
+            self._wake.clear()
+            jobs = self._spool.ready()
+            if not jobs or self._stopped:
+                continue
+
+            # Probe with the oldest job so an outage costs one request per round
+            if not self._drain(jobs[0]):
+                self._delay = min(self._delay * 2, MAX_RETRY_DELAY)
+                logger.info("Spool: Retrying in %.0fs", self._delay)
+                continue
+            self._delay = RETRY_DELAY
+            list(self._executor.map(self._drain, jobs[1:]))
+
+    def _drain(self, job: SpoolJob) -> bool:
+        try:
+            text = self._transcribe(job, self._spool.path(job))
+        except Exception as e:
+            logger.warning("Spool: Retry of %s failed: %s", job.id, e)
+            if not self._is_network_error(e):
+                job.attempts += 1
+                if job.attempts >= MAX_ATTEMPTS:
+                    self._spool.drop(job)
+            return False
+        self._spool.complete(job)
+        logger.info("Spool: Recovered %s (%d chars)", job.id, len(text))
+        try:
+            self._on_result(job, text)
+        except Exception as e:
+            logger.exception("Spool: Result handler failed: %s", e)
+        return True
+
+    def shutdown(self) -> None:
+        """Stop draining (pending jobs stay spooled)."""
+        self._stopped = True
+        self._wake.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,185 @@
+"""Speculative transcription of finished segments while still recording.
+
+With streaming enabled, the recorder reports a segment every time the user
+pauses, and each segment is uploaded in the background right away. When the
+hotkey is released only the tail segment is still outstanding, so the wait
+after release depends on the last utterance, not the whole dictation.
+"""
+
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from .chunking import gather, join, notify_completed
+from .encoder import EncoderStage
+from .engine import CancelToken, TranscriptionEngine
+from .logger import get_logger
+from .recorder import SAMPLE_RATE
+
+logger = get_logger()
+
+MAX_WORKERS = 2  # Segments in flight at once
+MIN_TAIL_SECONDS = 0.3  # Shorter tails are dropped (nothing left to say)
+
+_FINISHED = None  # Sentinel closing a session's segment queue
+
+
+class StreamingSession:
+    """Segments and their in-flight transcriptions for one dictation.
+
+    on_segment() is called from the audio callback, so it only enqueues;
+    a session thread does the encoding and submission. The segments'
+    requests share a CancelToken, which finish() links to the dictation's
+    token and cancel() cancels.
+    """
+
+    def __init__(self, owner: "SpeculativeTranscriber", language: str) -> None:
+        self._owner = owner
+        self._language = language
+        self._segments: queue.SimpleQueue[np.ndarray | None] = queue.SimpleQueue()
+        self._futures: list[Future[str]] = []
+        self._consumed = 0  # Samples covered by submitted segments
+        self._cancel = CancelToken()
+        self._thread = threading.Thread(
+            target=self._submit_segments, name="voice-input-streaming", daemon=True
+        )
+        self._thread.start()
+
+    def on_segment(self, audio: np.ndarray) -> None:
+        """Queue a finished segment (called on the audio thread)."""
+        self._segments.put_nowait(audio)
+
+    def _submit_segments(self) -> None:
+        while True:
+            audio = self._segments.get()
+            if audio is _FINISHED:
+                return
+            self._submit(audio)
+
+    def _submit(self, audio: np.ndarray) -> None:
+        index = len(self._futures)
+        self._consumed += len(audio)
+        logger.debug(
+            "Streaming: Segment %d submitted (%.1fs)", index, len(audio) / SAMPLE_RATE
+        )
+        self._futures.append(
+            self._owner._submit(audio, self._language, index, self._cancel)
+        )
+
+    def finish(
+        self,
+        audio: np.ndarray,
+        on_text: Callable[[int, str], None] | None = None,
+        cancel: CancelToken | None = None,
+    ) -> str:
+        """Submit the tail and assemble the transcript.
+
+        Args:
+            audio: The complete recording, as returned by recorder.stop().
+            on_text: Called with (segment index, text) for each segment as
+                it finishes (right away for those already done).
+            cancel: Cancels the segments' requests and stops waiting for
+                them when cancelled; its deadline applies to the tail.
+
+        Returns:
+            Combined transcript of all segments.
+
+        Raises:
+            TranscriptionCancelledError: If cancel is cancelled first.
+        """
+        self._segments.put(_FINISHED)
+        self._thread.join()
+        if cancel is not None:
+            self._cancel.deadline = cancel.deadline
+            cancel.future.add_done_callback(lambda _: self._cancel.cancel())
+
+        tail = audio.reshape(-1)[self._consumed :]
+        if len(tail) >= MIN_TAIL_SECONDS * SAMPLE_RATE:
+            self._submit(tail)
+        logger.info(
+            "Streaming: %d segments, tail %.1fs outstanding at release",
+            len(self._futures),
+            len(tail) / SAMPLE_RATE,
+        )
+        notify_completed(self._futures, on_text)
+        # Segments are cut at pauses and don't overlap: nothing to stitch
+        return join(gather(self._futures, cancel))
+
+    def cancel(self) -> None:
+        """Discard the session (e.g. the recording was too short or silent)."""
+        self._segments.put(_FINISHED)
+        self._thread.join()
+        self._cancel.cancel()
+        for future in self._futures:
+            future.cancel()
+
+
+class SpeculativeTranscriber:
+    """Runs segment transcriptions for streaming sessions on a bounded pool."""
+
+    def __init__(
+        self,
+        transcriber: TranscriptionEngine,
+        encoder_stage: EncoderStage,
+        max_workers: int = MAX_WORKERS,
+    ) -> None:
+        """Initialize the speculative transcriber.
+
+        Args:
+            transcriber: Engine used for each segment.
+            encoder_stage: Encoder applied to each segment before upload.
+            max_workers: Maximum segments in flight.
+        """
+        self._transcriber = transcriber
+        self._encoder_stage = encoder_stage
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="voice-input-segment"
+        )
+
+    def start_session(self, language: str = "ja") -> StreamingSession:
+        """Begin a new dictation.
+
+        Args:
+            language: Language code for transcription.
+
+        Returns:
+            Session whose on_segment should be passed to recorder.start().
+        """
+        return StreamingSession(self, language)
+
+    def _submit(
+        self, audio: np.ndarray, language: str, index: int, cancel: CancelToken
+    ) -> Future[str]:
+        return self._executor.submit(
+            self._transcribe_segment, audio, language, index, cancel
+        )
+
+    def _transcribe_segment(
+        self, audio: np.ndarray, language: str, index: int, cancel: CancelToken
+    ) -> str:
+        encoded = self._encoder_stage.encode(audio)
+        try:
+            start_time = time.perf_counter()
+            text = self._transcriber.transcribe(
+                encoded.buffer, language, cancel, pcm=audio
+            )
+            logger.debug(
+                "Streaming: Segment %d done in %.2fs",
+                index,
+                time.perf_counter() - start_time,
+            )
+            return text
+        finally:
+            encoded.release()
+
+    def set_engine(self, transcriber: TranscriptionEngine) -> None:
+        """Use a different engine for subsequent requests."""
+        self._transcriber = transcriber
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
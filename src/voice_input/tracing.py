@@ -0,0 +1,173 @@
+"""Per-stage latency tracing for dictations.
+
+Each dictation gets a Trace with a short correlation id. Stages record how
+long they took with ``trace.span("encode")``; when the dictation is done the
+Tracer folds the spans into per-stage histograms and keeps the last trace
+for the menu. With tracing off the Tracer hands out NULL_TRACE, whose spans
+do nothing.
+"""
+
+import itertools
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+
+from .logger import get_logger
+
+logger = get_logger()
+
+# Histogram resolution: values below 2**SUB_BUCKET_BITS microseconds are
+# exact, larger ones keep SUB_BUCKET_BITS - 1 significant bits (about 3%)
+SUB_BUCKET_BITS = 6
+MAX_MICROSECONDS = 3600 * 1_000_000  # Longer values are clamped to an hour
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations (HDR-style, fixed relative error).
+
+    Memory grows with the logarithm of the largest value, not with the
+    number of values recorded.
+    """
+
+    def __init__(self) -> None:
+        self._counts: list[int] = []
+        self._half = 1 << (SUB_BUCKET_BITS - 1)
+        self.count = 0
+
+    def _index(self, microseconds: int) -> int:
+        shift = max(0, microseconds.bit_length() - SUB_BUCKET_BITS)
+        if shift == 0:
+            return microseconds
+        return shift * self._half + (microseconds >> shift)
+
+    def _value(self, index: int) -> float:
+        """Midpoint of a bucket in microseconds."""
+        if index < 2 * self._half:
+            return float(index)
+        shift = index // self._half - 1
+        low = (index - shift * self._half) << shift
+        return low + ((1 << shift) - 1) / 2
+
+    def record(self, seconds: float) -> None:
+        """Add a duration."""
+        microseconds = min(max(0, int(seconds * 1_000_000)), MAX_MICROSECONDS)
+        index = self._index(microseconds)
+        if index >= len(self._counts):
+            self._counts.extend([0] * (index + 1 - len(self._counts)))
+        self._counts[index] += 1
+        self.count += 1
+
+    def percentile(self, percent: float) -> float:
+        """Return the duration in seconds at the given percentile (0-100).
+
+        Returns 0.0 if nothing was recorded.
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, round(percent / 100 * self.count))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return self._value(index) / 1_000_000
+        return self._value(len(self._counts) - 1) / 1_000_000
+
+
+class Trace:
+    """Stage durations of one dictation."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self) -> None:
+        self.id = f"d{next(self._ids):04d}"
+        self.spans: dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block as a stage.
+
+        The duration is recorded even if the block raises. A stage entered
+        twice accumulates.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start_time)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add a duration measured elsewhere."""
+        self.spans[stage] = self.spans.get(stage, 0.0) + seconds
+
+    def summary(self) -> str:
+        """Return e.g. "stop 12 ms / encode 8 ms / transcribe 1.9 s"."""
+        return " / ".join(
+            f"{stage} {format_duration(seconds)}" for stage, seconds in self.spans.items()
+        )
+
+
+class _NullTrace(Trace):
+    """Trace that records nothing (tracing off)."""
+
+    def __init__(self) -> None:
+        self.id = "-"
+        self.spans = {}
+        self.started = 0.0
+
+    def span(self, stage: str) -> nullcontext:
+        return nullcontext()
+
+    def record(self, stage: str, seconds: float) -> None:
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+class Tracer:
+    """Hands out traces and aggregates finished ones (thread-safe)."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        """Initialize the tracer.
+
+        Args:
+            enabled: If False, start() returns NULL_TRACE and nothing is kept.
+        """
+        self.enabled = enabled
+        self.last: Trace | None = None
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> Trace:
+        """Begin tracing a dictation."""
+        return Trace() if self.enabled else NULL_TRACE
+
+    def finish(self, trace: Trace) -> None:
+        """Record a finished dictation's stages, including the total time."""
+        if trace is NULL_TRACE:
+            return
+        trace.record("total", time.perf_counter() - trace.started)
+        with self._lock:
+            for stage, seconds in trace.spans.items():
+                self._histograms.setdefault(stage, LatencyHistogram()).record(seconds)
+            self.last = trace
+        logger.info("Trace %s: %s", trace.id, trace.summary())
+
+    def percentiles(
+        self, percents: tuple[float, ...] = (50, 95, 99)
+    ) -> dict[str, dict[str, float]]:
+        """Return {stage: {"p50": seconds, ...}} over all finished traces."""
+        with self._lock:
+            return {
+                stage: {f"p{p:g}": histogram.percentile(p) for p in percents}
+                for stage, histogram in self._histograms.items()
+            }
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration as "12 ms" below a second and "1.9 s" above."""
+    if seconds < 1.0:
+        return f"{seconds * 1000:.0f} ms"
+    return f"{seconds:.1f} s"
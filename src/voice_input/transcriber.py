@@ -1,21 +1,483 @@
 """Whisper API transcription module."""
 
+import io
 import os
+import socket
+import threading
 import time
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
 
-from openai import OpenAI
-
+from .engine import (
+    TEMPERATURE,
+    AudioInput,
+    CancelToken,
+    TranscriptionCancelledError,
+    TranscriptionEngine,
+)
 from .logger import get_logger
 
+if TYPE_CHECKING:
+    import httpx
+    from openai import OpenAI
+
 logger = get_logger()
 
+MODEL = "whisper-1"
+CONNECT_TIMEOUT = 5.0  # Timeout for DNS + TCP + TLS in seconds
+REQUEST_TIMEOUT = 30.0  # Timeout for a whole transcription request in seconds
+KEEPALIVE_EXPIRY = 300.0  # Keep idle connections open for this many seconds
+MAX_CONNECTIONS = 8  # Idle connections kept (parallel chunks plus hedges)
+DEFAULT_MAX_RETRIES = 2  # OpenAI SDK default
+
+
+@dataclass
+class RequestTiming:
+    """Timing breakdown of a single HTTP request.
+
+    Attributes:
+        connect: Seconds spent on DNS, TCP connect and TLS handshake.
+            0.0 when an already open keep-alive connection was reused.
+        upload: Seconds spent sending the request headers and body.
+        server: Seconds from request sent until response headers arrived.
+        total: Wall-clock seconds for the whole call.
+        reused: Whether an existing pooled connection was used.
+    """
+
+    connect: float = 0.0
+    upload: float = 0.0
+    server: float = 0.0
+    total: float = 0.0
+    reused: bool = True
+
+
+class _Connection:
+    """One keep-alive connection and the OpenAI client that sends on it.
+
+    Each connection has an httpx client of its own, limited to a single
+    connection, so the socket serving a request is known and abort() can
+    shut it down. Closing an httpx client doesn't wake a thread blocked
+    sending or reading, so cancelling needs the socket.
+    """
+
+    def __init__(self, client: "OpenAI") -> None:
+        self.client = client
+        self.aborted = False
+        self._socket: socket.socket | None = None
+        self._lock = threading.Lock()
+
+    def attach(self, sock: socket.socket | None) -> None:
+        """Record the socket opened for this connection (by the tracer)."""
+        with self._lock:
+            self._socket = sock
+            aborted = self.aborted
+        if aborted:
+            self._shutdown(sock)
+
+    def abort(self) -> None:
+        """Stop the request in flight: it fails at once (any thread)."""
+        with self._lock:
+            self.aborted = True
+            sock = self._socket
+        self._shutdown(sock)
+
+    @staticmethod
+    def _shutdown(sock: socket.socket | None) -> None:
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Already closed
+
+
+class _InFlight:
+    """Aborts a request's connection when its CancelToken fires.
+
+    A token cancelled after the request finished does nothing, so the
+    connection can go back to the pool and serve another request.
+    """
+
+    def __init__(self, connection: _Connection, cancel: CancelToken | None) -> None:
+        self._connection = connection
+        self._finished = False
+        self._lock = threading.Lock()
+        if cancel is not None:
+            cancel.future.add_done_callback(self._abort)
+
+    def _abort(self, _future: object) -> None:
+        with self._lock:
+            if not self._finished:
+                self._connection.abort()
+
+    def finish(self) -> None:
+        """Mark the request done; later cancellation leaves it alone."""
+        with self._lock:
+            self._finished = True
+
+
+class _RequestTracer:
+    """Collects httpcore trace events into a RequestTiming.
+
+    Also hands the socket of a newly opened connection to its _Connection,
+    so the request can be aborted.
+    """
+
+    def __init__(self, connection: _Connection | None = None) -> None:
+        self.timing = RequestTiming()
+        self._marks: dict[str, float] = {}
+        self._connection = connection
+
+    def __call__(self, event_name: str, info: dict) -> None:
+        name = event_name.split(".", 1)[-1]
+        self._marks[name] = time.perf_counter()
+        if self._connection is not None and name in (
+            "connect_tcp.complete",
+            "start_tls.complete",
+        ):
+            # TLS wraps the TCP socket, so the later event replaces it
+            stream = info.get("return_value")
+            if stream is not None:
+                self._connection.attach(stream.get_extra_info("socket"))
+
+    def finish(self, total: float) -> RequestTiming:
+        marks = self._marks
+        connect_start = marks.get("connect_tcp.started")
+        connect_end = marks.get("start_tls.complete") or marks.get(
+            "connect_tcp.complete"
+        )
+        if connect_start is not None and connect_end is not None:
+            self.timing.connect = connect_end - connect_start
+            self.timing.reused = False
+
+        send_start = marks.get("send_request_headers.started")
+        send_end = marks.get("send_request_body.complete")
+        if send_start is not None and send_end is not None:
+            self.timing.upload = send_end - send_start
+
+        response_start = marks.get("receive_response_headers.started")
+        response_end = marks.get("receive_response_headers.complete")
+        if response_start is not None and response_end is not None:
+            self.timing.server = response_end - response_start
+
+        self.timing.total = total
+        return self.timing
+
+
+class TranscriptionClient(TranscriptionEngine):
+    """Long-lived Whisper API client with a shared keep-alive connection pool.
+
+    Creating an OpenAI client per dictation pays for DNS, TCP and TLS on
+    every key release. This client is created once and owned by the app;
+    preconnect() can be called when recording starts so the socket is
+    already open by the time the audio is ready to upload. The openai
+    package itself is imported on first use, keeping it off startup.
+
+    Connections are pooled here rather than inside one httpx client, one
+    _Connection each, so that cancelling a transcription can abort its
+    request: the upload stops and the request thread is freed at once.
+    """
+
+    name = "openai"
+    remote = True
+
+    @property
+    def transient_errors(self) -> tuple[type[Exception], ...]:
+        """Return the SDK errors worth retrying."""
+        from openai import APIConnectionError, InternalServerError, RateLimitError
+
+        return (APIConnectionError, RateLimitError, InternalServerError)
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        model: str = MODEL,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        """Initialize the client.
+
+        Args:
+            api_key: OpenAI API key. Defaults to OPENAI_API_KEY.
+            base_url: API base URL. Defaults to OPENAI_BASE_URL or the
+                official endpoint. Useful for pointing at a local stub server.
+            model: Transcription model name.
+            max_retries: Retries done by the OpenAI SDK itself. Set to 0
+                when wrapped in a RequestScheduler, which retries instead.
+        """
+        self._api_key = api_key
+        self._base_url = base_url
+        self._model = model
+        self._max_retries = max_retries
+        self._idle: list[_Connection] = []  # Most recently used last
+        self._connections: set[_Connection] = set()  # Idle and in use
+        self._client_lock = threading.Lock()
+        self._preconnect_lock = threading.Lock()
+        self._local = threading.local()
+        self._last_used: float | None = None
+        self._last_timing: RequestTiming | None = None
+
+    def _checkout(self) -> _Connection:
+        """Take an idle pooled connection, or create one.
+
+        Raises:
+            ValueError: If no API key is configured.
+        """
+        with self._client_lock:
+            if self._idle:
+                return self._idle.pop()
+
+            api_key = self._api_key or os.environ.get("OPENAI_API_KEY")
+            if not api_key:
+                logger.error("Transcriber: OPENAI_API_KEY not set")
+                raise ValueError("OPENAI_API_KEY environment variable is not set")
+
+            import httpx
+            from openai import DefaultHttpxClient, OpenAI
+
+            http_client = DefaultHttpxClient(
+                timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=1,
+                    max_keepalive_connections=1,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+                event_hooks={"request": [self._attach_tracer]},
+            )
+            connection = _Connection(
+                OpenAI(
+                    api_key=api_key,
+                    base_url=self._base_url or os.environ.get("OPENAI_BASE_URL"),
+                    http_client=http_client,
+                    max_retries=self._max_retries,
+                )
+            )
+            self._connections.add(connection)
+            logger.debug(
+                "Transcriber: HTTP client created (%d open)", len(self._connections)
+            )
+            return connection
+
+    def _checkin(self, connection: _Connection) -> None:
+        """Return a connection to the pool, or close it if it was aborted."""
+        with self._client_lock:
+            if (
+                not connection.aborted
+                and connection in self._connections
+                and len(self._idle) < MAX_CONNECTIONS
+            ):
+                self._idle.append(connection)
+                return
+            self._connections.discard(connection)
+        connection.client.close()
+
+    def _attach_tracer(self, request: "httpx.Request") -> None:
+        """httpx request hook: route trace events to the calling thread's tracer."""
+        tracer = getattr(self._local, "tracer", None)
+        if tracer is not None:
+            request.extensions["trace"] = tracer
+
+    def preconnect(self) -> None:
+        """Open a pooled connection in the background (non-blocking).
+
+        Does nothing if a connection was used recently enough to still be
+        alive in the pool, or if a preconnect is already in flight.
+        """
+        if (
+            self._last_used is not None
+            and time.monotonic() - self._last_used < KEEPALIVE_EXPIRY / 2
+        ):
+            return
+        if not self._preconnect_lock.acquire(blocking=False):
+            return
+        threading.Thread(target=self._do_preconnect, daemon=True).start()
+
+    def _do_preconnect(self) -> None:
+        connection = None
+        try:
+            start_time = time.perf_counter()
+            connection = self._checkout()
+            tracer = _RequestTracer(connection)
+            self._local.tracer = tracer
+            connection.client.models.retrieve(self._model)
+            timing = tracer.finish(time.perf_counter() - start_time)
+            self._last_used = time.monotonic()
+            logger.debug(
+                "Transcriber: Preconnect done in %.3fs (connect %.3fs)",
+                timing.total,
+                timing.connect,
+            )
+        except Exception as e:
+            logger.warning("Transcriber: Preconnect failed: %s", e)
+        finally:
+            self._local.tracer = None
+            if connection is not None:
+                self._checkin(connection)
+            self._preconnect_lock.release()
+
+    @property
+    def model_id(self) -> str:
+        """Return the transcription model name."""
+        return self._model
+
+    def _transcribe(
+        self,
+        audio: AudioInput,
+        language: str = "ja",
+        cancel: CancelToken | None = None,
+    ) -> str:
+        """Transcribe audio using OpenAI Whisper API.
+
+        Args:
+            audio: Path to an audio file, encoded audio bytes, or a binary
+                buffer (e.g. from recorder.encode_wav()). Buffers are read
+                from their current position.
+            language: Language code for transcription (default: "ja").
+            cancel: Aborts the request when cancelled, whether it is still
+                uploading or waiting for the response.
+
+        Returns:
+            Transcribed text.
+
+        Raises:
+            ValueError: If OPENAI_API_KEY is not set.
+            TranscriptionCancelledError: If cancel is cancelled first.
+        """
+        connection = self._checkout()
+
+        if isinstance(audio, Path):
+            file_size = audio.stat().st_size
+            logger.debug(
+                "Transcriber: Starting transcription for %s (%d bytes)",
+                audio,
+                file_size,
+            )
+        else:
+            logger.debug(
+                "Transcriber: Starting transcription from memory (%d bytes)",
+                _audio_size(audio),
+            )
+
+        tracer = _RequestTracer(connection)
+        self._local.tracer = tracer
+        in_flight = _InFlight(connection, cancel)
+        start_time = time.perf_counter()
+        try:
+            with _open_audio(audio) as audio_file:
+                response = connection.client.audio.transcriptions.create(
+                    model=self._model,
+                    file=audio_file,
+                    language=language,
+                    # temperature=0: ハルシネーション対策
+                    # Whisperは曖昧な音声に対して「ご視聴ありがとうございました」等の
+                    # トレーニングデータ由来のフレーズを誤出力することがある。
+                    # temperature=0にすると最も確率の高いトークンのみを選択し、
+                    # ランダム性を排除することでハルシネーションを軽減できる。
+                    # See: https://github.com/nibuno/voice-input-tool/issues/8
+                    temperature=TEMPERATURE,
+                )
+            timing = tracer.finish(time.perf_counter() - start_time)
+            self._last_used = time.monotonic()
+            self._last_timing = timing
+            logger.info(
+                "Transcriber: API call completed in %.2fs (connect %.3fs, "
+                "upload %.3fs, server %.2fs, %s connection)",
+                timing.total,
+                timing.connect,
+                timing.upload,
+                timing.server,
+                "reused" if timing.reused else "new",
+            )
+            logger.debug(
+                "Transcriber: Result: %s%s",
+                response.text[:100],
+                "..." if len(response.text) > 100 else "",
+            )
+            return response.text
+        except Exception as e:
+            elapsed = time.perf_counter() - start_time
+            if connection.aborted:
+                logger.info("Transcriber: API call aborted after %.2fs", elapsed)
+                raise TranscriptionCancelledError("Transcription cancelled") from e
+            if isinstance(e, self.transient_errors):
+                # Retried by the scheduler; no traceback needed
+                logger.warning(
+                    "Transcriber: API call failed after %.2fs: %s", elapsed, e
+                )
+            else:
+                logger.exception(
+                    "Transcriber: API call failed after %.2fs: %s", elapsed, e
+                )
+            raise
+        finally:
+            in_flight.finish()
+            self._local.tracer = None
+            self._checkin(connection)
+
+    @property
+    def last_timing(self) -> RequestTiming | None:
+        """Return the timing breakdown of the last successful transcription."""
+        return self._last_timing
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        with self._client_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+            self._idle.clear()
+        for connection in connections:
+            connection.client.close()
+
+
+def _audio_size(audio: bytes | BinaryIO) -> int:
+    """Return the number of bytes that will be uploaded for in-memory audio."""
+    if isinstance(audio, bytes):
+        return len(audio)
+    if isinstance(audio, io.BytesIO):
+        return audio.getbuffer().nbytes - audio.tell()
+    return -1
+
+
+def _open_audio(audio: AudioInput) -> AbstractContextManager[BinaryIO]:
+    """Return a context manager yielding a readable binary file object.
+
+    Only files opened here are closed on exit; caller-owned buffers stay
+    open so they can be reused. The OpenAI SDK infers the audio format from
+    the file name, so in-memory audio without a name is treated as WAV.
+    """
+    if isinstance(audio, Path):
+        return open(audio, "rb")
+    if isinstance(audio, bytes):
+        audio = io.BytesIO(audio)
+    if not getattr(audio, "name", None):
+        audio.name = "audio.wav"
+    return nullcontext(audio)
+
+
+_default_client: TranscriptionClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> TranscriptionClient:
+    """Get the process-wide shared TranscriptionClient.
+
+    Returns:
+        Shared client instance.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = TranscriptionClient()
+        return _default_client
+
 
-def transcribe(audio_path: Path, language: str = "ja") -> str:
-    """Transcribe audio file using OpenAI Whisper API.
+def transcribe(audio: AudioInput, language: str = "ja") -> str:
+    """Transcribe audio using the shared Whisper API client.
 
     Args:
-        audio_path: Path to the audio file.
+        audio: Path to an audio file, encoded audio bytes, or a binary buffer.
         language: Language code for transcription (default: "ja").
 
     Returns:
@@ -24,36 +486,4 @@ def transcribe(audio_path: Path, language: str = "ja") -> str:
     Raises:
         ValueError: If OPENAI_API_KEY is not set.
     """
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        logger.error("Transcriber: OPENAI_API_KEY not set")
-        raise ValueError("OPENAI_API_KEY environment variable is not set")
-
-    file_size = audio_path.stat().st_size
-    logger.debug(f"Transcriber: Starting transcription for {audio_path} ({file_size} bytes)")
-
-    client = OpenAI(api_key=api_key)
-
-    start_time = time.time()
-    try:
-        with open(audio_path, "rb") as audio_file:
-            response = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language=language,
-                # temperature=0: ハルシネーション対策
-                # Whisperは曖昧な音声に対して「ご視聴ありがとうございました」等の
-                # トレーニングデータ由来のフレーズを誤出力することがある。
-                # temperature=0にすると最も確率の高いトークンのみを選択し、
-                # ランダム性を排除することでハルシネーションを軽減できる。
-                # See: https://github.com/nibuno/voice-input-tool/issues/8
-                temperature=0,
-            )
-        elapsed = time.time() - start_time
-        logger.info(f"Transcriber: API call completed in {elapsed:.2f}s")
-        logger.debug(f"Transcriber: Result: {response.text[:100]}..." if len(response.text) > 100 else f"Transcriber: Result: {response.text}")
-        return response.text
-    except Exception as e:
-        elapsed = time.time() - start_time
-        logger.exception(f"Transcriber: API call failed after {elapsed:.2f}s: {e}")
-        raise
+    return get_client().transcribe(audio, language)
@@ -0,0 +1,188 @@
+"""Frame-level voice activity detection with NumPy.
+
+Classifies short frames as speech or silence using short-time energy and
+zero-crossing rate, smooths the decision with a hangover, and finds where
+speech starts and ends so leading/trailing silence can be trimmed before
+upload.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .recorder import SAMPLE_RATE
+
+FRAME_SECONDS = 0.02  # Frame length
+RMS_THRESHOLD = 100  # Frames above this RMS (int16 scale) can be speech
+NOISE_FLOOR_FACTOR = 3.0  # Adaptive threshold: this many times the noise floor
+NOISE_PERCENTILE = 10  # Percentile of frame RMS taken as the noise floor
+# Cap on the adaptive threshold relative to loud frames (95th percentile),
+# so a clip with no pauses doesn't mistake speech for the noise floor
+LOUD_PERCENTILE = 95
+LOUD_FACTOR = 0.1
+FRICATIVE_ZCR = 0.25  # Quiet frames with ZCR above this are unvoiced speech (s, sh)
+FRICATIVE_RMS_FACTOR = 0.5  # ...if at least this fraction of the threshold
+MIN_SPEECH_SECONDS = 0.06  # Shorter bursts are clicks, not speech
+HANGOVER_SECONDS = 0.2  # Keep speech on this long after it falls quiet
+PADDING_SECONDS = 0.1  # Silence kept before/after speech when trimming
+# Frames analysed at a time, so long (memory-mapped) recordings are never
+# converted to float as a whole (4096 frames of 20 ms: 5 MB)
+ANALYSIS_BLOCK_FRAMES = 4096
+
+
+def frame_energy(audio: np.ndarray, frame_length: int) -> np.ndarray:
+    """Return the mean-square energy of consecutive frames.
+
+    Args:
+        audio: Audio samples (any shape, flattened).
+        frame_length: Samples per frame. A trailing partial frame is dropped.
+
+    Returns:
+        float32 array with one value per frame.
+    """
+    frames = _frames(audio, frame_length)
+    energy = np.empty(len(frames), dtype=np.float32)
+    for start in range(0, len(frames), ANALYSIS_BLOCK_FRAMES):
+        block = frames[start : start + ANALYSIS_BLOCK_FRAMES].astype(np.float32)
+        energy[start : start + len(block)] = np.einsum("ij,ij->i", block, block)
+    return energy / frame_length
+
+
+def zero_crossing_rate(audio: np.ndarray, frame_length: int) -> np.ndarray:
+    """Return the fraction of sign changes within each frame.
+
+    Args:
+        audio: Audio samples (any shape, flattened).
+        frame_length: Samples per frame. A trailing partial frame is dropped.
+
+    Returns:
+        float32 array with one value per frame, in [0, 1].
+    """
+    frames = _frames(audio, frame_length)
+    crossings = np.empty(len(frames), dtype=np.int64)
+    for start in range(0, len(frames), ANALYSIS_BLOCK_FRAMES):
+        signs = np.signbit(frames[start : start + ANALYSIS_BLOCK_FRAMES])
+        crossings[start : start + len(signs)] = np.count_nonzero(
+            signs[:, 1:] != signs[:, :-1], axis=1
+        )
+    return (crossings / (frame_length - 1)).astype(np.float32)
+
+
+def _frames(audio: np.ndarray, frame_length: int) -> np.ndarray:
+    """Return a (n_frames, frame_length) view of the samples."""
+    samples = audio.reshape(-1)
+    n_frames = len(samples) // frame_length
+    return samples[: n_frames * frame_length].reshape(n_frames, frame_length)
+
+
+@dataclass
+class VadResult:
+    """Speech activity of a recording.
+
+    Attributes:
+        speech: Per-frame speech decision after smoothing.
+        frame_length: Samples per frame.
+        start: First sample to keep (speech onset minus padding).
+        end: One past the last sample to keep (speech offset plus padding).
+        total: Number of samples in the recording.
+    """
+
+    speech: np.ndarray
+    frame_length: int
+    start: int
+    end: int
+    total: int
+
+    @property
+    def has_speech(self) -> bool:
+        """Return whether any frame contains speech."""
+        return bool(self.speech.any())
+
+    @property
+    def speech_seconds(self) -> float:
+        """Return the total duration of speech frames."""
+        return int(self.speech.sum()) * self.frame_length / SAMPLE_RATE
+
+    @property
+    def leading_seconds(self) -> float:
+        """Return how much silence is trimmed from the start."""
+        return self.start / SAMPLE_RATE
+
+    @property
+    def trailing_seconds(self) -> float:
+        """Return how much silence is trimmed from the end."""
+        return (self.total - self.end) / SAMPLE_RATE
+
+
+def _remove_short_runs(mask: np.ndarray, min_length: int) -> np.ndarray:
+    """Clear runs of True shorter than min_length."""
+    if min_length <= 1 or not mask.any():
+        return mask
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    result = mask.copy()
+    for start, end in zip(starts, ends):
+        if end - start < min_length:
+            result[start:end] = False
+    return result
+
+
+def _hangover(mask: np.ndarray, length: int) -> np.ndarray:
+    """Extend every run of True by length frames."""
+    if length <= 0 or not mask.any():
+        return mask
+    extended = np.convolve(mask.view(np.int8), np.ones(length + 1, dtype=np.int32))
+    return extended[: len(mask)] > 0
+
+
+def detect_speech(
+    audio: np.ndarray,
+    rms_threshold: float = RMS_THRESHOLD,
+    frame_seconds: float = FRAME_SECONDS,
+    padding_seconds: float = PADDING_SECONDS,
+) -> VadResult:
+    """Detect speech frames and the speech region of a recording.
+
+    A frame is speech if its RMS exceeds the threshold (the larger of
+    rms_threshold and a multiple of the estimated noise floor, capped
+    relative to the loudest frames), or if it is moderately loud with a high
+    zero-crossing rate (unvoiced consonants).
+    Bursts shorter than MIN_SPEECH_SECONDS are dropped and the remaining
+    speech is extended by HANGOVER_SECONDS.
+
+    Args:
+        audio: Audio samples (int16).
+        rms_threshold: Minimum RMS for speech.
+        frame_seconds: Frame length.
+        padding_seconds: Silence kept around the speech region.
+
+    Returns:
+        Detection result.
+    """
+    samples = audio.reshape(-1)
+    frame_length = max(2, int(frame_seconds * SAMPLE_RATE))
+    rms = np.sqrt(frame_energy(samples, frame_length))
+
+    if len(rms) == 0:
+        return VadResult(np.zeros(0, dtype=bool), frame_length, 0, 0, len(samples))
+
+    noise_floor, loud = np.percentile(rms, [NOISE_PERCENTILE, LOUD_PERCENTILE])
+    adaptive = min(noise_floor * NOISE_FLOOR_FACTOR, loud * LOUD_FACTOR)
+    threshold = max(rms_threshold, float(adaptive))
+    zcr = zero_crossing_rate(samples, frame_length)
+
+    speech = (rms >= threshold) | (
+        (rms >= threshold * FRICATIVE_RMS_FACTOR) & (zcr >= FRICATIVE_ZCR)
+    )
+    speech = _remove_short_runs(speech, int(MIN_SPEECH_SECONDS / frame_seconds))
+    speech = _hangover(speech, int(HANGOVER_SECONDS / frame_seconds))
+
+    if not speech.any():
+        return VadResult(speech, frame_length, 0, 0, len(samples))
+
+    padding = int(padding_seconds * SAMPLE_RATE)
+    indices = np.flatnonzero(speech)
+    start = max(0, int(indices[0]) * frame_length - padding)
+    end = min(len(samples), (int(indices[-1]) + 1) * frame_length + padding)
+    return VadResult(speech, frame_length, start, end, len(samples))
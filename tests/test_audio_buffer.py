@@ -0,0 +1,161 @@
+"""Tests for voice_input.audio_buffer."""
+
+import json
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from voice_input.audio_buffer import AudioBuffer
+
+BLOCK = 512
+RSS_BUDGET_MB = 8.0  # Allowed growth of a long spilled recording over a short one
+
+
+class TracingBuffer(AudioBuffer):
+    """Records which threads allocate the buffer's larger arrays."""
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)
+        self.allocating_threads: list[threading.Thread] = []
+
+    def _allocate(self, capacity: int, length: int):
+        self.allocating_threads.append(threading.current_thread())
+        return super()._allocate(capacity, length)
+
+
+def blocks(count: int, seed: int = 0) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return [
+        rng.integers(-32768, 32767, (BLOCK, 1), dtype=np.int16) for _ in range(count)
+    ]
+
+
+def record(buffer: AudioBuffer, data: list[np.ndarray], settle: bool) -> None:
+    """Append blocks, letting the background allocation finish if settle."""
+    for block in data:
+        buffer.append(block)
+        if settle and buffer._next is not None:
+            buffer._next.result()
+
+
+@pytest.mark.parametrize("settle", [True, False])
+def test_samples_survive_growth(settle):
+    data = blocks(100)
+    buffer = AudioBuffer(BLOCK * 3)
+
+    record(buffer, data, settle)
+
+    assert buffer.grow_count >= 5
+    np.testing.assert_array_equal(buffer.view(), np.concatenate(data).reshape(-1))
+
+
+def test_growth_is_prepared_off_the_appending_thread():
+    buffer = TracingBuffer(BLOCK * 4)
+
+    record(buffer, blocks(64), settle=True)
+
+    assert buffer.capacity >= BLOCK * 64
+    # Every growth came from a prepared array (the last may be unused yet)
+    assert buffer.grow_count in (
+        len(buffer.allocating_threads),
+        len(buffer.allocating_threads) - 1,
+    )
+    assert threading.current_thread() not in buffer.allocating_threads
+
+
+def test_block_larger_than_prepared_array_grows_in_place():
+    buffer = AudioBuffer(BLOCK)
+    data = blocks(1) + [np.ones((BLOCK * 10, 1), dtype=np.int16)]
+
+    record(buffer, data, settle=False)
+
+    assert buffer.capacity >= BLOCK * 11
+    np.testing.assert_array_equal(buffer.view(), np.concatenate(data).reshape(-1))
+
+
+def test_views_stay_valid_after_growth():
+    buffer = AudioBuffer(BLOCK * 2)
+    data = blocks(20)
+    record(buffer, data[:2], settle=True)
+    early = buffer.view()
+
+    record(buffer, data[2:], settle=True)
+
+    np.testing.assert_array_equal(early, np.concatenate(data[:2]).reshape(-1))
+
+
+def test_max_length_drops_later_samples():
+    buffer = AudioBuffer(BLOCK, max_length=BLOCK * 5 + 100)
+    data = blocks(8)
+
+    record(buffer, data, settle=False)
+
+    assert buffer.full
+    assert len(buffer) == BLOCK * 5 + 100
+    assert buffer.dropped == BLOCK * 3 - 100
+    np.testing.assert_array_equal(
+        buffer.view(), np.concatenate(data).reshape(-1)[: BLOCK * 5 + 100]
+    )
+
+
+def test_spill_is_prepared_off_the_appending_thread():
+    buffer = TracingBuffer(BLOCK * 4, max_memory=BLOCK * 8)
+    data = blocks(64)
+
+    record(buffer, data, settle=True)
+
+    assert buffer.spilled
+    assert threading.current_thread() not in buffer.allocating_threads
+    np.testing.assert_array_equal(buffer.view(), np.concatenate(data).reshape(-1))
+
+
+@pytest.mark.parametrize("settle", [True, False])
+def test_spilled_samples_survive_growth(settle):
+    buffer = AudioBuffer(BLOCK, max_memory=BLOCK * 2)
+    data = blocks(200)
+
+    record(buffer, data, settle)
+
+    assert buffer.spilled
+    np.testing.assert_array_equal(buffer.view(), np.concatenate(data).reshape(-1))
+
+
+RSS_SCRIPT = """
+import json, resource, sys
+import numpy as np
+from voice_input.audio_buffer import AudioBuffer
+
+seconds = float(sys.argv[1])
+block = np.ones((512, 1), dtype=np.int16)
+buffer = AudioBuffer(16000 * 30, max_memory=16000 * 10)
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+for _ in range(int(seconds * 16000 / 512)):
+    buffer.append(block)
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+scale = 1 if sys.platform == "darwin" else 1024
+print(json.dumps({"mb": (peak - baseline) * scale / 1024 / 1024}))
+"""
+
+
+def recording_growth_mb(seconds: float) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", RSS_SCRIPT, str(seconds)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"PYTHONPATH": str(Path(__file__).parents[1] / "src")},
+    )
+    return json.loads(result.stdout)["mb"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs resource")
+def test_spilled_recording_peak_rss_stays_flat():
+    # 60 s vs 20 min (36 MB of audio): only max_memory stays in RAM
+    short = recording_growth_mb(60)
+    long = recording_growth_mb(1200)
+
+    assert long - short < RSS_BUDGET_MB
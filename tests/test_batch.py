@@ -0,0 +1,102 @@
+"""Tests for voice_input.batch."""
+
+import json
+import sys
+
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+from voice_input.batch import BatchTranscriber, completed_files, load_audio
+from voice_input.encoder import EncoderStage
+from voice_input.engine import AudioInput, CancelToken, TranscriptionEngine
+from voice_input.recorder import SAMPLE_RATE
+
+AMPLITUDE = 0.5
+
+
+def sine(seconds: float = 1.0) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return AMPLITUDE * np.sin(2 * np.pi * 440 * t)
+
+
+def as_dtype(signal: np.ndarray, dtype: str) -> np.ndarray:
+    if dtype == "uint8":
+        return np.rint(signal * 128 + 128).astype(np.uint8)
+    if dtype in ("int16", "int32"):
+        full_scale = 2 ** (8 * np.dtype(dtype).itemsize - 1)
+        return np.rint(signal * full_scale).astype(dtype)
+    return signal.astype(dtype)
+
+
+class EchoEngine(TranscriptionEngine):
+    name = "echo"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def _transcribe(
+        self, audio: AudioInput, language: str, cancel: CancelToken | None = None
+    ) -> str:
+        self.calls += 1
+        return "text"
+
+
+@pytest.fixture(params=["soundfile", "scipy"])
+def decoder(request, monkeypatch):
+    if request.param == "scipy":
+        # Fallback used when soundfile isn't installed
+        monkeypatch.setitem(sys.modules, "soundfile", None)
+    return request.param
+
+
+@pytest.mark.parametrize("dtype", ["uint8", "int16", "int32", "float32"])
+def test_wav_of_any_dtype_loads_at_the_same_level(tmp_path, decoder, dtype):
+    path = tmp_path / f"{dtype}.wav"
+    wavfile.write(path, SAMPLE_RATE, as_dtype(sine(), dtype))
+
+    audio = load_audio(path)
+
+    peak = np.abs(audio.astype(np.float32)).max() / 32768
+    assert peak == pytest.approx(AMPLITUDE, abs=0.01)
+    # uint8 silence (128) must come out centred on zero
+    assert abs(float(audio.mean())) < 0.01 * 32768
+
+
+def test_resume_matches_the_same_file_by_another_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "recordings").mkdir()
+    wavfile.write(
+        tmp_path / "recordings" / "a.wav", SAMPLE_RATE, as_dtype(sine(), "int16")
+    )
+    output = tmp_path / "out.jsonl"
+    engine = EchoEngine()
+    batch = BatchTranscriber(engine, EncoderStage("wav"))
+
+    first = batch.run([tmp_path / "recordings"], output)
+    # Same file, given relative to the working directory
+    second = batch.run(
+        [
+            tmp_path.joinpath("recordings", "..", "recordings", "a.wav").relative_to(
+                tmp_path
+            )
+        ],
+        output,
+    )
+
+    assert (first["files"], second["skipped"], engine.calls) == (1, 1, 1)
+    record = json.loads(output.read_text().splitlines()[0])
+    assert record["file"] == str((tmp_path / "recordings" / "a.wav").resolve())
+
+
+def test_completed_files_resolves_relative_records(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    output = tmp_path / "out.jsonl"
+    output.write_text(
+        json.dumps({"file": "a.wav", "text": "x"})
+        + "\n"
+        + json.dumps({"file": "b.wav", "error": "boom"})
+        + "\n"
+    )
+
+    assert completed_files(output) == {str((tmp_path / "a.wav").resolve())}
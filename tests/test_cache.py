@@ -0,0 +1,113 @@
+"""Tests for voice_input.cache: keys, the memory LRU and the disk tier."""
+
+import os
+
+import numpy as np
+import pytest
+
+from voice_input.cache import TranscriptCache, audio_key
+from voice_input.engine import AudioInput, CancelToken, TranscriptionEngine
+from voice_input.recorder import encode_wav
+
+
+class CountingEngine(TranscriptionEngine):
+    """Returns a fixed text and counts requests."""
+
+    name = "counting"
+
+    def __init__(self) -> None:
+        self.requests = 0
+
+    def _transcribe(
+        self, audio: AudioInput, language: str, cancel: CancelToken | None = None
+    ) -> str:
+        self.requests += 1
+        return "text"
+
+
+def samples(seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(-2000, 2000, 1600, dtype=np.int16)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TranscriptCache(tmp_path, memory_entries=2)
+
+
+def test_key_of_pcm_matches_its_wav_and_depends_on_parameters():
+    audio = samples()
+
+    key = audio_key(audio, "openai", "whisper-1", "ja", 0)
+
+    assert key == audio_key(
+        encode_wav(audio).getvalue(), "openai", "whisper-1", "ja", 0
+    )
+    assert key != audio_key(audio, "openai", "whisper-1", "en", 0)
+    assert key != audio_key(samples(1), "openai", "whisper-1", "ja", 0)
+
+
+def test_engine_keys_on_pcm_regardless_of_encoding(cache):
+    engine = CountingEngine()
+    engine.cache = cache
+    audio = samples()
+
+    assert engine.transcribe(b"flac bytes", pcm=audio) == "text"
+    assert engine.transcribe(b"opus bytes", pcm=audio) == "text"
+
+    assert engine.requests == 1
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = TranscriptCache(None, memory_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"  # "b" is now the least recently used
+
+    cache.put("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.memory_hits == 3
+    assert cache.misses == 1
+
+
+def test_disk_tier_serves_entries_evicted_from_memory(tmp_path, cache):
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.put("c", "C")
+
+    assert cache.get("a") == "A"
+    assert cache.disk_hits == 1
+
+    # A new instance (next app start) reads the same directory
+    restarted = TranscriptCache(tmp_path)
+    assert restarted.get("c") == "C"
+    assert restarted.disk_hits == 1
+
+
+def test_disk_tier_evicts_least_recently_used_by_size(tmp_path):
+    entry_size = len('{"text": "x"}')
+    cache = TranscriptCache(
+        tmp_path, memory_entries=0, disk_max_bytes=int(3.5 * entry_size)
+    )
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.put(key, "x")
+        os.utime(tmp_path / f"{key}.json", (index, index))
+    cache.get("a")  # Used last: "b" is now the oldest
+
+    cache.put("d", "x")
+
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["a", "c", "d"]
+
+
+def test_overwriting_an_entry_does_not_count_its_size_twice(tmp_path):
+    entry_size = len('{"text": "x"}')
+    cache = TranscriptCache(tmp_path, memory_entries=0, disk_max_bytes=2 * entry_size)
+    cache.put("a", "x")
+    cache.put("b", "x")
+
+    for _ in range(5):
+        cache.put("b", "x")
+
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["a", "b"]
@@ -0,0 +1,76 @@
+"""Tests for voice_input.chunking: splitting audio and combining texts."""
+
+from itertools import pairwise
+
+import numpy as np
+import pytest
+
+from voice_input.chunking import join, split_audio, stitch
+from voice_input.recorder import SAMPLE_RATE
+
+
+def tone(seconds: float, amplitude: float = 8000) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return amplitude * np.sin(2 * np.pi * 220.0 * t)
+
+
+def speech_with_pauses(speech: list[float], pause: float) -> np.ndarray:
+    """Tone bursts of the given lengths separated by silent pauses."""
+    parts = []
+    for seconds in speech:
+        parts += [tone(seconds), np.zeros(int(pause * SAMPLE_RATE))]
+    return np.concatenate(parts[:-1]).astype(np.int16)
+
+
+def test_short_audio_is_one_chunk():
+    audio = speech_with_pauses([5.0], pause=0.0)
+
+    chunks = split_audio(audio, chunk_seconds=10.0)
+
+    assert len(chunks) == 1
+    assert (chunks[0].start, chunks[0].end) == (0, len(audio))
+
+
+def test_splits_fall_in_pauses_and_chunks_overlap():
+    # Pauses end at 10.0 s and 20.5 s; nominal splits are every 10 s
+    audio = speech_with_pauses([9.0, 9.5, 9.0], pause=1.0)
+    overlap = int(0.2 * SAMPLE_RATE)
+
+    chunks = split_audio(audio, chunk_seconds=10.0, overlap_seconds=0.2)
+
+    assert len(chunks) == 3
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(audio)
+    for chunk, following in pairwise(chunks):
+        split = chunk.end - overlap
+        assert following.start == split - overlap
+        # The cut is in the middle of a pause, not in speech
+        assert np.all(audio[split - 1000 : split + 1000] == 0)
+    for chunk in chunks:
+        assert np.shares_memory(chunk.audio, audio)
+        assert len(chunk.audio) == chunk.end - chunk.start
+
+
+@pytest.mark.parametrize(
+    ("texts", "expected"),
+    [
+        (["we went to the park.", "The park was nice"], "we went to the park. was nice"),
+        (["今日は天気がいいです", "天気がいいですね"], "今日は天気がいいですね"),
+        # Partial words and single-word repeats are not an overlap
+        (["the cat sat on", "one more time"], "the cat sat on one more time"),
+        (["I want to quit", "it now please"], "I want to quit it now please"),
+        (["it was so", "so good"], "it was so so good"),
+        (["今日は雨", "雨です"], "今日は雨雨です"),
+        (["hello", "", "  world "], "hello world"),
+    ],
+)
+def test_stitch_removes_only_whole_word_overlaps(texts, expected):
+    assert stitch(texts) == expected
+
+
+def test_join_keeps_every_word():
+    assert join(["we went to the park", "the park was nice"]) == (
+        "we went to the park the park was nice"
+    )
+    assert join(["今日は", "雨です"]) == "今日は雨です"
+    assert join([" hello ", ""]) == "hello"
@@ -0,0 +1,105 @@
+"""Tests for voice_input.events.EventDispatcher."""
+
+import threading
+
+import pytest
+
+from voice_input.events import ErrorOccurred, EventDispatcher, StatusChanged
+
+
+@pytest.fixture
+def wakeups():
+    """Count wakeup calls."""
+    calls: list[None] = []
+    return calls
+
+
+@pytest.fixture
+def dispatcher(wakeups):
+    return EventDispatcher(wakeup=lambda: wakeups.append(None))
+
+
+def test_events_are_dispatched_in_posting_order(dispatcher):
+    seen: list[str] = []
+    dispatcher.register(StatusChanged, lambda event: seen.append(event.status))
+    dispatcher.register(ErrorOccurred, lambda event: seen.append(event.message))
+
+    dispatcher.post(StatusChanged("a"))
+    dispatcher.post(ErrorOccurred("b"))
+    dispatcher.post(StatusChanged("c"))
+
+    assert dispatcher.dispatch_pending() == 3
+    assert seen == ["a", "b", "c"]
+    assert dispatcher.dispatch_pending() == 0
+
+
+def test_posts_before_a_dispatch_share_one_wakeup(dispatcher, wakeups):
+    dispatcher.register(StatusChanged, lambda event: None)
+
+    for i in range(10):
+        dispatcher.post(StatusChanged(str(i)))
+    assert len(wakeups) == 1
+
+    dispatcher.dispatch_pending()
+    dispatcher.post(StatusChanged("after"))
+    assert len(wakeups) == 2
+
+
+def test_posts_from_many_threads_wake_once(dispatcher, wakeups):
+    seen: list[str] = []
+    dispatcher.register(StatusChanged, lambda event: seen.append(event.status))
+
+    threads = [
+        threading.Thread(target=dispatcher.post, args=(StatusChanged(str(i)),))
+        for i in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(wakeups) == 1
+    assert dispatcher.dispatch_pending() == 20
+    assert sorted(seen, key=int) == [str(i) for i in range(20)]
+
+
+def test_failing_handler_does_not_stop_the_others(dispatcher):
+    seen: list[str] = []
+
+    def failing(event: ErrorOccurred) -> None:
+        raise RuntimeError("handler failed")
+
+    dispatcher.register(StatusChanged, lambda event: seen.append(event.status))
+    dispatcher.register(ErrorOccurred, failing)
+
+    dispatcher.post(StatusChanged("before"))
+    dispatcher.post(ErrorOccurred("boom"))
+    dispatcher.post(StatusChanged("after"))
+
+    assert dispatcher.dispatch_pending() == 3
+    assert seen == ["before", "after"]
+
+
+def test_failed_wakeup_is_retried_on_the_next_post():
+    calls: list[None] = []
+
+    def wakeup() -> None:
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("run loop not ready")
+
+    dispatcher = EventDispatcher(wakeup=wakeup)
+    with pytest.raises(RuntimeError):
+        dispatcher.post(StatusChanged("lost wakeup"))
+
+    dispatcher.post(StatusChanged("next"))
+
+    assert len(calls) == 2
+
+
+def test_wait_returns_when_an_event_is_posted():
+    dispatcher = EventDispatcher()
+    threading.Timer(0.05, dispatcher.post, args=(StatusChanged("x"),)).start()
+
+    assert dispatcher.wait(timeout=2.0)
+    assert not EventDispatcher().wait(timeout=0.01)
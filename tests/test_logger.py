@@ -0,0 +1,99 @@
+"""Tests for voice_input.logger's queued, non-blocking handler."""
+
+import logging
+import queue
+import statistics
+import threading
+import time
+
+import pytest
+
+from voice_input.logger import _BoundedQueueHandler, _LogListener
+
+QUEUE_SIZE = 50
+# Generous bound on the median log call (s); a blocked call would take the
+# full stall, so this only has to separate "queued" from "waited on disk"
+MEDIAN_CALL_BUDGET = 0.05
+
+
+class StalledHandler(logging.Handler):
+    """Blocks in emit() until released, like a log disk that hangs."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.resume = threading.Event()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.resume.wait()
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def stalled():
+    """Return a logger whose only handler queues for a stalled writer."""
+    log_queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+    sink = StalledHandler()
+    listener = _LogListener(log_queue, sink)
+    listener.start()
+    handler = _BoundedQueueHandler(log_queue)
+    logger = logging.getLogger("test_logger_stalled")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    yield logger, handler, sink
+    sink.resume.set()
+    listener.stop()
+    logger.removeHandler(handler)
+
+
+def log_from_threads(logger: logging.Logger, threads: int, calls: int) -> list[float]:
+    """Log from several threads standing in for the audio callback."""
+    times: list[float] = []
+
+    def run() -> None:
+        for i in range(calls):
+            start_time = time.perf_counter()
+            logger.warning("Audio callback status: %s", i)
+            times.append(time.perf_counter() - start_time)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=5.0)
+        assert not worker.is_alive(), "a log call blocked on the stalled writer"
+    return times
+
+
+def test_log_calls_never_block_on_a_stalled_writer(stalled):
+    logger, handler, sink = stalled
+
+    times = log_from_threads(logger, threads=1, calls=QUEUE_SIZE * 20)
+
+    # log_from_threads already asserted the thread finished while the writer
+    # was still stalled; the overflow must have been dropped, not waited on
+    assert not sink.resume.is_set()
+    assert handler.dropped > 0
+    assert statistics.median(times) < MEDIAN_CALL_BUDGET
+
+
+def test_dropped_records_are_counted_and_reported(stalled):
+    logger, handler, sink = stalled
+    threads, calls = 4, QUEUE_SIZE * 5
+
+    log_from_threads(logger, threads, calls)
+    sink.resume.set()
+    deadline = time.monotonic() + 5.0
+    while not handler.queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    logger.warning("after the stall")  # Carries the report of the last drops
+    while "after the stall" not in sink.messages and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    reports = [m for m in sink.messages if m.startswith("Logger: Dropped")]
+    written = len(sink.messages) - len(reports) - 1
+    # Every record is either written or counted as dropped, and reported
+    assert written + handler.dropped == threads * calls
+    reported = sum(int(m.split()[2]) for m in reports)
+    assert reported == handler.dropped
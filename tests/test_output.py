@@ -0,0 +1,150 @@
+"""Tests for voice_input.output and the paste helper protocol."""
+
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import voice_input.output as output_module
+from voice_input.output import IncrementalOutput, PasteSink, helper_command
+from voice_input.paste_helper import HELPER_FLAG, encode_frame, read_frame
+
+SRC = Path(__file__).parents[1] / "src"
+
+
+@pytest.fixture
+def fallback(monkeypatch):
+    """Record texts pasted through osascript instead of the helper."""
+    pasted: list[str] = []
+    monkeypatch.setattr(output_module, "output_text", pasted.append)
+    return pasted
+
+
+@pytest.fixture
+def spawned(monkeypatch):
+    """Count helper processes started."""
+    commands: list[list[str]] = []
+    popen = subprocess.Popen
+
+    def counting_popen(command, *args, **kwargs):
+        commands.append(command)
+        return popen(command, *args, **kwargs)
+
+    monkeypatch.setattr(output_module.subprocess, "Popen", counting_popen)
+    monkeypatch.setenv("PYTHONPATH", str(SRC))
+    return commands
+
+
+def test_frames_round_trip_any_text():
+    text = '改行\nを含む "テキスト"   end'
+    stream = io.BytesIO(encode_frame({"op": "paste", "text": text}) * 2)
+
+    assert read_frame(stream) == {"op": "paste", "text": text}
+    assert read_frame(stream) == {"op": "paste", "text": text}
+    assert read_frame(stream) is None
+
+
+def test_truncated_frame_is_an_error():
+    stream = io.BytesIO(encode_frame({"op": "ping"})[:-1])
+
+    with pytest.raises(EOFError):
+        read_frame(stream)
+
+
+def test_pastes_through_the_dry_run_helper(spawned, fallback):
+    sink = PasteSink(helper_command() + ["--dry-run"])
+
+    for text in ["一行目\n二行目", "second"]:
+        sink.deliver(text)
+        assert not sink.last_timing.fallback
+    sink.close()
+
+    assert fallback == []
+    assert len(spawned) == 1
+
+
+def test_dead_helper_is_not_respawned_for_every_paste(spawned, fallback):
+    sink = PasteSink([sys.executable, "-c", "pass"])
+
+    for i in range(3):
+        sink.deliver(f"text {i}")
+        assert sink.last_timing.fallback
+    sink.close()
+
+    assert fallback == ["text 0", "text 1", "text 2"]
+    assert len(spawned) == 1
+
+
+def test_helper_is_retried_after_the_delay(spawned, fallback, monkeypatch):
+    monkeypatch.setattr(output_module, "HELPER_RETRY_DELAY", 0.0)
+    sink = PasteSink([sys.executable, "-c", "pass"])
+
+    sink.deliver("a")
+    sink.deliver("b")
+    sink.close()
+
+    assert len(spawned) == 2
+
+
+def test_frozen_app_runs_the_helper_from_its_executable(monkeypatch):
+    monkeypatch.setattr(sys, "frozen", "macosx_app", raising=False)
+    monkeypatch.setenv(
+        "EXECUTABLEPATH", "/Applications/VoiceInput.app/Contents/MacOS/VoiceInput"
+    )
+
+    assert helper_command() == [
+        "/Applications/VoiceInput.app/Contents/MacOS/VoiceInput",
+        HELPER_FLAG,
+    ]
+
+
+def test_incremental_output_delivers_in_segment_order():
+    pieces: list[str] = []
+    output = IncrementalOutput(pieces.append)
+
+    output.submit(0, "hello")
+    output.submit(2, "again")
+    assert pieces == ["hello"]
+    output.submit(1, "world")
+    output.finish(output.delivered)
+
+    assert len(pieces) == 2
+    assert "".join(pieces) == output.delivered
+
+
+def test_incremental_output_hands_a_diverging_final_text_to_the_fallback():
+    pieces: list[str] = []
+    copied: list[str] = []
+    output = IncrementalOutput(pieces.append, fallback=copied.append)
+
+    output.submit(0, "hello")
+    # The final transcript revised the segment that was already pasted
+    assert not output.finish("hullo world")
+
+    assert pieces == ["hello"]
+    assert copied == ["hullo world"]
+
+
+def test_incremental_output_completes_a_matching_final_text():
+    pieces: list[str] = []
+    copied: list[str] = []
+    output = IncrementalOutput(pieces.append, fallback=copied.append)
+
+    output.submit(0, "hello")
+    assert output.finish("hello world")
+
+    assert "".join(pieces) == "hello world"
+    assert copied == []
+
+
+def test_incremental_output_keeps_repeats_between_segments():
+    pieces: list[str] = []
+    output = IncrementalOutput(pieces.append)
+
+    output.submit(0, "it was so")
+    output.submit(1, "so good")
+
+    assert output.delivered == "it was so so good"
+    assert output.finish("it was so so good")
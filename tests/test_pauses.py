@@ -0,0 +1,130 @@
+"""Tests for voice_input.pauses: which pauses are collapsed and the mapping."""
+
+import numpy as np
+import pytest
+
+from voice_input.pauses import (
+    COLLAPSED_PAUSE_SECONDS,
+    MAX_PAUSE_SECONDS,
+    collapse_pauses,
+)
+from voice_input.recorder import SAMPLE_RATE
+from voice_input.vad import VadResult
+
+FRAME = SAMPLE_RATE // 100  # 10 ms frames
+PADDING = 30  # Frames of silence the VAD region keeps around speech
+
+
+def recording(layout: list[tuple[bool, float]]) -> tuple[np.ndarray, VadResult]:
+    """Build audio and its VAD result from (speech?, seconds) runs.
+
+    Speech is a tone, silence is zeros; the VAD region spans the first to
+    the last speech frame plus PADDING frames either side.
+    """
+    speech = np.concatenate(
+        [np.full(round(seconds * 100), is_speech) for is_speech, seconds in layout]
+    )
+    t = np.arange(len(speech) * FRAME) / SAMPLE_RATE
+    tone = (4000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    audio = np.where(np.repeat(speech, FRAME), tone, 0).astype(np.int16)
+    frames = np.flatnonzero(speech)
+    start = max(0, frames[0] - PADDING) * FRAME
+    end = min(len(speech), frames[-1] + 1 + PADDING) * FRAME
+    return audio, VadResult(speech, FRAME, start, end, len(audio))
+
+
+def removed(pause_seconds: float) -> int:
+    """Samples a collapsed pause of pause_seconds loses."""
+    return round((pause_seconds - COLLAPSED_PAUSE_SECONDS) * SAMPLE_RATE)
+
+
+def test_only_pauses_over_the_threshold_are_collapsed():
+    audio, vad = recording(
+        [
+            (False, 0.5),
+            (True, 1.0),
+            (False, MAX_PAUSE_SECONDS / 2),
+            (True, 1.0),
+            (False, 3.0),
+            (True, 1.0),
+            (False, 0.5),
+        ]
+    )
+
+    collapsed = collapse_pauses(audio, vad)
+
+    assert collapsed.pauses == 1
+    assert collapsed.original_samples == vad.end - vad.start
+    assert len(collapsed.audio) == collapsed.original_samples - removed(3.0)
+    assert collapsed.removed_seconds == pytest.approx(3.0 - COLLAPSED_PAUSE_SECONDS)
+    assert collapsed.ratio == pytest.approx(
+        len(collapsed.audio) / collapsed.original_samples
+    )
+    # Everything up to the long pause, short pause included, is untouched
+    pause_start = round((0.5 + 1.0 + MAX_PAUSE_SECONDS / 2 + 1.0) * SAMPLE_RATE)
+    np.testing.assert_array_equal(
+        collapsed.audio[: pause_start - vad.start], audio[vad.start : pause_start]
+    )
+
+
+def test_pause_at_the_threshold_is_kept():
+    audio, vad = recording([(True, 1.0), (False, MAX_PAUSE_SECONDS), (True, 1.0)])
+
+    collapsed = collapse_pauses(audio, vad)
+
+    assert collapsed.pauses == 0
+    assert collapsed.ratio == 1.0
+    np.testing.assert_array_equal(collapsed.audio, audio[vad.start : vad.end])
+
+
+def test_leading_and_trailing_silence_is_not_collapsed():
+    audio, vad = recording(
+        [(False, 3.0), (True, 1.0), (False, 2.0), (True, 1.0), (False, 3.0)]
+    )
+
+    collapsed = collapse_pauses(audio, vad)
+
+    # Only the pause between the two words; the ends are the VAD's to trim
+    assert collapsed.pauses == 1
+    assert len(collapsed.audio) == vad.end - vad.start - removed(2.0)
+
+
+def test_every_long_pause_is_collapsed():
+    audio, vad = recording(
+        [(True, 1.0), (False, 2.0), (True, 1.0), (False, 4.0), (True, 1.0)]
+    )
+
+    collapsed = collapse_pauses(audio, vad)
+
+    assert collapsed.pauses == 2
+    expected = collapsed.original_samples - removed(2.0) - removed(4.0)
+    assert len(collapsed.audio) == expected
+    # 3 s of speech plus two 0.3 s gaps, out of 9 s
+    assert collapsed.ratio == pytest.approx(3.6 / 9.0)
+
+
+def test_positions_map_back_to_the_original_recording():
+    audio, vad = recording([(True, 1.0), (False, 3.0), (True, 1.0)])
+    collapsed = collapse_pauses(audio, vad)
+
+    last = len(collapsed.audio) - 1
+    positions = np.array([0, 100, last])
+
+    assert collapsed.to_original(0) == vad.start
+    assert collapsed.to_original(last) == vad.end - 1
+    np.testing.assert_array_equal(
+        collapsed.to_original(positions), [vad.start, vad.start + 100, vad.end - 1]
+    )
+    # The samples after the cut are the original ones
+    assert collapsed.audio[last] == audio[vad.end - 1]
+
+
+def test_silent_recording_is_returned_unchanged():
+    audio = np.zeros(SAMPLE_RATE, dtype=np.int16)
+    vad = VadResult(np.zeros(100, dtype=bool), FRAME, 0, 0, len(audio))
+
+    collapsed = collapse_pauses(audio, vad)
+
+    assert len(collapsed.audio) == 0
+    assert collapsed.pauses == 0
+    assert collapsed.ratio == 1.0
@@ -0,0 +1,168 @@
+"""Tests for voice_input.pipeline: ordering, backpressure and cancellation."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from voice_input.chunking import ChunkedTranscriber
+from voice_input.dictation import DictationProcessor
+from voice_input.encoder import EncoderStage
+from voice_input.engine import (
+    AudioInput,
+    CancelToken,
+    TranscriptionCancelledError,
+    TranscriptionEngine,
+)
+from voice_input.output import CollectingSink
+from voice_input.pipeline import (
+    CANCELLED,
+    DONE,
+    DictationJob,
+    DictationPipeline,
+    PipelineFullError,
+)
+from voice_input.recorder import SAMPLE_RATE
+from voice_input.tracing import Trace
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+
+from bench_encoders import synthetic_speech
+
+CANCEL_BUDGET = 0.5  # Seconds from cancel_current() to the job finishing
+
+
+class GatedEngine(TranscriptionEngine):
+    """Answers a clip once its gate opens, or gives up when cancelled.
+
+    Clips longer than 2 s are "long", shorter ones "short"; each kind has
+    its own gate, so a test decides which dictation finishes first.
+    """
+
+    name = "gated"
+
+    def __init__(self) -> None:
+        self.gates = {"long": threading.Event(), "short": threading.Event()}
+        self.started = threading.Semaphore(0)
+
+    def _transcribe(
+        self, audio: AudioInput, language: str, cancel: CancelToken | None = None
+    ) -> str:
+        # 16 kHz int16 WAV
+        kind = "long" if len(audio.read()) > 2 * SAMPLE_RATE * 2 else "short"
+        self.started.release()
+        gate = self.gates[kind]
+        while not gate.wait(0.01):
+            if cancel is not None and cancel.cancelled:
+                raise TranscriptionCancelledError("Transcription cancelled")
+        return kind
+
+
+class Jobs:
+    """Collects finished jobs (on_done) so tests can wait for them."""
+
+    def __init__(self) -> None:
+        self.done: list[DictationJob] = []
+        self._finished = threading.Semaphore(0)
+
+    def on_done(self, job: DictationJob) -> None:
+        self.done.append(job)
+        self._finished.release()
+
+    def wait(self, count: int = 1) -> None:
+        for _ in range(count):
+            assert self._finished.acquire(timeout=5.0)
+
+
+@pytest.fixture
+def engine():
+    engine = GatedEngine()
+    yield engine
+    # Let requests still waiting finish
+    for gate in engine.gates.values():
+        gate.set()
+
+
+@pytest.fixture
+def sink():
+    return CollectingSink()
+
+
+@pytest.fixture
+def jobs():
+    return Jobs()
+
+
+def make_pipeline(
+    engine: GatedEngine, sink: CollectingSink, jobs: Jobs, max_pending: int = 4
+) -> DictationPipeline:
+    encoder_stage = EncoderStage("wav")
+    processor = DictationProcessor(
+        engine,
+        encoder_stage,
+        ChunkedTranscriber(engine, encoder_stage),
+        output=sink.deliver,
+    )
+    return DictationPipeline(
+        processor, jobs.on_done, sink.deliver, max_pending=max_pending
+    )
+
+
+def test_text_is_output_in_recording_order(engine, sink, jobs):
+    pipeline = make_pipeline(engine, sink, jobs)
+    first = pipeline.submit(synthetic_speech(3.0), None, Trace())
+    second = pipeline.submit(synthetic_speech(1.0, seed=1), None, Trace())
+
+    # The later dictation finishes first; its text waits for the earlier one
+    engine.gates["short"].set()
+    jobs.wait()
+    assert jobs.done == [second]
+    assert sink.texts == []
+
+    engine.gates["long"].set()
+    jobs.wait()
+    pipeline.shutdown()
+
+    assert sink.texts == ["long", "short"]
+    assert first.state == DONE
+    assert second.state == DONE
+
+
+def test_submission_beyond_max_pending_is_refused(engine, sink, jobs):
+    pipeline = make_pipeline(engine, sink, jobs, max_pending=2)
+    pipeline.submit(synthetic_speech(3.0), None, Trace())
+    pipeline.submit(synthetic_speech(3.0, seed=1), None, Trace())
+
+    assert pipeline.full
+    with pytest.raises(PipelineFullError):
+        pipeline.submit(synthetic_speech(1.0), None, Trace())
+
+    # Finishing a dictation makes room again
+    engine.gates["long"].set()
+    jobs.wait(2)
+    assert pipeline.pending == 0
+    assert not pipeline.full
+    pipeline.submit(synthetic_speech(1.0), None, Trace())
+    engine.gates["short"].set()
+    jobs.wait()
+    pipeline.shutdown()
+
+
+def test_cancel_finishes_the_current_job_and_releases_the_next(engine, sink, jobs):
+    pipeline = make_pipeline(engine, sink, jobs)
+    stuck = pipeline.submit(synthetic_speech(3.0), None, Trace())
+    behind = pipeline.submit(synthetic_speech(1.0, seed=1), None, Trace())
+    assert engine.started.acquire(timeout=5.0)
+    engine.gates["short"].set()
+
+    cancelled_at = time.monotonic()
+    assert pipeline.cancel_current() is stuck
+    jobs.wait(2)
+    pipeline.shutdown()
+
+    assert time.monotonic() - cancelled_at < CANCEL_BUDGET
+    assert stuck.state == CANCELLED
+    assert behind.state == DONE
+    assert sink.texts == ["short"]
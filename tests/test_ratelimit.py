@@ -0,0 +1,47 @@
+"""Tests for voice_input.ratelimit."""
+
+import threading
+import time
+
+from voice_input.engine import CancelToken
+from voice_input.ratelimit import TokenBucket
+
+
+def test_burst_then_waits_for_refill():
+    bucket = TokenBucket(requests_per_minute=600, burst=2)
+
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    start = time.monotonic()
+    assert bucket.acquire(timeout=1.0)
+    # 10 tokens per second
+    assert 0.05 < time.monotonic() - start < 0.5
+
+
+def test_acquire_times_out():
+    bucket = TokenBucket(requests_per_minute=1, burst=1)
+    bucket.try_acquire()
+
+    start = time.monotonic()
+    assert not bucket.acquire(timeout=0.05)
+    assert time.monotonic() - start < 0.5
+
+
+def test_cancel_wakes_a_waiting_acquire():
+    bucket = TokenBucket(requests_per_minute=1, burst=1)
+    bucket.try_acquire()
+    cancel = CancelToken()
+    threading.Timer(0.05, cancel.cancel).start()
+
+    start = time.monotonic()
+    assert not bucket.acquire(timeout=30.0, cancel=cancel)
+    assert time.monotonic() - start < 1.0
+
+
+def test_cancelled_token_doesnt_stop_an_available_token():
+    bucket = TokenBucket(requests_per_minute=60, burst=1)
+    cancel = CancelToken()
+    cancel.cancel()
+
+    assert bucket.acquire(timeout=1.0, cancel=cancel)
@@ -0,0 +1,280 @@
+"""Tests for voice_input.recorder with a fake input device."""
+
+import functools
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import voice_input.recorder as recorder_module
+from voice_input.recorder import SAMPLE_RATE, StreamingRecorder, StreamReaper
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+
+from fake_device import FileInputStream
+
+NATIVE_RATE = 48000
+CHANNELS = 2
+BLOCK = 480  # 10 ms at NATIVE_RATE
+
+
+class ManualStream:
+    """InputStream whose callback the test drives; abort() can hang."""
+
+    def __init__(self, callback, hang: threading.Event | None = None, **kwargs):
+        self.callback = callback
+        self.hang = hang
+        self.samplerate = kwargs.get("samplerate")
+        self.channels = kwargs.get("channels")
+        self.active = False
+        self.closed = threading.Event()
+
+    def start(self) -> None:
+        self.active = True
+
+    def abort(self) -> None:
+        if self.hang is not None:
+            self.hang.wait()
+        self.active = False
+
+    def close(self) -> None:
+        self.closed.set()
+
+
+@pytest.fixture
+def device(monkeypatch):
+    """Install a fake sounddevice; returns its opened streams and hangs.
+
+    Each event queued in hangs makes abort() of the next stream opened
+    block until it is set.
+    """
+    streams: list[ManualStream] = []
+    hangs: list[threading.Event | None] = []
+
+    def input_stream(**kwargs) -> ManualStream:
+        stream = ManualStream(hang=hangs.pop(0) if hangs else None, **kwargs)
+        streams.append(stream)
+        return stream
+
+    monkeypatch.setattr(
+        recorder_module,
+        "sd",
+        types.SimpleNamespace(
+            InputStream=input_stream,
+            query_devices=lambda kind: {
+                "default_samplerate": NATIVE_RATE,
+                "max_input_channels": CHANNELS,
+            },
+        ),
+    )
+    return types.SimpleNamespace(streams=streams, hangs=hangs)
+
+
+def native_blocks(count: int) -> list[np.ndarray]:
+    rng = np.random.default_rng(0)
+    return [
+        rng.integers(-8000, 8000, (BLOCK, CHANNELS), dtype=np.int16)
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("warm", [False, True])
+def test_native_rate_stop_keeps_every_block(device, warm):
+    from voice_input.resample import BlockConverter
+
+    blocks = native_blocks(200)
+    recorder = StreamingRecorder(native_rate=True, warm=warm)
+    reference = None  # Converts what the recorder's converter saw
+    preroll = 0  # Samples a warm stream delivered between recordings
+
+    for _ in range(5):
+        recorder.start()
+        if reference is None or not warm:
+            reference = BlockConverter(NATIVE_RATE, CHANNELS)
+        for block in blocks:
+            device.streams[-1].callback(block, len(block), None, None)
+        audio = recorder.stop()
+        # A block after stop() goes to the pre-roll (warm) or nowhere, never
+        # into the recording just returned
+        device.streams[-1].callback(blocks[0], BLOCK, None, None)
+
+        recorded = sum(len(reference.convert(block)) for block in blocks)
+        if not warm:
+            # The stream ended: the samples left in the filter are added
+            recorded += len(reference.flush())
+        assert len(audio) == preroll + recorded
+        if warm:
+            preroll = len(reference.convert(blocks[0]))
+    recorder.close()
+
+
+def test_native_rate_records_only_the_configured_input(device):
+    recorder = StreamingRecorder(native_rate=True, input_channel=2)
+    t = np.arange(BLOCK * 100) / NATIVE_RATE
+    live = (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    # A silent first input next to the live microphone on the second
+    clip = np.stack((np.zeros_like(live), live), axis=1)
+
+    recorder.start()
+    assert device.streams[-1].channels == 2
+    for start in range(0, len(clip), BLOCK):
+        block = clip[start : start + BLOCK]
+        device.streams[-1].callback(block, len(block), None, None)
+    audio = recorder.stop().astype(np.float64)
+    recorder.close()
+
+    # Not averaged with the silent input (which would halve the level)
+    rms = np.sqrt(np.mean(audio[len(audio) // 4 :] ** 2))
+    assert rms == pytest.approx(8000 / np.sqrt(2), rel=0.05)
+
+
+def test_missing_input_channel_falls_back_to_the_first(device):
+    recorder = StreamingRecorder(native_rate=True, input_channel=CHANNELS + 1)
+
+    recorder.start()
+    assert device.streams[-1].channels == 1
+    recorder.stop()
+    recorder.close()
+
+
+def test_failed_open_does_not_leak_the_converter_thread(device, monkeypatch):
+    def busy_device(**kwargs):
+        raise OSError("Device unavailable")
+
+    monkeypatch.setattr(recorder_module.sd, "InputStream", busy_device)
+    recorder = StreamingRecorder(native_rate=True, input_channel=CHANNELS)
+
+    for _ in range(3):
+        with pytest.raises(OSError):
+            recorder.start()
+
+    deadline = time.monotonic() + 2.0
+    while time.monotonic() < deadline:
+        converters = [
+            t for t in threading.enumerate() if t.name == "voice-input-convert"
+        ]
+        if not converters:
+            break
+        time.sleep(0.01)
+    assert not converters
+
+
+def test_refused_native_format_falls_back_to_16k_mono(device, monkeypatch):
+    open_stream = recorder_module.sd.InputStream
+
+    def picky_device(**kwargs):
+        if kwargs["samplerate"] != SAMPLE_RATE:
+            raise OSError("Invalid sample rate")
+        return open_stream(**kwargs)
+
+    monkeypatch.setattr(recorder_module.sd, "InputStream", picky_device)
+    recorder = StreamingRecorder(native_rate=True, input_channel=CHANNELS)
+
+    recorder.start()
+    stream = device.streams[-1]
+    assert (stream.samplerate, stream.channels) == (SAMPLE_RATE, 1)
+    block = np.ones((160, 1), dtype=np.int16)
+    stream.callback(block, len(block), None, None)
+    assert len(recorder.stop()) == len(block)
+    recorder.close()
+
+
+def test_stop_does_not_wait_for_a_hung_teardown(device):
+    hang = threading.Event()
+    device.hangs.append(hang)
+    recorder = StreamingRecorder(native_rate=True)
+    blocks = native_blocks(20)
+
+    stop_times = []
+    for _ in range(3):
+        recorder.start()
+        for block in blocks:
+            device.streams[-1].callback(block, len(block), None, None)
+        start_time = time.perf_counter()
+        recorder.stop()
+        stop_times.append(time.perf_counter() - start_time)
+
+    assert max(stop_times) < 0.05
+    # Later streams wait behind the hung one instead of getting threads
+    assert not any(stream.closed.is_set() for stream in device.streams)
+    hang.set()
+    assert recorder.reaper.wait(timeout=2.0)
+    assert all(stream.closed.is_set() for stream in device.streams)
+
+
+def test_reaper_marks_a_hang_without_starting_more_threads():
+    hang = threading.Event()
+    streams = [ManualStream(None, hang=hang)] + [ManualStream(None) for _ in range(3)]
+    reaper = StreamReaper(timeout=0.05)
+    before = set(threading.enumerate())
+
+    for stream in streams:
+        reaper.reap(stream)
+    time.sleep(0.2)
+
+    assert reaper.stuck
+    assert reaper.hung == 1
+    assert reaper.pending == len(streams)
+    assert len(set(threading.enumerate()) - before) == 1  # The reaper thread
+    hang.set()
+    assert reaper.wait(timeout=2.0)
+    assert all(stream.closed.is_set() for stream in streams)
+    assert not reaper.stuck
+    assert reaper.hung == 1
+
+
+@pytest.fixture
+def counting_device(monkeypatch):
+    """Install a file-backed fake device playing a looping counter.
+
+    Consecutive samples differ by one, so any gap or reordering in a
+    recording shows up as a different step.
+    """
+    period = 30000
+    source = (np.arange(period) - period // 2).astype(np.int16)
+    monkeypatch.setattr(
+        recorder_module,
+        "sd",
+        types.SimpleNamespace(InputStream=functools.partial(FileInputStream, source=source)),
+    )
+    return period
+
+
+def assert_contiguous(audio: np.ndarray, period: int) -> None:
+    steps = np.diff(audio.reshape(-1).astype(np.int64))
+    assert np.all((steps == 1) | (steps == 1 - period))
+
+
+def test_warm_recording_starts_with_the_preroll(counting_device):
+    preroll = 0.3
+    recorder = StreamingRecorder(warm=True, preroll_seconds=preroll)
+    recorder.open()
+    time.sleep(preroll + 0.2)  # Fill the ring before the key press
+
+    recorder.start()
+    time.sleep(0.2)
+    audio = recorder.stop()
+    recorder.close()
+
+    # The pre-roll precedes the live audio with nothing lost in between
+    assert len(audio) >= (preroll + 0.2) * SAMPLE_RATE * 0.9
+    assert_contiguous(audio, counting_device)
+
+
+def test_cold_recording_has_no_preroll(counting_device):
+    recorder = StreamingRecorder()
+
+    start_time = time.perf_counter()
+    recorder.start()
+    time.sleep(0.2)
+    audio = recorder.stop()
+    held = time.perf_counter() - start_time
+    recorder.close()
+
+    # Nothing from before start(): at most what arrived while it was held
+    assert len(audio) <= (held + 0.02) * SAMPLE_RATE
+    assert_contiguous(audio, counting_device)
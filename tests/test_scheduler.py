@@ -0,0 +1,194 @@
+"""Tests for voice_input.scheduler: cancellation, retries and hedging."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from voice_input.engine import (
+    AudioInput,
+    CancelToken,
+    TranscriptionCancelledError,
+    TranscriptionEngine,
+)
+from voice_input.scheduler import (
+    HEDGE_MIN_SAMPLES,
+    HedgeBudget,
+    RequestScheduler,
+    RetryPolicy,
+)
+from voice_input.transcriber import TranscriptionClient
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+
+from stub_server import StubWhisperServer
+
+CANCEL_BUDGET = 0.5  # Seconds from cancel() to transcribe() raising
+FAST = 0.02  # Normal stub latency (s)
+SLOW = 0.5  # Latency of a request worth hedging (s)
+UNLIMITED = 60_000  # Requests per minute that never wait on the limiter
+
+
+class FlakyEngine(TranscriptionEngine):
+    """Fails the first `failures` requests with a transient error."""
+
+    name = "flaky"
+    remote = True
+    transient_errors = (ConnectionError,)
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+
+    def _transcribe(
+        self, audio: AudioInput, language: str, cancel: CancelToken | None = None
+    ) -> str:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("connection reset")
+        return "text"
+
+
+class SlowEngine(TranscriptionEngine):
+    """Answers every request after a fixed delay."""
+
+    name = "slow"
+    remote = True
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.requests = 0
+
+    def _transcribe(
+        self, audio: AudioInput, language: str, cancel: CancelToken | None = None
+    ) -> str:
+        self.requests += 1
+        time.sleep(self.delay)
+        return "text"
+
+
+class FixedBackoff(RetryPolicy):
+    def backoff(self, attempt: int, error: Exception) -> float:
+        return 10.0
+
+
+def cancel_after(seconds: float) -> CancelToken:
+    cancel = CancelToken()
+    threading.Timer(seconds, cancel.cancel).start()
+    return cancel
+
+
+def test_cancel_interrupts_retry_backoff():
+    scheduler = RequestScheduler(FlakyEngine(failures=1), retry=FixedBackoff())
+    cancel = cancel_after(0.05)
+
+    start = time.monotonic()
+    with pytest.raises(TranscriptionCancelledError):
+        scheduler.transcribe(b"audio", cancel=cancel)
+    assert time.monotonic() - start < CANCEL_BUDGET
+    scheduler.close()
+
+
+def test_cancel_interrupts_rate_limit_wait():
+    scheduler = RequestScheduler(
+        FlakyEngine(), requests_per_minute=1, max_concurrency=1, hedge_percent=0
+    )
+    assert scheduler.transcribe(b"audio") == "text"
+    cancel = cancel_after(0.05)
+
+    start = time.monotonic()
+    with pytest.raises(TranscriptionCancelledError):
+        scheduler.transcribe(b"audio", cancel=cancel)
+    assert time.monotonic() - start < CANCEL_BUDGET
+    scheduler.close()
+
+
+def test_retry_succeeds_without_cancel():
+    retry = RetryPolicy(backoff_base=0.01)
+    scheduler = RequestScheduler(FlakyEngine(failures=2), retry=retry)
+
+    assert scheduler.transcribe(b"audio") == "text"
+    scheduler.close()
+
+
+@pytest.fixture
+def stub():
+    with StubWhisperServer(latency=FAST, text="text") as server:
+        yield server
+
+
+def stub_scheduler(server: StubWhisperServer, **kwargs) -> RequestScheduler:
+    client = TranscriptionClient(api_key="stub", base_url=server.base_url, max_retries=0)
+    return RequestScheduler(client, requests_per_minute=UNLIMITED, **kwargs)
+
+
+def warm_up(scheduler: RequestScheduler) -> None:
+    """Send enough fast requests for the scheduler to start hedging."""
+    for _ in range(HEDGE_MIN_SAMPLES):
+        assert scheduler.transcribe(b"audio") == "text"
+
+
+def test_hedge_fires_after_latency_percentile(stub):
+    scheduler = stub_scheduler(stub)
+    warm_up(scheduler)
+    assert scheduler.hedge_budget.hedges == 0
+    stub.tail_rate, stub.tail_latency = 1.0, SLOW
+
+    assert scheduler.transcribe(b"audio") == "text"
+    assert scheduler.hedge_budget.hedges == 1
+    assert stub.request_count == HEDGE_MIN_SAMPLES + 2
+    scheduler.close()
+
+
+def test_hedges_are_capped_by_budget(stub):
+    scheduler = stub_scheduler(stub)
+    warm_up(scheduler)
+    stub.tail_rate, stub.tail_latency = 1.0, SLOW
+
+    # 5% of 21 and 22 primaries only leaves room for one hedge
+    scheduler.transcribe(b"audio")
+    scheduler.transcribe(b"audio")
+    assert scheduler.hedge_budget.hedges == 1
+    assert stub.request_count == HEDGE_MIN_SAMPLES + 3
+    scheduler.close()
+
+
+def test_hedge_budget_allows_percentage_of_primaries():
+    budget = HedgeBudget(percent=5.0)
+    spent = 0
+    for _ in range(100):
+        budget.record_primary()
+        spent += budget.try_spend()
+
+    assert spent == budget.hedges == 5
+
+
+def test_hedge_refused_by_limiter_keeps_budget():
+    engine = SlowEngine(delay=0.2)
+    # A burst of one token: the primary takes it, the hedge finds none
+    scheduler = RequestScheduler(engine, requests_per_minute=1, max_concurrency=1)
+    for _ in range(HEDGE_MIN_SAMPLES):
+        scheduler.hedge_budget.record_primary()
+        scheduler._latency.record(0.01)
+
+    assert scheduler.transcribe(b"audio") == "text"
+    assert engine.requests == 1
+    assert scheduler.hedge_budget.hedges == 0
+    scheduler.close()
+
+
+def test_rate_limited_retry_waits_for_retry_after():
+    retry_after = 0.3
+    with StubWhisperServer(
+        latency=FAST, text="text", fail_first=1, retry_after=retry_after
+    ) as server:
+        # Jittered backoff alone would retry almost at once
+        scheduler = stub_scheduler(server, retry=RetryPolicy(backoff_base=0.001))
+
+        start = time.monotonic()
+        assert scheduler.transcribe(b"audio") == "text"
+        assert time.monotonic() - start >= retry_after
+        assert server.request_count == 2
+        assert server.error_count == 1
+        scheduler.close()
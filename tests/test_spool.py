@@ -0,0 +1,117 @@
+"""Tests for voice_input.spool."""
+
+import io
+import json
+import time
+
+import pytest
+
+import voice_input.spool as spool_module
+from voice_input.spool import JOURNAL_NAME, Spool
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def journal(directory) -> list[dict]:
+    path = directory / JOURNAL_NAME
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_successful_upload_writes_nothing(tmp_path):
+    directory = tmp_path / "spool"
+    spool = Spool(directory)
+
+    ticket = spool.stage(b"audio", ".flac")
+    ticket.done()
+    time.sleep(0.1)
+
+    assert not ticket.written
+    assert not directory.exists() or not any(directory.iterdir())
+
+
+def test_failed_upload_is_written_and_ready(tmp_path):
+    spool = Spool(tmp_path)
+
+    ticket = spool.stage(b"audio", ".flac")
+    assert ticket.fail()
+
+    [job] = spool.ready()
+    assert spool.path(job).read_bytes() == b"audio"
+    assert journal(tmp_path)[-1]["op"] == "add"
+
+
+def test_staged_buffer_is_written_whole_while_being_read(tmp_path):
+    spool = Spool(tmp_path)
+    buffer = io.BytesIO(b"audio")
+    buffer.read(2)  # The upload is part-way through
+
+    ticket = spool.stage(buffer, ".flac")
+    assert ticket.fail()
+
+    assert spool.path(ticket.job).read_bytes() == b"audio"
+    assert buffer.read() == b"dio"
+
+
+def test_slow_upload_is_written_then_discarded(tmp_path, monkeypatch):
+    monkeypatch.setattr(spool_module, "SLOW_UPLOAD_SECONDS", 0.05)
+    spool = Spool(tmp_path)
+
+    ticket = spool.stage(b"audio", ".flac")
+    assert wait_for(lambda: ticket.written)
+    assert spool.ready() == []  # Not failed: not drained
+
+    ticket.done()
+    assert wait_for(lambda: not spool.path(ticket.job).exists())
+    assert journal(tmp_path)[-1] == {"op": "done", "id": ticket.job.id}
+
+
+def test_fail_reports_a_failed_write(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    spool = Spool(blocker / "spool")
+
+    ticket = spool.stage(b"audio", ".flac")
+
+    assert not ticket.fail()
+    assert spool.ready() == []
+
+
+def test_pending_jobs_are_recovered(tmp_path):
+    job = Spool(tmp_path).save(b"audio", ".wav", kind="pcm")
+
+    spool = Spool(tmp_path)
+
+    assert [recovered.id for recovered in spool.ready()] == [job.id]
+    assert spool.path(job).read_bytes() == b"audio"
+
+
+def test_completed_jobs_keep_no_transcript(tmp_path):
+    spool = Spool(tmp_path)
+    job = spool.save(b"audio", ".wav")
+
+    spool.complete(job)
+
+    assert not spool.path(job).exists()
+    assert journal(tmp_path)[-1] == {"op": "done", "id": job.id}
+    assert Spool(tmp_path).ready() == []
+
+
+@pytest.mark.parametrize("blocked", [JOURNAL_NAME, "journal.tmp"])
+def test_unusable_journal_starts_empty(tmp_path, blocked):
+    Spool(tmp_path).save(b"audio", ".wav")
+    if blocked == JOURNAL_NAME:
+        (tmp_path / JOURNAL_NAME).unlink()
+    (tmp_path / blocked).mkdir()
+
+    spool = Spool(tmp_path)
+
+    assert spool.ready() == []
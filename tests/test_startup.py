@@ -0,0 +1,39 @@
+"""Startup budgets of the entry points (see benchmarks/bench_startup.py).
+
+Import time depends on machine speed and load, so its millisecond budget is
+enforced only by the bench script; these tests check what is deterministic.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parents[1]
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_startup import (
+    ENTRY_POINTS,
+    LAZY_MODULES,
+    MAX_RSS_MB,
+    profile,
+)
+
+
+@pytest.fixture(scope="module", params=ENTRY_POINTS)
+def report(request):
+    # The probe runs in a fresh interpreter, which needs src/ on its path
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("PYTHONPATH", str(ROOT / "src"))
+        result = profile(request.param)
+    if result is None:
+        pytest.skip(f"{request.param} is not importable here")
+    return result
+
+
+def test_rss_within_budget(report):
+    assert report["rss_mb"] <= MAX_RSS_MB
+
+
+def test_lazy_modules_not_imported(report):
+    assert report["eager"] == [], f"expected lazy: {LAZY_MODULES}"
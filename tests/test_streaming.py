@@ -0,0 +1,110 @@
+"""Tests for voice_input.streaming: cancellation and joining segments."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from voice_input.encoder import EncoderStage
+from voice_input.engine import (
+    AudioInput,
+    CancelToken,
+    TranscriptionCancelledError,
+    TranscriptionEngine,
+)
+from voice_input.recorder import SAMPLE_RATE
+from voice_input.streaming import SpeculativeTranscriber
+
+CANCEL_BUDGET = 0.5  # Seconds from cancel() to a segment request giving up
+
+
+class HangingEngine(TranscriptionEngine):
+    """Hangs until its request is cancelled, like a stuck rate-limit wait."""
+
+    name = "hanging"
+
+    def __init__(self) -> None:
+        self.started = threading.Semaphore(0)
+        self.gave_up: list[float] = []
+
+    def _transcribe(
+        self, audio: AudioInput, language: str, cancel: CancelToken | None = None
+    ) -> str:
+        self.started.release()
+        if cancel is None or not cancel.wait(10.0):
+            return "text"
+        self.gave_up.append(time.monotonic())
+        raise TranscriptionCancelledError("Transcription cancelled")
+
+
+class LengthEngine(TranscriptionEngine):
+    """Answers a short segment and a long one with different texts."""
+
+    name = "length"
+
+    def _transcribe(
+        self, audio: AudioInput, language: str, cancel: CancelToken | None = None
+    ) -> str:
+        # 16 kHz int16 WAV: more than 1.5 s of audio is the long segment
+        return "so good" if len(audio.read()) > 1.5 * SAMPLE_RATE * 2 else "it was so"
+
+
+def segment(seconds: float = 1.0) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+
+
+@pytest.fixture
+def engine():
+    return HangingEngine()
+
+
+@pytest.fixture
+def speculative(engine):
+    transcriber = SpeculativeTranscriber(engine, EncoderStage("wav"))
+    yield transcriber
+    transcriber.shutdown()
+
+
+def test_cancelling_the_dictation_cancels_segment_requests(engine, speculative):
+    session = speculative.start_session()
+    session.on_segment(segment())
+    assert engine.started.acquire(timeout=5.0)
+    cancel = CancelToken()
+    threading.Timer(0.05, cancel.cancel).start()
+
+    with pytest.raises(TranscriptionCancelledError):
+        session.finish(segment(2.0), cancel=cancel)
+    cancelled_at = time.monotonic()
+
+    # Both the earlier segment and the tail stop waiting
+    deadline = time.monotonic() + CANCEL_BUDGET
+    while len(engine.gave_up) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(engine.gave_up) == 2
+    assert max(engine.gave_up) - cancelled_at < CANCEL_BUDGET
+
+
+def test_discarded_session_cancels_segment_requests(engine, speculative):
+    session = speculative.start_session()
+    session.on_segment(segment())
+    assert engine.started.acquire(timeout=5.0)
+
+    session.cancel()
+
+    deadline = time.monotonic() + CANCEL_BUDGET
+    while not engine.gave_up and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert engine.gave_up
+
+
+def test_repeat_across_a_segment_boundary_is_kept():
+    speculative = SpeculativeTranscriber(LengthEngine(), EncoderStage("wav"))
+    session = speculative.start_session()
+    session.on_segment(segment(1.0))
+
+    # Segments are cut at pauses and don't overlap: "so" was said twice
+    text = session.finish(segment(3.0))
+    speculative.shutdown()
+
+    assert text == "it was so so good"
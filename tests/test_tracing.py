@@ -0,0 +1,109 @@
+"""Tests for voice_input.tracing: histogram buckets, percentiles and traces."""
+
+import itertools
+
+import pytest
+
+from voice_input.tracing import (
+    MAX_MICROSECONDS,
+    NULL_TRACE,
+    SUB_BUCKET_BITS,
+    LatencyHistogram,
+    Tracer,
+)
+
+RELATIVE_ERROR = 1 / (1 << (SUB_BUCKET_BITS - 1))  # Bucket width / value
+
+
+def test_small_values_have_exact_buckets():
+    histogram = LatencyHistogram()
+
+    for microseconds in range(1 << SUB_BUCKET_BITS):
+        assert histogram._index(microseconds) == microseconds
+        assert histogram._value(microseconds) == microseconds
+
+
+def test_bucket_indexes_are_contiguous_and_increasing():
+    histogram = LatencyHistogram()
+    indexes = [histogram._index(us) for us in range(200_000)]
+
+    steps = {later - earlier for earlier, later in itertools.pairwise(indexes)}
+
+    assert steps == {0, 1}
+
+
+@pytest.mark.parametrize(
+    "microseconds", [64, 65, 127, 128, 1000, 12_345, 999_999, 1_900_000, 3_599_999]
+)
+def test_bucket_value_is_within_the_relative_error(microseconds):
+    histogram = LatencyHistogram()
+
+    value = histogram._value(histogram._index(microseconds))
+
+    assert abs(value - microseconds) <= microseconds * RELATIVE_ERROR
+
+
+def test_percentiles_of_known_samples():
+    histogram = LatencyHistogram()
+    for milliseconds in range(1, 101):
+        histogram.record(milliseconds / 1000)
+
+    for percent, expected in [(50, 0.050), (95, 0.095), (99, 0.099), (100, 0.100)]:
+        assert histogram.percentile(percent) == pytest.approx(
+            expected, rel=RELATIVE_ERROR
+        )
+    assert histogram.count == 100
+
+
+def test_percentile_ignores_a_single_outlier_below_p99():
+    histogram = LatencyHistogram()
+    for _ in range(199):
+        histogram.record(0.010)
+    histogram.record(30.0)
+
+    assert histogram.percentile(50) == pytest.approx(0.010, rel=RELATIVE_ERROR)
+    assert histogram.percentile(99) == pytest.approx(0.010, rel=RELATIVE_ERROR)
+    assert histogram.percentile(100) == pytest.approx(30.0, rel=RELATIVE_ERROR)
+
+
+def test_out_of_range_values_are_clamped():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0.0
+
+    histogram.record(-1.0)
+    histogram.record(10 * 3600.0)
+
+    assert histogram.percentile(0) == 0.0
+    assert histogram.percentile(100) == pytest.approx(
+        MAX_MICROSECONDS / 1_000_000, rel=RELATIVE_ERROR
+    )
+
+
+def test_tracer_aggregates_stages_and_total():
+    tracer = Tracer()
+    for milliseconds in (10, 20, 30):
+        trace = tracer.start()
+        trace.record("encode", milliseconds / 1000)
+        trace.record("encode", milliseconds / 1000)  # Accumulates
+        tracer.finish(trace)
+
+    percentiles = tracer.percentiles()
+
+    assert set(percentiles) == {"encode", "total"}
+    assert percentiles["encode"]["p50"] == pytest.approx(0.040, rel=RELATIVE_ERROR)
+    assert percentiles["encode"]["p99"] == pytest.approx(0.060, rel=RELATIVE_ERROR)
+    assert tracer.last is trace
+
+
+def test_disabled_tracer_keeps_nothing():
+    tracer = Tracer(enabled=False)
+
+    trace = tracer.start()
+    with trace.span("encode"):
+        pass
+    tracer.finish(trace)
+
+    assert trace is NULL_TRACE
+    assert trace.spans == {}
+    assert tracer.percentiles() == {}
+    assert tracer.last is None
@@ -0,0 +1,84 @@
+"""Tests for voice_input.transcriber against a local stub Whisper server."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from voice_input.engine import CancelToken, TranscriptionCancelledError
+from voice_input.transcriber import TranscriptionClient
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+
+from stub_server import StubWhisperServer
+
+
+@pytest.fixture
+def stub():
+    with StubWhisperServer(latency=0.0, text="text") as server:
+        yield server
+
+
+@pytest.fixture
+def client(stub):
+    client = TranscriptionClient(api_key="stub", base_url=stub.base_url)
+    yield client
+    client.close()
+
+
+def test_consecutive_transcriptions_reuse_one_connection(stub, client):
+    assert client.transcribe(b"audio") == "text"
+    assert client.transcribe(b"audio") == "text"
+
+    assert stub.request_count == 2
+    assert stub.connection_count == 1
+    assert client.last_timing.reused
+
+
+def test_preconnect_opens_the_connection_the_transcription_uses(stub, client):
+    client.preconnect()
+    deadline = time.monotonic() + 5.0
+    # Done once the preconnect has returned its connection to the pool
+    while (
+        stub.model_count == 0 or client._preconnect_lock.locked()
+    ) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stub.connection_count == 1
+
+    assert client.transcribe(b"audio") == "text"
+
+    assert stub.connection_count == 1
+    assert client.last_timing.reused
+    assert client.last_timing.connect == 0.0
+
+
+def test_cancel_aborts_the_request_in_flight():
+    with StubWhisperServer(latency=3.0, text="text") as stub:
+        client = TranscriptionClient(
+            api_key="stub", base_url=stub.base_url, max_retries=0
+        )
+        cancel = CancelToken()
+        threading.Timer(0.2, cancel.cancel).start()
+        try:
+            start_time = time.perf_counter()
+            with pytest.raises(TranscriptionCancelledError):
+                client._transcribe(b"audio", "ja", cancel)
+            assert time.perf_counter() - start_time < 1.0
+
+            # The aborted connection isn't reused
+            stub.latency = 0.0
+            assert client.transcribe(b"audio") == "text"
+            assert stub.connection_count == 2
+        finally:
+            client.close()
+
+
+def test_cancel_after_the_request_keeps_the_connection(stub, client):
+    cancel = CancelToken()
+    assert client._transcribe(b"audio", "ja", cancel) == "text"
+    cancel.cancel()
+
+    assert client.transcribe(b"audio") == "text"
+    assert stub.connection_count == 1
@@ -0,0 +1,124 @@
+"""Tests for voice_input.vad on synthetic signals."""
+
+import numpy as np
+import pytest
+
+from voice_input.recorder import SAMPLE_RATE
+from voice_input.vad import FRAME_SECONDS, PADDING_SECONDS, detect_speech
+
+FRAME = int(FRAME_SECONDS * SAMPLE_RATE)
+
+
+def tone(
+    seconds: float, frequency: float = 220.0, amplitude: float = 8000
+) -> np.ndarray:
+    """Return a sine tone as float samples."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return amplitude * np.sin(2 * np.pi * frequency * t)
+
+
+def noise(seconds: float, amplitude: float = 20, seed: int = 0) -> np.ndarray:
+    """Return Gaussian background noise as float samples."""
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, amplitude, int(seconds * SAMPLE_RATE))
+
+
+def int16(*parts: np.ndarray) -> np.ndarray:
+    """Concatenate float parts into an int16 recording."""
+    audio = np.concatenate(parts)
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def test_tone_is_speech_throughout():
+    result = detect_speech(int16(tone(1.0)))
+
+    assert result.has_speech
+    assert result.start == 0
+    assert result.end == result.total
+    assert result.leading_seconds == 0
+    assert result.trailing_seconds == 0
+
+
+def test_noise_only_has_no_speech():
+    result = detect_speech(int16(noise(2.0)))
+
+    assert not result.has_speech
+    assert result.speech_seconds == 0
+    assert (result.start, result.end) == (0, 0)
+
+
+def test_digital_silence_has_no_speech():
+    result = detect_speech(np.zeros(SAMPLE_RATE, dtype=np.int16))
+
+    assert not result.has_speech
+
+
+def test_isolated_clicks_are_not_speech():
+    audio = noise(2.0)
+    for second in (0.5, 1.0, 1.5):
+        # Two frames: shorter than MIN_SPEECH_SECONDS
+        start = int(second * SAMPLE_RATE)
+        audio[start : start + 2 * FRAME] += tone(2 * FRAME / SAMPLE_RATE, 1000)
+
+    result = detect_speech(int16(audio))
+
+    assert not result.has_speech
+
+
+def test_speech_with_silence_is_trimmed_to_speech_plus_padding():
+    leading, speech, trailing = 1.0, 1.0, 1.5
+    audio = int16(
+        noise(leading, seed=1),
+        tone(speech) + noise(speech, seed=2),
+        noise(trailing, seed=3),
+    )
+
+    result = detect_speech(audio)
+
+    assert result.has_speech
+    assert result.total == len(audio)
+    # Speech starts on a frame boundary, so the onset is exact
+    assert result.start == int((leading - PADDING_SECONDS) * SAMPLE_RATE)
+    assert result.leading_seconds == pytest.approx(leading - PADDING_SECONDS)
+    # The end is extended by the hangover and padding
+    speech_end = int((leading + speech) * SAMPLE_RATE)
+    assert speech_end < result.end < speech_end + int(0.4 * SAMPLE_RATE)
+    assert 1.0 < result.trailing_seconds < trailing - PADDING_SECONDS
+    assert result.speech_seconds == pytest.approx(speech, abs=0.25)
+
+
+def test_speech_with_a_pause_stays_one_region():
+    audio = int16(
+        noise(0.5, seed=1),
+        tone(0.5),
+        noise(0.5, seed=2),
+        tone(0.5, 330),
+        noise(0.5, seed=3),
+    )
+
+    result = detect_speech(audio)
+
+    assert result.start == int(0.4 * SAMPLE_RATE)
+    assert result.end > int(2.0 * SAMPLE_RATE)
+    # The pause between the words is not speech
+    pause = result.speech[int(1.3 / FRAME_SECONDS) : int(1.45 / FRAME_SECONDS)]
+    assert not pause.any()
+
+
+def test_quiet_fricative_counts_as_speech():
+    rng = np.random.default_rng(4)
+    # Broadband noise: below the RMS threshold, but with a high ZCR
+    fricative = rng.normal(0, 70, int(0.3 * SAMPLE_RATE))
+    audio = int16(noise(1.0, amplitude=5), fricative, noise(1.0, amplitude=5, seed=1))
+
+    result = detect_speech(audio)
+
+    assert result.has_speech
+    assert result.leading_seconds == pytest.approx(1.0 - PADDING_SECONDS)
+
+
+def test_shorter_than_a_frame():
+    result = detect_speech(np.zeros(FRAME // 2, dtype=np.int16))
+
+    assert not result.has_speech
+    assert result.total == FRAME // 2